@@ -1,5 +1,8 @@
+import functools
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Mapping
 from dotenv import load_dotenv
 
 
@@ -8,7 +11,7 @@ def _load_env() -> None:
 	load_dotenv(override=False)
 
 
-@dataclass
+@dataclass(frozen=True)
 class AppConfig:
 	db_host: str
 	db_port: int
@@ -17,9 +20,38 @@ class AppConfig:
 	db_password: str
 	app_locale: str
 	currency: str
+	kpi_cache_ttl: int = 60
+	db_backend: str = "mysql"
+	db_path: str = "gestion_elevage.sqlite3"
+	db_pool_min: int = 1
+	db_pool_max: int = 5
+	db_pool_timeout: float = 10.0
+	db_pool_idle: float = 300.0
+	db_pool_ping: float = 5.0
+	db_reporting_pool_min: int = 0
+	db_reporting_pool_max: int = 2
+	db_reporting_max_execution_ms: int = 60000
+	query_timeouts: Mapping[str, float] = field(default_factory=lambda: MappingProxyType({}))
 
 
+def _parse_timeouts(value: str) -> Dict[str, float]:
+	# "lots_overview=120, summary=0" -> {"lots_overview": 120.0, "summary": 0.0}
+	timeouts = {}
+	for item in value.split(","):
+		if "=" in item:
+			name, seconds = item.split("=", 1)
+			timeouts[name.strip()] = float(seconds)
+	return timeouts
+
+
+@functools.lru_cache(maxsize=None)
 def get_config() -> AppConfig:
+	"""
+	Configuration lue une seule fois (.env puis variables d'environnement) et partagée :
+	backend(), query_timeout() et les pools l'appellent à chaque requête. L'objet renvoyé
+	est figé (query_timeouts en lecture seule) ; get_config.cache_clear() force une
+	relecture (tests).
+	"""
 	_load_env()
 	return AppConfig(
 		db_host=os.getenv("DB_HOST", "localhost"),
@@ -29,6 +61,18 @@ def get_config() -> AppConfig:
 		db_password=os.getenv("DB_PASSWORD", ""),
 		app_locale=os.getenv("APP_LOCALE", "fr_CM"),
 		currency=os.getenv("CURRENCY", "XAF"),
+		kpi_cache_ttl=int(os.getenv("KPI_CACHE_TTL", "60")),
+		db_backend=os.getenv("DB_BACKEND", "mysql").strip().lower(),
+		db_path=os.getenv("DB_PATH", "gestion_elevage.sqlite3"),
+		db_pool_min=int(os.getenv("DB_POOL_MIN", "1")),
+		db_pool_max=int(os.getenv("DB_POOL_MAX", "5")),
+		db_pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "10")),
+		db_pool_idle=float(os.getenv("DB_POOL_IDLE", "300")),
+		db_pool_ping=float(os.getenv("DB_POOL_PING", "5")),
+		db_reporting_pool_min=int(os.getenv("DB_REPORTING_POOL_MIN", "0")),
+		db_reporting_pool_max=int(os.getenv("DB_REPORTING_POOL_MAX", "2")),
+		db_reporting_max_execution_ms=int(os.getenv("DB_REPORTING_MAX_EXECUTION_MS", "60000")),
+		query_timeouts=MappingProxyType(_parse_timeouts(os.getenv("QUERY_TIMEOUTS", ""))),
 	)
 
 
@@ -0,0 +1,139 @@
+from typing import Dict, List, Optional
+
+from app.db import get_connection
+
+
+# Recalcul complet du cumul mensuel à partir des tables de détail
+_RECOMPUTE_SELECT = """
+    SELECT YEAR(date_depense) AS annee, MONTH(date_depense) AS mois, COALESCE(lot_id, 0) AS lot_id,
+      'depense' AS sens, type_depense AS categorie, COUNT(*) AS nb, SUM(montant) AS total
+    FROM depenses
+    GROUP BY YEAR(date_depense), MONTH(date_depense), COALESCE(lot_id, 0), type_depense
+    UNION ALL
+    SELECT YEAR(date_recette), MONTH(date_recette), COALESCE(lot_id, 0),
+      'recette', type_recette, COUNT(*), SUM(montant)
+    FROM recettes
+    GROUP BY YEAR(date_recette), MONTH(date_recette), COALESCE(lot_id, 0), type_recette
+"""
+
+# Écart toléré entre totaux stockés et recalculés (montants FLOAT)
+_TOLERANCE = 0.01
+
+
+def bump_finance_monthly(cur, sens: str, categorie: str, date_: str, lot_id: Optional[int], montant: float, nb: int = 1) -> None:
+    """
+    Ajuste le cumul mensuel (sens = 'depense' ou 'recette') avec le curseur fourni, donc dans
+    la transaction de l'appelant. nb=-1 et un montant négatif retirent une ligne supprimée.
+    """
+    lot = lot_id or 0
+    cur.execute(
+        """
+        INSERT INTO finance_monthly(annee, mois, lot_id, sens, categorie, nb, total)
+        VALUES(YEAR(%s), MONTH(%s), %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE nb = nb + VALUES(nb), total = total + VALUES(total)
+        """,
+        (date_, date_, lot, sens, categorie, nb, montant),
+    )
+    if nb < 0:
+        # Un mois/type vidé ne doit pas laisser de ligne à zéro
+        cur.execute(
+            """
+            DELETE FROM finance_monthly
+            WHERE annee = YEAR(%s) AND mois = MONTH(%s) AND lot_id = %s AND sens = %s AND categorie = %s AND nb <= 0
+            """,
+            (date_, date_, lot, sens, categorie),
+        )
+
+
+def detach_lot(cur, lot_id: int) -> None:
+    """
+    Reporte le cumul d'un lot sur lot_id = 0 avant sa suppression
+    (les lignes de détail passent à lot_id NULL via ON DELETE SET NULL).
+    """
+    cur.execute(
+        """
+        INSERT INTO finance_monthly(annee, mois, lot_id, sens, categorie, nb, total)
+        SELECT annee, mois, 0, sens, categorie, nb, total FROM finance_monthly WHERE lot_id = %s
+        ON DUPLICATE KEY UPDATE nb = finance_monthly.nb + VALUES(nb), total = finance_monthly.total + VALUES(total)
+        """,
+        (lot_id,),
+    )
+    cur.execute("DELETE FROM finance_monthly WHERE lot_id = %s", (lot_id,))
+
+
+def monthly_totals(
+    start_year: int,
+    start_month: int,
+    end_year: int,
+    end_month: int,
+    lot_id: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Totaux par mois (bornes incluses) lus dans le cumul : une ligne par (annee, mois, sens, categorie).
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor(dictionary=True) as cur:
+            query = (
+                "SELECT annee, mois, sens, categorie, SUM(nb) AS nb, SUM(total) AS total"
+                " FROM finance_monthly"
+                " WHERE (annee, mois) >= (%s, %s) AND (annee, mois) <= (%s, %s)"
+            )
+            params = (start_year, start_month, end_year, end_month)
+            if lot_id:
+                query += " AND lot_id = %s"
+                params += (lot_id,)
+            query += " GROUP BY annee, mois, sens, categorie ORDER BY annee, mois, sens, categorie"
+            cur.execute(query, params)
+            return cur.fetchall()
+    finally:
+        conn.close()
+
+
+def rebuild_finance_monthly() -> int:
+    """Recalcule tout le cumul depuis depenses et recettes. Retourne le nombre de lignes du cumul."""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM finance_monthly")
+            cur.execute(
+                "INSERT INTO finance_monthly(annee, mois, lot_id, sens, categorie, nb, total) "
+                + _RECOMPUTE_SELECT
+            )
+            cur.execute("SELECT COUNT(*) FROM finance_monthly")
+            n = int(cur.fetchone()[0])
+            conn.commit()
+            return n
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def verify_finance_monthly() -> List[Dict]:
+    """
+    Compare le cumul stocké avec un recalcul depuis les tables de détail.
+    Retourne les clés divergentes (liste vide si tout est cohérent).
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor(dictionary=True) as cur:
+            cur.execute(f"SELECT * FROM ({_RECOMPUTE_SELECT}) r")
+            expected = {(r["annee"], r["mois"], r["lot_id"], r["sens"], r["categorie"]): r for r in cur.fetchall()}
+            cur.execute("SELECT annee, mois, lot_id, sens, categorie, nb, total FROM finance_monthly")
+            stored = {(r["annee"], r["mois"], r["lot_id"], r["sens"], r["categorie"]): r for r in cur.fetchall()}
+    finally:
+        conn.close()
+    diffs = []
+    for key in sorted(set(expected) | set(stored), key=lambda k: tuple(str(x) for x in k)):
+        exp = expected.get(key) or {"nb": 0, "total": 0}
+        got = stored.get(key) or {"nb": 0, "total": 0}
+        if int(exp["nb"]) != int(got["nb"]) or abs(float(exp["total"]) - float(got["total"])) > _TOLERANCE:
+            annee, mois, lot, sens, categorie = key
+            diffs.append({
+                "annee": annee, "mois": mois, "lot_id": lot, "sens": sens, "categorie": categorie,
+                "nb_attendu": int(exp["nb"]), "nb_stocke": int(got["nb"]),
+                "total_attendu": float(exp["total"]), "total_stocke": float(got["total"]),
+            })
+    return diffs
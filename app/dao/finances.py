@@ -1,10 +1,24 @@
 from typing import List, Dict, Optional, Tuple
 
-from app.db import get_connection
+from app.db import after_commit, get_connection, query_timeout, transaction
+from app.dao.finance_monthly import bump_finance_monthly
+from app.dao.kpis import invalidate_kpis
+
+
+def _after_desc(date_col: str, after: Tuple) -> Tuple[str, Tuple]:
+	# Pagination par clé sur ORDER BY <date> DESC, id DESC : lignes strictement après (date, id)
+	return f"({date_col} < %s OR ({date_col} = %s AND id < %s))", (after[0], after[0], after[1])
 
 
 # Dépenses
-def list_depenses(start: Optional[str] = None, end: Optional[str] = None, lot_id: Optional[int] = None) -> List[Dict]:
+def list_depenses(
+	start: Optional[str] = None,
+	end: Optional[str] = None,
+	lot_id: Optional[int] = None,
+	after: Optional[Tuple] = None,
+	limit: Optional[int] = None,
+) -> List[Dict]:
+	"""Liste des dépenses filtrées; `after`=(date_depense, id) et `limit` paginent par clé."""
 	conn = get_connection()
 	try:
 		with conn.cursor(dictionary=True) as cur:
@@ -20,9 +34,16 @@ def list_depenses(start: Optional[str] = None, end: Optional[str] = None, lot_id
 			if lot_id:
 				conds.append("(lot_id = %s)")
 				params += (lot_id,)
+			if after:
+				cond, after_params = _after_desc("date_depense", after)
+				conds.append(cond)
+				params += after_params
 			if conds:
 				query += " WHERE " + " AND ".join(conds)
 			query += " ORDER BY date_depense DESC, id DESC"
+			if limit:
+				query += " LIMIT %s"
+				params += (int(limit),)
 			cur.execute(query, params)
 			return cur.fetchall()
 	finally:
@@ -30,44 +51,53 @@ def list_depenses(start: Optional[str] = None, end: Optional[str] = None, lot_id
 
 
 def create_depense(type_depense: str, montant: float, date_depense: str, description: Optional[str], lot_id: Optional[int]) -> int:
-	conn = get_connection()
-	try:
+	with transaction() as conn:
+		after_commit(invalidate_kpis)
 		with conn.cursor() as cur:
 			cur.execute(
 				"INSERT INTO depenses(type_depense, description, montant, date_depense, lot_id) VALUES(%s,%s,%s,%s,%s)",
 				(type_depense, description, montant, date_depense, lot_id),
 			)
-			conn.commit()
-			return cur.lastrowid
-	finally:
-		conn.close()
+			new_id = cur.lastrowid
+			bump_finance_monthly(cur, "depense", type_depense, date_depense, lot_id, montant)
+			return new_id
 
 
 def update_depense(id_: int, type_depense: str, montant: float, date_depense: str, description: Optional[str], lot_id: Optional[int]) -> None:
-	conn = get_connection()
-	try:
-		with conn.cursor() as cur:
+	with transaction() as conn:
+		after_commit(invalidate_kpis)
+		with conn.cursor(dictionary=True) as cur:
+			cur.execute("SELECT type_depense, montant, date_depense, lot_id FROM depenses WHERE id=%s FOR UPDATE", (id_,))
+			old = cur.fetchone()
 			cur.execute(
 				"UPDATE depenses SET type_depense=%s, description=%s, montant=%s, date_depense=%s, lot_id=%s WHERE id=%s",
 				(type_depense, description, montant, date_depense, lot_id, id_),
 			)
-			conn.commit()
-	finally:
-		conn.close()
+			if old:
+				bump_finance_monthly(cur, "depense", old["type_depense"], old["date_depense"], old["lot_id"], -float(old["montant"]), nb=-1)
+				bump_finance_monthly(cur, "depense", type_depense, date_depense, lot_id, montant)
 
 
 def delete_depense(id_: int) -> None:
-	conn = get_connection()
-	try:
-		with conn.cursor() as cur:
+	with transaction() as conn:
+		after_commit(invalidate_kpis)
+		with conn.cursor(dictionary=True) as cur:
+			cur.execute("SELECT type_depense, montant, date_depense, lot_id FROM depenses WHERE id=%s FOR UPDATE", (id_,))
+			old = cur.fetchone()
 			cur.execute("DELETE FROM depenses WHERE id=%s", (id_,))
-			conn.commit()
-	finally:
-		conn.close()
+			if old:
+				bump_finance_monthly(cur, "depense", old["type_depense"], old["date_depense"], old["lot_id"], -float(old["montant"]), nb=-1)
 
 
 # Recettes
-def list_recettes(start: Optional[str] = None, end: Optional[str] = None, lot_id: Optional[int] = None) -> List[Dict]:
+def list_recettes(
+	start: Optional[str] = None,
+	end: Optional[str] = None,
+	lot_id: Optional[int] = None,
+	after: Optional[Tuple] = None,
+	limit: Optional[int] = None,
+) -> List[Dict]:
+	"""Liste des recettes filtrées; `after`=(date_recette, id) et `limit` paginent par clé."""
 	conn = get_connection()
 	try:
 		with conn.cursor(dictionary=True) as cur:
@@ -83,9 +113,16 @@ def list_recettes(start: Optional[str] = None, end: Optional[str] = None, lot_id
 			if lot_id:
 				conds.append("(lot_id = %s)")
 				params += (lot_id,)
+			if after:
+				cond, after_params = _after_desc("date_recette", after)
+				conds.append(cond)
+				params += after_params
 			if conds:
 				query += " WHERE " + " AND ".join(conds)
 			query += " ORDER BY date_recette DESC, id DESC"
+			if limit:
+				query += " LIMIT %s"
+				params += (int(limit),)
 			cur.execute(query, params)
 			return cur.fetchall()
 	finally:
@@ -93,48 +130,117 @@ def list_recettes(start: Optional[str] = None, end: Optional[str] = None, lot_id
 
 
 def create_recette(type_recette: str, montant: float, date_recette: str, lot_id: Optional[int], client: Optional[str]) -> int:
-	conn = get_connection()
-	try:
+	with transaction() as conn:
+		after_commit(invalidate_kpis)
 		with conn.cursor() as cur:
 			cur.execute(
 				"INSERT INTO recettes(type_recette, montant, date_recette, lot_id, client) VALUES(%s,%s,%s,%s,%s)",
 				(type_recette, montant, date_recette, lot_id, client),
 			)
-			conn.commit()
-			return cur.lastrowid
-	finally:
-		conn.close()
+			new_id = cur.lastrowid
+			bump_finance_monthly(cur, "recette", type_recette, date_recette, lot_id, montant)
+			return new_id
 
 
 def update_recette(id_: int, type_recette: str, montant: float, date_recette: str, lot_id: Optional[int], client: Optional[str]) -> None:
-	conn = get_connection()
-	try:
-		with conn.cursor() as cur:
+	with transaction() as conn:
+		after_commit(invalidate_kpis)
+		with conn.cursor(dictionary=True) as cur:
+			cur.execute("SELECT type_recette, montant, date_recette, lot_id FROM recettes WHERE id=%s FOR UPDATE", (id_,))
+			old = cur.fetchone()
 			cur.execute(
 				"UPDATE recettes SET type_recette=%s, montant=%s, date_recette=%s, lot_id=%s, client=%s WHERE id=%s",
 				(type_recette, montant, date_recette, lot_id, client, id_),
 			)
-			conn.commit()
-	finally:
-		conn.close()
+			if old:
+				bump_finance_monthly(cur, "recette", old["type_recette"], old["date_recette"], old["lot_id"], -float(old["montant"]), nb=-1)
+				bump_finance_monthly(cur, "recette", type_recette, date_recette, lot_id, montant)
 
 
 def delete_recette(id_: int) -> None:
-	conn = get_connection()
-	try:
-		with conn.cursor() as cur:
+	with transaction() as conn:
+		after_commit(invalidate_kpis)
+		with conn.cursor(dictionary=True) as cur:
+			cur.execute("SELECT type_recette, montant, date_recette, lot_id FROM recettes WHERE id=%s FOR UPDATE", (id_,))
+			old = cur.fetchone()
 			cur.execute("DELETE FROM recettes WHERE id=%s", (id_,))
-			conn.commit()
-	finally:
-		conn.close()
+			if old:
+				bump_finance_monthly(cur, "recette", old["type_recette"], old["date_recette"], old["lot_id"], -float(old["montant"]), nb=-1)
 
 
 # Résumé
-def summary(start: Optional[str] = None, end: Optional[str] = None, lot_id: Optional[int] = None) -> Dict[str, float]:
-	deps = list_depenses(start, end, lot_id)
-	recs = list_recettes(start, end, lot_id)
-	total_dep = sum(d.get("montant", 0) for d in deps)
-	total_rec = sum(r.get("montant", 0) for r in recs)
-	return {"depenses": float(total_dep), "recettes": float(total_rec), "solde": float(total_rec - total_dep)}
-
-
+def _summary_filters(date_col: str, start: Optional[str], end: Optional[str], lot_id: Optional[int]) -> Tuple[str, Tuple]:
+	conds = []
+	params: Tuple = ()
+	if start:
+		conds.append(f"{date_col} >= %s")
+		params += (start,)
+	if end:
+		conds.append(f"{date_col} <= %s")
+		params += (end,)
+	if lot_id:
+		conds.append("lot_id = %s")
+		params += (lot_id,)
+	return (" WHERE " + " AND ".join(conds) if conds else ""), params
+
+
+def _empty_summary() -> Dict:
+	return {
+		"depenses": 0.0, "recettes": 0.0, "solde": 0.0,
+		"nb_depenses": 0, "nb_recettes": 0,
+		"par_type_depense": {}, "par_type_recette": {},
+	}
+
+
+@query_timeout(30)
+def summary(start: Optional[str] = None, end: Optional[str] = None, lot_id: Optional[int] = None) -> Dict:
+	"""
+	Totaux, nombres de lignes et ventilation par type des dépenses et recettes filtrées,
+	agrégés par la BD en une seule requête (aucune ligne de détail n'est transférée).
+
+	Retourne: depenses, recettes, solde, nb_depenses, nb_recettes,
+	par_type_depense et par_type_recette ({type: montant}).
+	"""
+	where_dep, params_dep = _summary_filters("date_depense", start, end, lot_id)
+	where_rec, params_rec = _summary_filters("date_recette", start, end, lot_id)
+	conn = get_connection()
+	try:
+		with conn.cursor(dictionary=True) as cur:
+			cur.execute(
+				"SELECT 'depense' AS sens, type_depense AS categorie, COUNT(*) AS nb, COALESCE(SUM(montant),0) AS total"
+				f" FROM depenses{where_dep} GROUP BY type_depense"
+				" UNION ALL "
+				"SELECT 'recette' AS sens, type_recette AS categorie, COUNT(*) AS nb, COALESCE(SUM(montant),0) AS total"
+				f" FROM recettes{where_rec} GROUP BY type_recette",
+				params_dep + params_rec,
+			)
+			rows = cur.fetchall()
+	finally:
+		conn.close()
+	result = _empty_summary()
+	for row in rows:
+		suffix = "depense" if row["sens"] == "depense" else "recette"
+		total = float(row["total"])
+		result[f"{suffix}s"] += total
+		result[f"nb_{suffix}s"] += int(row["nb"])
+		result[f"par_type_{suffix}"][row["categorie"]] = total
+	result["solde"] = result["recettes"] - result["depenses"]
+	return result
+
+
+def summarize_rows(depenses: List[Dict], recettes: List[Dict]) -> Dict:
+	"""
+	Même résultat que summary() calculé à partir de lignes déjà chargées
+	(list_depenses / list_recettes complètes), sans nouvel accès à la BD.
+	"""
+	result = _empty_summary()
+	for suffix, rows in (("depense", depenses), ("recette", recettes)):
+		by_type = result[f"par_type_{suffix}"]
+		for row in rows:
+			montant = float(row.get("montant") or 0)
+			categorie = row.get(f"type_{suffix}")
+			by_type[categorie] = by_type.get(categorie, 0.0) + montant
+			result[f"{suffix}s"] += montant
+		result[f"nb_{suffix}s"] = len(rows)
+	result["solde"] = result["recettes"] - result["depenses"]
+	return result
@@ -1,56 +1,87 @@
+import threading
+import time
 from datetime import date, timedelta
+from typing import Optional
+
+from app.config import get_config
 from app.db import get_connection
 
+
+# Cache en mémoire des KPI (partagé par toutes les instances du tableau de bord)
+_cache_lock = threading.Lock()
+_cache = {"value": None, "at": 0.0}
+
+
 def fetch_kpis() -> dict:
     """
     Récupère tous les indicateurs de performance clés (KPIs) nécessaires
-    pour le tableau de bord en exécutant des requêtes agrégées sur la BD.
-    
-    Retourne un dictionnaire contenant: lots_actifs, stocks_low, dep_mois, 
+    pour le tableau de bord en un seul aller-retour vers la BD.
+
+    Retourne un dictionnaire contenant: lots_actifs, stocks_low, dep_mois,
     rec_mois, solde_mois, et mort_30.
     """
+    today = date.today()
+    # Mois courant lu dans le cumul finance_monthly, fenêtre de 30 jours en prédicat indexable
+    start_30 = today - timedelta(days=30)
+
     conn = get_connection()
     try:
         with conn.cursor(dictionary=True) as cur:
-            # 1. Nombre de lots actifs
-            cur.execute("SELECT COUNT(*) AS n FROM lots WHERE statut='Actif'")
-            lots_actifs = int(cur.fetchone()["n"])
-            
-            # 2. Stocks sous le seuil d'alerte
-            cur.execute("SELECT COUNT(*) AS n FROM stocks WHERE seuil_alerte IS NOT NULL AND seuil_alerte>0 AND quantite <= seuil_alerte")
-            stocks_low = int(cur.fetchone()["n"])
-            
-            # 3. Calculs financiers du mois courant
-            today = date.today()
-            
-            # Dépenses du mois
-            cur.execute(
-                "SELECT COALESCE(SUM(montant),0) AS s FROM depenses WHERE YEAR(date_depense)=%s AND MONTH(date_depense)=%s",
-                (today.year, today.month),
-            )
-            dep_mois = float(cur.fetchone()["s"])
-            
-            # Recettes du mois
             cur.execute(
-                "SELECT COALESCE(SUM(montant),0) AS s FROM recettes WHERE YEAR(date_recette)=%s AND MONTH(date_recette)=%s",
-                (today.year, today.month),
+                """
+                SELECT
+                    (SELECT COUNT(*) FROM lots WHERE statut='Actif') AS lots_actifs,
+                    (SELECT COUNT(*) FROM stocks
+                        WHERE seuil_alerte IS NOT NULL AND seuil_alerte>0 AND quantite <= seuil_alerte) AS stocks_low,
+                    (SELECT COALESCE(SUM(total),0) FROM finance_monthly
+                        WHERE annee = %s AND mois = %s AND sens = 'depense') AS dep_mois,
+                    (SELECT COALESCE(SUM(total),0) FROM finance_monthly
+                        WHERE annee = %s AND mois = %s AND sens = 'recette') AS rec_mois,
+                    (SELECT COALESCE(SUM(quantite),0) FROM mortalites WHERE date_event >= %s) AS mort_30
+                """,
+                (today.year, today.month, today.year, today.month, start_30),
             )
-            rec_mois = float(cur.fetchone()["s"])
-            
-            # 4. Mortalité sur 30 jours
-            start = today - timedelta(days=30)
-            # Note: Le script SQL utilise la table 'mortalites' qui est une table d'événements
-            cur.execute("SELECT COALESCE(SUM(quantite),0) AS s FROM mortalites WHERE date_event >= %s", (start,))
-            mort_30 = int(cur.fetchone()["s"])
-            
+            row = cur.fetchone()
+            dep_mois = float(row["dep_mois"])
+            rec_mois = float(row["rec_mois"])
             return {
-                "lots_actifs": lots_actifs,
-                "stocks_low": stocks_low,
+                "lots_actifs": int(row["lots_actifs"]),
+                "stocks_low": int(row["stocks_low"]),
                 "dep_mois": dep_mois,
                 "rec_mois": rec_mois,
                 "solde_mois": rec_mois - dep_mois,
-                "mort_30": mort_30,
+                "mort_30": int(row["mort_30"]),
             }
     finally:
         # Assure la fermeture de la connexion quel que soit le résultat
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+
+def get_kpis(max_age: Optional[float] = None) -> dict:
+    """
+    Retourne les KPI du cache s'ils datent de moins de `max_age` secondes
+    (KPI_CACHE_TTL par défaut), sinon les recalcule et met le cache à jour.
+    """
+    if max_age is None:
+        max_age = get_config().kpi_cache_ttl
+    with _cache_lock:
+        value, at = _cache["value"], _cache["at"]
+    if value is not None and time.monotonic() - at < max_age:
+        return value
+    value = fetch_kpis()
+    with _cache_lock:
+        _cache["value"] = value
+        _cache["at"] = time.monotonic()
+    return value
+
+
+def cached_kpis() -> Optional[dict]:
+    """Dernières valeurs connues (éventuellement périmées), sans accès à la BD."""
+    with _cache_lock:
+        return _cache["value"]
+
+
+def invalidate_kpis() -> None:
+    """Force le prochain get_kpis() à relire la BD."""
+    with _cache_lock:
+        _cache["at"] = 0.0
@@ -0,0 +1,81 @@
+from typing import Dict, List
+
+from app.db import get_connection
+
+
+# Recalcul complet des compteurs à partir des tables d'événements
+_RECOMPUTE_SELECT = """
+    SELECT l.id AS lot_id,
+      COALESCE(m.q,0) AS morts,
+      COALESCE(v.q,0) AS vendus,
+      COALESCE(a.q,0) AS abattus
+    FROM lots l
+    LEFT JOIN (SELECT lot_id, SUM(quantite) AS q FROM mortalites GROUP BY lot_id) m ON m.lot_id = l.id
+    LEFT JOIN (SELECT lot_id, SUM(quantite) AS q FROM ventes_animaux GROUP BY lot_id) v ON v.lot_id = l.id
+    LEFT JOIN (SELECT lot_id, SUM(quantite) AS q FROM abattages GROUP BY lot_id) a ON a.lot_id = l.id
+"""
+
+
+def bump_counters(cur, lot_id: int, morts: int = 0, vendus: int = 0, abattus: int = 0) -> None:
+    """
+    Ajuste les compteurs matérialisés d'un lot avec le curseur fourni, donc dans la
+    transaction de l'appelant. Les valeurs négatives servent aux suppressions d'événements.
+    """
+    cur.execute(
+        """
+        INSERT INTO lot_counters(lot_id, morts, vendus, abattus) VALUES(%s,%s,%s,%s)
+        ON DUPLICATE KEY UPDATE
+          morts = morts + VALUES(morts),
+          vendus = vendus + VALUES(vendus),
+          abattus = abattus + VALUES(abattus)
+        """,
+        (lot_id, morts, vendus, abattus),
+    )
+
+
+def rebuild_lot_counters() -> int:
+    """Recalcule tous les compteurs depuis mortalites, ventes_animaux et abattages. Retourne le nombre de lots."""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "INSERT INTO lot_counters(lot_id, morts, vendus, abattus) "
+                + _RECOMPUTE_SELECT
+                + " ON DUPLICATE KEY UPDATE morts = VALUES(morts), vendus = VALUES(vendus), abattus = VALUES(abattus)"
+            )
+            cur.execute("SELECT COUNT(*) FROM lot_counters")
+            n = int(cur.fetchone()[0])
+            conn.commit()
+            return n
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def verify_lot_counters() -> List[Dict]:
+    """
+    Compare les compteurs stockés avec un recalcul depuis les événements.
+    Retourne les lots divergents (liste vide si tout est cohérent).
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor(dictionary=True) as cur:
+            cur.execute(
+                f"""
+                SELECT r.lot_id,
+                  r.morts AS morts_attendus, COALESCE(c.morts,0) AS morts_stockes,
+                  r.vendus AS vendus_attendus, COALESCE(c.vendus,0) AS vendus_stockes,
+                  r.abattus AS abattus_attendus, COALESCE(c.abattus,0) AS abattus_stockes
+                FROM ({_RECOMPUTE_SELECT}) r
+                LEFT JOIN lot_counters c ON c.lot_id = r.lot_id
+                WHERE r.morts <> COALESCE(c.morts,0)
+                   OR r.vendus <> COALESCE(c.vendus,0)
+                   OR r.abattus <> COALESCE(c.abattus,0)
+                ORDER BY r.lot_id
+                """
+            )
+            return cur.fetchall()
+    finally:
+        conn.close()
@@ -1,28 +1,31 @@
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 from app.dao.lots import check_and_close_lot 
-from ..db import get_connection
+from app.dao.lot_counters import bump_counters
+from app.dao.finance_monthly import bump_finance_monthly
+from app.dao.kpis import invalidate_kpis
+from ..db import after_commit, get_connection, transaction
 
 
 def record_mortality(lot_id: int, date_event: str, quantite: int, motif: Optional[str]) -> None:
-    conn = get_connection()
-    try:
+    # Événement, compteurs et statut du lot validés ensemble, sur une seule connexion
+    with transaction() as conn:
+        after_commit(invalidate_kpis)
         with conn.cursor() as cur:
             # 1. Enregistrement de la mortalité
             cur.execute(
                 "INSERT INTO mortalites(lot_id, date_event, quantite, motif) VALUES(%s,%s,%s,%s)",
                 (lot_id, date_event, quantite, motif),
             )
+            # 2. Mise à jour des compteurs dans la même transaction
+            bump_counters(cur, lot_id, morts=quantite)
             
-            conn.commit()
-            check_and_close_lot(lot_id) 
-            
-    finally:
-        conn.close()
+        # 3. Clôture éventuelle du lot (rejoint la transaction en cours)
+        check_and_close_lot(lot_id) 
 
 
 def record_partial_sale(lot_id: int, date_vente: str, quantite: int, prix_unitaire: float, client: Optional[str]) -> None:
-    conn = get_connection()
-    try:
+    with transaction() as conn:
+        after_commit(invalidate_kpis)
         with conn.cursor() as cur:
             # 1. Enregistrement de l'événement de vente
             cur.execute(
@@ -36,11 +39,12 @@ def record_partial_sale(lot_id: int, date_vente: str, quantite: int, prix_unitai
                 "INSERT INTO recettes(type_recette, montant, date_recette, lot_id, client) VALUES('Vente', %s, %s, %s, %s)",
                 (montant, date_vente, lot_id, client),
             )
-            conn.commit()
-            check_and_close_lot(lot_id) 
+            bump_finance_monthly(cur, "recette", "Vente", date_vente, lot_id, montant)
+            # 3. Mise à jour des compteurs dans la même transaction
+            bump_counters(cur, lot_id, vendus=quantite)
             
-    finally:
-        conn.close()
+        # 4. Clôture éventuelle du lot (rejoint la transaction en cours)
+        check_and_close_lot(lot_id) 
 
 
 def record_slaughter(
@@ -52,66 +56,76 @@ def record_slaughter(
     """
     Enregistre un événement d'abattage (slaughter) pour un lot.
     """
-    conn = get_connection()
     try:
-        with conn.cursor() as cur:
-            # 1. Enregistrement de l'abattage
-            cur.execute(
-                """
-                INSERT INTO abattages (lot_id, date_abattage, quantite, poids_unitaire)
-                VALUES (%s, %s, %s, %s)
-                """,
-                (lot_id, date_abattage, quantite, poids_unitaire)
-            )
-            conn.commit()
+        with transaction() as conn:
+            after_commit(invalidate_kpis)
+            with conn.cursor() as cur:
+                # 1. Enregistrement de l'abattage
+                cur.execute(
+                    """
+                    INSERT INTO abattages (lot_id, date_abattage, quantite, poids_unitaire)
+                    VALUES (%s, %s, %s, %s)
+                    """,
+                    (lot_id, date_abattage, quantite, poids_unitaire)
+                )
+                # 2. Mise à jour des compteurs dans la même transaction
+                bump_counters(cur, lot_id, abattus=quantite)
+                
+            # 3. Clôture éventuelle du lot (rejoint la transaction en cours)
             check_and_close_lot(lot_id) 
             
     except Exception as e:
         print(f"Erreur lors de l'enregistrement de l'abattage du lot {lot_id} : {e}")
-        if conn:
-            conn.rollback()
         raise 
-    finally:
-        if conn:
-            conn.close()
 
 
-def get_lot_counters(lot_id: int) -> Dict[str, int]:
+def get_lot_counters_bulk(lot_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    """
+    Récupère les compteurs de plusieurs lots en une seule requête.
+    Retourne un dictionnaire {lot_id: compteurs}; les lots inexistants sont absents.
+    """
+    ids = sorted({int(i) for i in lot_ids})
+    if not ids:
+        return {}
     conn = get_connection()
     try:
         with conn.cursor(dictionary=True) as cur:
-            cur.execute("SELECT nombre_initial FROM lots WHERE id=%s", (lot_id,))
-            base = cur.fetchone()
-            if not base:
-                # Inclure 'abattus' dans le dictionnaire retourné pour la cohérence
-                return {"initial": 0, "mortalites": 0, "vendus": 0, "abattus": 0, "restants": 0}
-            
-            # Calcul des Morts
-            cur.execute("SELECT COALESCE(SUM(quantite),0) AS q FROM mortalites WHERE lot_id=%s", (lot_id,))
-            morts = cur.fetchone()["q"]
-            
-            # Calcul des Vendus
-            cur.execute("SELECT COALESCE(SUM(quantite),0) AS q FROM ventes_animaux WHERE lot_id=%s", (lot_id,))
-            vendus = cur.fetchone()["q"]
-            
-            # Calcul des Abattus 
-            cur.execute("SELECT COALESCE(SUM(quantite),0) AS q FROM abattages WHERE lot_id=%s", (lot_id,))
-            abattus = cur.fetchone()["q"] 
-            
-            # Calcul des Restants (en incluant les abattus)
-            restants = base["nombre_initial"] - morts - vendus - abattus
-            
-            return {
-                "initial": base["nombre_initial"], 
-                "morts": morts, 
-                "vendus": vendus, 
-                "abattus": abattus,
-                "restants": restants
-            }
+            placeholders = ",".join(["%s"] * len(ids))
+            cur.execute(
+                f"""
+                SELECT l.id, l.nombre_initial,
+                    COALESCE(c.morts, 0) AS morts,
+                    COALESCE(c.vendus, 0) AS vendus,
+                    COALESCE(c.abattus, 0) AS abattus
+                FROM lots l
+                LEFT JOIN lot_counters c ON c.lot_id = l.id
+                WHERE l.id IN ({placeholders})
+                """,
+                tuple(ids),
+            )
+            result = {}
+            for row in cur.fetchall():
+                result[row["id"]] = {
+                    "initial": row["nombre_initial"],
+                    "morts": row["morts"],
+                    "vendus": row["vendus"],
+                    "abattus": row["abattus"],
+                    # Restants en incluant les abattus
+                    "restants": row["nombre_initial"] - row["morts"] - row["vendus"] - row["abattus"],
+                }
+            return result
     finally:
         conn.close()
 
 
+def get_lot_counters(lot_id: int) -> Dict[str, int]:
+    counters = get_lot_counters_bulk([lot_id]).get(lot_id)
+    if not counters:
+        # Inclure 'abattus' dans le dictionnaire retourné pour la cohérence
+        return {"initial": 0, "morts": 0, "vendus": 0, "abattus": 0, "restants": 0}
+    return counters
+
+
 def list_mortalites(lot_id: int) -> List[Dict]:
     conn = get_connection()
     try:
@@ -1,11 +1,24 @@
 from typing import List, Dict, Optional, Tuple
-from ..db import get_connection 
+from ..db import after_commit, get_connection
+from .finance_monthly import detach_lot
+from .kpis import invalidate_kpis
 
 
-def list_lots(search: Optional[str] = None, statut: Optional[str] = None) -> List[Dict]:
+def list_lots(
+    search: Optional[str] = None,
+    statut: Optional[str] = None,
+    after: Optional[Tuple] = None,
+    limit: Optional[int] = None,
+    type_animal: Optional[str] = None,
+) -> List[Dict]:
     """
-    Récupère la liste des lots avec les compteurs calculés (morts, vendus, abattus, restants),
-    en appliquant des filtres optionnels par statut et recherche textuelle.
+    Récupère la liste des lots avec les compteurs (morts, vendus, abattus, restants) lus
+    dans la table matérialisée lot_counters, en appliquant des filtres optionnels par statut et recherche textuelle.
+
+    Pagination par clé : `after` est la clé (id,) de la dernière ligne déjà affichée,
+    `limit` le nombre maximal de lignes à renvoyer.
+    Pour filtrer par espèce, préférer `type_animal` (égalité indexable) à `search`
+    (LIKE '%...%' sur trois colonnes, qui ne peut pas utiliser d'index).
     """
     conn = get_connection()
     try:
@@ -13,20 +26,12 @@ def list_lots(search: Optional[str] = None, statut: Optional[str] = None) -> Lis
             base_select = (
                 """
                 SELECT l.id, l.type_animal, l.date_arrivee, l.nombre_initial, l.poids_moyen, l.source, l.statut, l.remarque, l.cout_initial, -- AJOUT de cout_initial
-                COALESCE(m.q,0) AS morts,
-                COALESCE(v.q,0) AS vendus,
-                COALESCE(a.q,0) AS abattus, 
-                (l.nombre_initial - COALESCE(m.q,0) - COALESCE(v.q,0) - COALESCE(a.q,0)) AS restants
+                COALESCE(c.morts,0) AS morts,
+                COALESCE(c.vendus,0) AS vendus,
+                COALESCE(c.abattus,0) AS abattus, 
+                (l.nombre_initial - COALESCE(c.morts,0) - COALESCE(c.vendus,0) - COALESCE(c.abattus,0)) AS restants
                 FROM lots l
-                LEFT JOIN (
-                    SELECT lot_id, SUM(quantite) AS q FROM mortalites GROUP BY lot_id
-                ) m ON m.lot_id = l.id
-                LEFT JOIN (
-                    SELECT lot_id, SUM(quantite) AS q FROM ventes_animaux GROUP BY lot_id
-                ) v ON v.lot_id = l.id
-                LEFT JOIN (
-                    SELECT lot_id, SUM(quantite) AS q FROM abattages GROUP BY lot_id
-                ) a ON a.lot_id = l.id 
+                LEFT JOIN lot_counters c ON c.lot_id = l.id
                 """
             )
             
@@ -38,19 +43,32 @@ def list_lots(search: Optional[str] = None, statut: Optional[str] = None) -> Lis
             if statut:
                 conditions.append("l.statut = %s")
                 params.append(statut)
+
+            # 1b. Filtre par Espèce (si spécifié)
+            if type_animal:
+                conditions.append("l.type_animal = %s")
+                params.append(type_animal)
                 
             # 2. Filtre par Recherche textuelle (si spécifié)
             if search:
                 like = f"%{search}%"
                 conditions.append("(l.type_animal LIKE %s OR l.source LIKE %s OR l.statut LIKE %s)")
                 params.extend([like, like, like])
+
+            # 3. Page suivante (ordre l.id DESC)
+            if after:
+                conditions.append("l.id < %s")
+                params.append(after[0])
             
-            # 3. Construction de la requête finale
+            # 4. Construction de la requête finale
             full_query = base_select
             if conditions:
                 full_query += " WHERE " + " AND ".join(conditions) 
             
             full_query += " ORDER BY l.id DESC"
+            if limit:
+                full_query += " LIMIT %s"
+                params.append(int(limit))
             
             cur.execute(full_query, tuple(params))
             
@@ -84,6 +102,7 @@ def create_lot(
                 (type_animal, date_arrivee, nombre_initial, poids_moyen, source, statut, remarque, cout_initial),
             )
             conn.commit()
+            after_commit(invalidate_kpis)
             return cur.lastrowid
     finally:
         conn.close()
@@ -116,6 +135,7 @@ def update_lot(
                 (type_animal, date_arrivee, nombre_initial, poids_moyen, source, statut, remarque, cout_initial, id_),
             )
             conn.commit()
+            after_commit(invalidate_kpis)
     finally:
         conn.close()
 
@@ -147,6 +167,7 @@ def close_lot(id_: int, statut: str = "Vendu") -> None:
         with conn.cursor() as cur:
             cur.execute("UPDATE lots SET statut=%s WHERE id=%s", (statut, id_))
             conn.commit()
+            after_commit(invalidate_kpis)
     finally:
         conn.close()
 
@@ -172,10 +193,13 @@ def delete_lot(lot_id: int):
         conn = get_connection()
         cursor = conn.cursor()
         
+        # Les dépenses/recettes du lot passent sans lot : leur cumul mensuel aussi
+        detach_lot(cursor, lot_id)
         # Supprime le lot principal
         cursor.execute("DELETE FROM lots WHERE id = %s", (lot_id,))
         
         conn.commit()
+        after_commit(invalidate_kpis)
         
     except Exception as e:
         print(f"Erreur lors de la suppression du lot {lot_id} : {e}")
@@ -190,6 +214,8 @@ def check_and_close_lot(lot_id: int):
     """
     Vérifie si un lot n'a plus d'animaux restants et met à jour son statut
     à 'Terminé' si la quantité restante est <= 0 et que le statut actuel est 'Actif'.
+    Appelée dans un transaction(), elle en réutilise la connexion et le commit ; une
+    erreur remonte telle quelle à l'appelant, qui annule l'événement entier.
     """
     conn = get_connection()
     try:
@@ -198,12 +224,10 @@ def check_and_close_lot(lot_id: int):
             cur.execute(
                 """
                 SELECT 
-                    (l.nombre_initial - COALESCE(m.q, 0) - COALESCE(v.q, 0) - COALESCE(a.q, 0)) AS restants,
+                    (l.nombre_initial - COALESCE(c.morts, 0) - COALESCE(c.vendus, 0) - COALESCE(c.abattus, 0)) AS restants,
                     l.statut
                 FROM lots l
-                LEFT JOIN (SELECT lot_id, SUM(quantite) AS q FROM mortalites GROUP BY lot_id) m ON m.lot_id = l.id
-                LEFT JOIN (SELECT lot_id, SUM(quantite) AS q FROM ventes_animaux GROUP BY lot_id) v ON v.lot_id = l.id
-                LEFT JOIN (SELECT lot_id, SUM(quantite) AS q FROM abattages GROUP BY lot_id) a ON a.lot_id = l.id
+                LEFT JOIN lot_counters c ON c.lot_id = l.id
                 WHERE l.id = %s
                 """,
                 (lot_id,)
@@ -225,15 +249,9 @@ def check_and_close_lot(lot_id: int):
                     (new_statut, lot_id)
                 )
                 conn.commit()
+                after_commit(invalidate_kpis)
                 return True
                 
             return False
-            
-    except Exception as e:
-        print(f"Erreur lors de la vérification du statut du lot {lot_id}: {e}")
-        if conn:
-            conn.rollback()
-        return False
     finally:
-        if conn:
-            conn.close()
\ No newline at end of file
+        conn.close()
\ No newline at end of file
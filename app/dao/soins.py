@@ -1,34 +1,35 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 from app.db import get_connection
 
 
-def list_soins(lot_id: Optional[int] = None) -> List[Dict]:
+def list_soins(lot_id: Optional[int] = None, after: Optional[Tuple] = None, limit: Optional[int] = None) -> List[Dict]:
+	"""Liste des soins (avec l'espèce du lot); `after`=(date_soin, id) et `limit` paginent par clé."""
 	conn = get_connection()
 	try:
 		with conn.cursor(dictionary=True) as cur:
+			query = """
+				SELECT s.id, s.lot_id, s.date_soin, s.type_soin, s.description, s.cout, s.effectue_par,
+				       l.type_animal
+				FROM soins s
+				JOIN lots l ON l.id = s.lot_id
+			"""
+			conds = []
+			params: Tuple = ()
 			if lot_id:
-				cur.execute(
-					"""
-					SELECT s.id, s.lot_id, s.date_soin, s.type_soin, s.description, s.cout, s.effectue_par,
-					       l.type_animal
-					FROM soins s
-					JOIN lots l ON l.id = s.lot_id
-					WHERE s.lot_id=%s
-					ORDER BY s.date_soin DESC, s.id DESC
-					""",
-					(lot_id,),
-				)
-			else:
-				cur.execute(
-					"""
-					SELECT s.id, s.lot_id, s.date_soin, s.type_soin, s.description, s.cout, s.effectue_par,
-					       l.type_animal
-					FROM soins s
-					JOIN lots l ON l.id = s.lot_id
-					ORDER BY s.date_soin DESC, s.id DESC
-					"""
-				)
+				conds.append("s.lot_id=%s")
+				params += (lot_id,)
+			if after:
+				# Pagination par clé sur ORDER BY date_soin DESC, id DESC
+				conds.append("(s.date_soin < %s OR (s.date_soin = %s AND s.id < %s))")
+				params += (after[0], after[0], after[1])
+			if conds:
+				query += " WHERE " + " AND ".join(conds)
+			query += " ORDER BY s.date_soin DESC, s.id DESC"
+			if limit:
+				query += " LIMIT %s"
+				params += (int(limit),)
+			cur.execute(query, params)
 			return cur.fetchall()
 	finally:
 		conn.close()
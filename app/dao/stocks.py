@@ -1,15 +1,24 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
-from app.db import get_connection
+from app.dao.kpis import invalidate_kpis
+from app.db import after_commit, get_connection
 
 
-def list_stocks() -> List[Dict]:
+def list_stocks(after: Optional[Tuple] = None, limit: Optional[int] = None) -> List[Dict]:
+	"""Liste des articles par nom; `after`=(nom_produit, id) et `limit` paginent par clé."""
 	conn = get_connection()
 	try:
 		with conn.cursor(dictionary=True) as cur:
-			cur.execute(
-				"SELECT id, nom_produit, type_produit, quantite, unite, COALESCE(seuil_alerte, 0) AS seuil_alerte, date_ajout FROM stocks ORDER BY nom_produit ASC"
-			)
+			query = "SELECT id, nom_produit, type_produit, quantite, unite, COALESCE(seuil_alerte, 0) AS seuil_alerte, date_ajout FROM stocks"
+			params: Tuple = ()
+			if after:
+				query += " WHERE (nom_produit > %s OR (nom_produit = %s AND id > %s))"
+				params += (after[0], after[0], after[1])
+			query += " ORDER BY nom_produit ASC, id ASC"
+			if limit:
+				query += " LIMIT %s"
+				params += (int(limit),)
+			cur.execute(query, params)
 			return cur.fetchall()
 	finally:
 		conn.close()
@@ -24,6 +33,7 @@ def create_product(nom_produit: str, type_produit: str, quantite: int, unite: Op
 				(nom_produit, type_produit, quantite, unite, seuil),
 			)
 			conn.commit()
+			after_commit(invalidate_kpis)
 			return cur.lastrowid
 	finally:
 		conn.close()
@@ -37,6 +47,7 @@ def add_entry(stock_id: int, qty: int) -> None:
 		with conn.cursor() as cur:
 			cur.execute("UPDATE stocks SET quantite = quantite + %s WHERE id=%s", (qty, stock_id))
 			conn.commit()
+			after_commit(invalidate_kpis)
 	finally:
 		conn.close()
 
@@ -56,6 +67,7 @@ def add_exit(stock_id: int, qty: int) -> None:
 				raise ValueError("Stock insuffisant")
 			cur.execute("UPDATE stocks SET quantite = quantite - %s WHERE id=%s", (qty, stock_id))
 			conn.commit()
+			after_commit(invalidate_kpis)
 	finally:
 		conn.close()
 
@@ -68,6 +80,7 @@ def set_threshold(stock_id: int, seuil: int) -> None:
 		with conn.cursor() as cur:
 			cur.execute("UPDATE stocks SET seuil=%s WHERE id=%s", (seuil, stock_id))
 			conn.commit()
+			after_commit(invalidate_kpis)
 	finally:
 		conn.close()
 
@@ -1,21 +1,51 @@
+import functools
+import threading
+from contextlib import contextmanager
+
 import mysql.connector
-from mysql.connector import pooling
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 from app.config import get_config
+from app.pool import ConnectionPool
 
 
-_connection_pool: Optional[pooling.MySQLConnectionPool] = None
+# Moteurs disponibles (DB_BACKEND) : serveur MySQL, ou fichier SQLite local (DB_PATH)
+MYSQL = "mysql"
+SQLITE = "sqlite"
 
+# Pools nommés : la saisie (OLTP) ne partage pas ses connexions avec les rapports et
+# exports (REPORTING), qui les gardent longtemps
+OLTP = "oltp"
+REPORTING = "reporting"
 
-def init_connection_pool(pool_size: int = 5) -> None:
-	global _connection_pool
-	if _connection_pool is not None:
-		return
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+# Transaction, pool et scope d'annulation en cours pour le thread courant
+# (voir transaction(), use_pool() et cancellable())
+_local = threading.local()
+
+# Observateurs des requêtes exécutées (voir observe_queries())
+_query_listeners: List[Callable[[str, tuple], None]] = []
+
+
+def backend() -> str:
+	"""Moteur configuré : MYSQL ou SQLITE."""
+	name = get_config().db_backend
+	if name not in (MYSQL, SQLITE):
+		raise RuntimeError(f"DB_BACKEND inconnu : {name!r} (attendu : {MYSQL} ou {SQLITE})")
+	return name
+
+
+def require_mysql(feature: str) -> None:
+	"""Échoue clairement pour une fonction propre au serveur MySQL (sauvegardes, plans d'exécution...)."""
+	if backend() != MYSQL:
+		raise RuntimeError(f"{feature} : disponible uniquement avec MySQL (DB_BACKEND={MYSQL})")
+
+
+def _connect_args(with_database: bool = True) -> dict:
 	config = get_config()
-	_connection_pool = pooling.MySQLConnectionPool(
-		pool_name="farm_pool",
-		pool_size=pool_size,
+	args = dict(
 		host=config.db_host,
 		port=config.db_port,
 		database=config.db_name,
@@ -24,11 +54,630 @@ def init_connection_pool(pool_size: int = 5) -> None:
 		charset="utf8mb4",
 		collation="utf8mb4_general_ci",
 	)
+	if not with_database:
+		del args["database"]
+	return args
+
+
+def _reset_mysql(conn) -> None:
+	# Comme au retour dans un MySQLConnectionPool : résultat non lu vidé, transaction
+	# annulée et session remise à zéro (COM_RESET_CONNECTION)
+	if conn.unread_result:
+		conn.consume_results()
+	conn.reset_session()
+
+
+def _reset_sqlite(conn) -> None:
+	if conn.in_transaction:
+		conn.rollback()
+
+
+# Variable inconnue du serveur : MariaDB nomme max_statement_time (en secondes) la limite
+# que MySQL appelle max_execution_time (en ms)
+_ER_UNKNOWN_SYSTEM_VARIABLE = 1193
+
+
+def _set_time_limit(conn, ms: int) -> None:
+	"""Durée maximale (ms, 0 : sans limite) des SELECT de la session MySQL."""
+	with conn.cursor() as cur:
+		try:
+			cur.execute("SET SESSION max_execution_time = %s", (int(ms),))
+		except mysql.connector.Error as ex:
+			if ex.errno != _ER_UNKNOWN_SYSTEM_VARIABLE:
+				raise
+			cur.execute("SET SESSION max_statement_time = %s", (ms / 1000.0,))
+
+
+def _init_reporting_mysql(conn, max_execution_ms: int) -> None:
+	# Rapports : transactions en lecture seule (pas d'identifiant de transaction ni de
+	# verrou d'écriture côté InnoDB) et SELECT interrompus au-delà de la durée maximale
+	with conn.cursor() as cur:
+		cur.execute("SET SESSION TRANSACTION READ ONLY")
+	_set_time_limit(conn, max_execution_ms)
+
+
+def _init_reporting_sqlite(conn) -> None:
+	conn.raw.execute("PRAGMA query_only = ON")
+
+
+def _pool_sizes(name: str) -> Tuple[int, int]:
+	config = get_config()
+	if name == OLTP:
+		return config.db_pool_min, config.db_pool_max
+	if name == REPORTING:
+		return config.db_reporting_pool_min, config.db_reporting_pool_max
+	raise ValueError(f"Pool de connexions inconnu : {name!r} (attendu : {OLTP} ou {REPORTING})")
+
+
+def _create_pool(name: str, pool_size: Optional[int] = None) -> ConnectionPool:
+	config = get_config()
+	min_size, max_size = _pool_sizes(name)
+	max_size = pool_size or max_size
+	options = dict(
+		min_size=min(min_size, max_size),
+		max_size=max_size,
+		timeout=config.db_pool_timeout,
+		idle_timeout=config.db_pool_idle,
+		ping_after=config.db_pool_ping,
+	)
+	if backend() == SQLITE:
+		from app.sqlite_backend import connect
+
+		if name == REPORTING:
+			def open_reporting():
+				conn = connect(config.db_path)
+				_init_reporting_sqlite(conn)
+				return conn
+
+			# query_only reste actif sur la connexion après rollback
+			return ConnectionPool(open_reporting, reset=_reset_sqlite, **options)
+		# Fichier local : rien à valider par ping
+		return ConnectionPool(lambda: connect(config.db_path), reset=_reset_sqlite, **options)
+	args = _connect_args()
+	if name == REPORTING:
+		def open_reporting():
+			conn = mysql.connector.connect(**args)
+			_init_reporting_mysql(conn, config.db_reporting_max_execution_ms)
+			return conn
+
+		def reset_reporting(conn) -> None:
+			# reset_session() rétablit les valeurs globales : réglages de session réappliqués
+			_reset_mysql(conn)
+			_init_reporting_mysql(conn, config.db_reporting_max_execution_ms)
+
+		return ConnectionPool(
+			open_reporting,
+			ping=lambda conn: conn.ping(reconnect=False),
+			reset=reset_reporting,
+			**options,
+		)
+	return ConnectionPool(
+		lambda: mysql.connector.connect(**args),
+		ping=lambda conn: conn.ping(reconnect=False),
+		reset=_reset_mysql,
+		**options,
+	)
+
+
+def init_connection_pool(pool_size: Optional[int] = None, name: str = OLTP) -> None:
+	"""
+	Crée le pool `name` (OLTP : DB_POOL_MIN à DB_POOL_MAX connexions ; REPORTING :
+	DB_REPORTING_POOL_MIN à DB_REPORTING_POOL_MAX), ou d'au plus `pool_size` connexions.
+	Sans effet si le pool existe déjà. Les pools sont sinon créés au premier emprunt.
+	"""
+	with _pools_lock:
+		if name not in _pools:
+			_pools[name] = _create_pool(name, pool_size)
+
+
+def _pool(name: str) -> ConnectionPool:
+	pool = _pools.get(name)
+	if pool is None:
+		init_connection_pool(name=name)
+		pool = _pools[name]
+	return pool
+
+
+def pool_stats() -> Dict[str, Dict]:
+	"""Statistiques de chaque pool créé, par nom (voir ConnectionPool.stats())."""
+	with _pools_lock:
+		pools = dict(_pools)
+	return {name: pool.stats() for name, pool in pools.items()}
+
+
+def close_connection_pool() -> None:
+	with _pools_lock:
+		pools = list(_pools.values())
+		_pools.clear()
+	for pool in pools:
+		pool.close()
+
+
+@contextmanager
+def use_pool(name: str):
+	"""
+	Les get_connection() et transaction() du bloc, sur ce thread, empruntent au pool
+	`name` (OLTP par défaut). Une transaction() déjà ouverte garde sa connexion.
+	"""
+	_pool_sizes(name)
+	previous = getattr(_local, "pool", None)
+	_local.pool = name
+	try:
+		yield
+	finally:
+		_local.pool = previous
+
+
+def uses_pool(name: str):
+	"""Décorateur : la fonction s'exécute dans use_pool(name), sur le thread qui l'appelle."""
+	def decorate(fn):
+		@functools.wraps(fn)
+		def wrapper(*args, **kwargs):
+			with use_pool(name):
+				return fn(*args, **kwargs)
+		return wrapper
+	return decorate
+
+
+def lift_time_limit(conn) -> None:
+	"""
+	Lève la durée maximale des requêtes sur une connexion du pool REPORTING, pour un
+	export qui lit des tables entières ; rétablie quand la connexion revient au pool.
+	"""
+	if backend() == MYSQL:
+		_set_time_limit(conn, 0)
+
+
+class _SharedConnection:
+	"""
+	Connexion d'une transaction() prêtée à un DAO : commit() et close() sont différés
+	à la sortie du bloc transaction(), rollback() fait échouer toute la transaction.
+	"""
+
+	def __init__(self, conn, state: dict):
+		self._conn = conn
+		self._state = state
+
+	def commit(self) -> None:
+		pass
+
+	def rollback(self) -> None:
+		self._state["rollback_only"] = True
+
+	def close(self) -> None:
+		pass
+
+	def __getattr__(self, name):
+		return getattr(self._conn, name)
+
+
+class _ObservedCursor:
+	"""Curseur qui signale chaque requête exécutée aux observateurs enregistrés."""
+
+	def __init__(self, cursor):
+		self._cursor = cursor
+
+	def execute(self, operation, params=(), *args, **kwargs):
+		for listener in list(_query_listeners):
+			listener(operation, params)
+		return self._cursor.execute(operation, params, *args, **kwargs)
+
+	def executemany(self, operation, seq_params, *args, **kwargs):
+		for listener in list(_query_listeners):
+			listener(operation, seq_params)
+		return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self._cursor.close()
+
+	def __iter__(self):
+		return iter(self._cursor)
+
+	def __getattr__(self, name):
+		return getattr(self._cursor, name)
+
+
+class _ObservedConnection:
+	def __init__(self, conn):
+		self._conn = conn
+
+	def cursor(self, *args, **kwargs):
+		return _ObservedCursor(self._conn.cursor(*args, **kwargs))
 
+	def __getattr__(self, name):
+		return getattr(self._conn, name)
 
-def get_connection():
-	if _connection_pool is None:
-		init_connection_pool()
-	return _connection_pool.get_connection()
+
+@contextmanager
+def observe_queries():
+	"""
+	Enregistre les requêtes (sql, paramètres) exécutées via les connexions obtenues
+	pendant le bloc. Outil de diagnostic (plans d'exécution, comptage d'allers-retours).
+	"""
+	log: List[Tuple[str, tuple]] = []
+	listener = lambda sql, params: log.append((sql, params))
+	_query_listeners.append(listener)
+	try:
+		yield log
+	finally:
+		_query_listeners.remove(listener)
+
+
+class QueryCancelled(RuntimeError):
+	"""Requête interrompue : traitement annulé depuis l'interface (voir CancelScope)."""
+
+
+class QueryTimeout(QueryCancelled):
+	"""Requête interrompue : durée maximale de la fonction dépassée (voir query_timeout())."""
+
+
+def _interrupt(conn) -> None:
+	# Appelé depuis le thread qui annule, pendant que celui du traitement attend le serveur
+	if backend() == SQLITE:
+		conn.raw.interrupt()
+		return
+	# KILL QUERY depuis une connexion hors pool : celle du traitement est occupée
+	killer = open_connection()
+	try:
+		with killer.cursor() as cur:
+			cur.execute(f"KILL QUERY {int(conn.connection_id)}")
+	finally:
+		killer.close()
+
+
+class CancelScope:
+	"""
+	Traitement annulable : cancel(), appelable depuis n'importe quel thread, interrompt
+	la requête en cours sur chaque connexion empruntée dans cancellable(scope) (KILL QUERY,
+	interrupt() avec SQLite) ; la requête et les suivantes échouent par QueryCancelled.
+	Les connexions sont rendues au pool normalement, qui les remet à zéro.
+	"""
+
+	def __init__(self):
+		# Verrou tenu pendant l'interruption : une connexion ne peut pas être rendue
+		# au pool (et prêtée à un autre traitement) pendant qu'on tue sa requête
+		self._lock = threading.Lock()
+		self._targets: Dict[int, object] = {}  # connexions rattachées, par wrapper
+		self._children: List["CancelScope"] = []
+		self._error: Optional[Tuple[type, str]] = None
+
+	@property
+	def cancelled(self) -> bool:
+		return self._error is not None
+
+	def cancel(self, message: str = "Requête annulée", timeout: bool = False) -> None:
+		with self._lock:
+			if self._error is not None:
+				return
+			self._error = (QueryTimeout if timeout else QueryCancelled, message)
+			children = list(self._children)
+			for conn in self._targets.values():
+				try:
+					_interrupt(conn)
+				except Exception:
+					# Serveur injoignable : la prochaine requête échouera par check()
+					pass
+		for child in children:
+			child.cancel(message, timeout)
+
+	def check(self) -> None:
+		"""Lève QueryCancelled (ou QueryTimeout) si le traitement a été annulé."""
+		if self._error is not None:
+			cls, message = self._error
+			raise cls(message)
+
+	def _attach(self, key: int, conn) -> None:
+		with self._lock:
+			self.check()
+			self._targets[key] = conn
+
+	def _detach(self, key: int) -> None:
+		with self._lock:
+			self._targets.pop(key, None)
+
+	def _adopt(self, child: "CancelScope") -> None:
+		with self._lock:
+			self.check()
+			self._children.append(child)
+
+	def _disown(self, child: "CancelScope") -> None:
+		with self._lock:
+			if child in self._children:
+				self._children.remove(child)
+
+
+class _CancellableCursor:
+	"""Curseur qui traduit en QueryCancelled l'échec d'une requête interrompue par cancel()."""
+
+	def __init__(self, cursor, scope: CancelScope):
+		self._cursor = cursor
+		self._scope = scope
+
+	def _call(self, fn, *args, **kwargs):
+		self._scope.check()
+		try:
+			return fn(*args, **kwargs)
+		except Exception:
+			self._scope.check()
+			raise
+
+	def execute(self, *args, **kwargs):
+		return self._call(self._cursor.execute, *args, **kwargs)
+
+	def executemany(self, *args, **kwargs):
+		return self._call(self._cursor.executemany, *args, **kwargs)
+
+	def fetchone(self):
+		return self._call(self._cursor.fetchone)
+
+	def fetchmany(self, *args, **kwargs):
+		return self._call(self._cursor.fetchmany, *args, **kwargs)
+
+	def fetchall(self):
+		return self._call(self._cursor.fetchall)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self._cursor.close()
+
+	def __iter__(self):
+		return iter(self.fetchone, None)
+
+	def __getattr__(self, name):
+		return getattr(self._cursor, name)
+
+
+class _CancellableConnection:
+	"""Connexion rattachée à un CancelScope jusqu'à close() ou detach()."""
+
+	def __init__(self, conn, scope: CancelScope):
+		scope._attach(id(self), conn)
+		self._conn = conn
+		self._scope = scope
+
+	def cursor(self, *args, **kwargs):
+		return _CancellableCursor(self._conn.cursor(*args, **kwargs), self._scope)
+
+	def detach(self) -> None:
+		self._scope._detach(id(self))
+
+	def close(self) -> None:
+		# Détachée avant le retour au pool : cancel() ne peut plus viser la connexion
+		self.detach()
+		self._conn.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+	def __getattr__(self, name):
+		return getattr(self._conn, name)
+
+
+@contextmanager
+def cancellable(scope: Optional[CancelScope] = None, timeout: Optional[float] = None):
+	"""
+	Rattache à `scope` (créé si absent) les connexions empruntées par ce thread pendant
+	le bloc, et produit le scope. Avec `timeout` (s), le bloc est annulé par QueryTimeout
+	une fois ce délai écoulé. Imbriqué, le bloc est aussi annulé avec le scope englobant.
+	"""
+	parent = getattr(_local, "scope", None)
+	scope = scope or CancelScope()
+	if parent is not None:
+		parent._adopt(scope)
+	timer = None
+	if timeout:
+		timer = threading.Timer(timeout, scope.cancel, args=(f"Délai dépassé ({timeout:g} s)", True))
+		timer.daemon = True
+		timer.start()
+	_local.scope = scope
+	try:
+		yield scope
+	finally:
+		_local.scope = parent
+		if timer is not None:
+			timer.cancel()
+		if parent is not None:
+			parent._disown(scope)
+
+
+def query_timeout(seconds: float):
+	"""
+	Décorateur : les requêtes de la fonction sont interrompues par QueryTimeout au-delà
+	de `seconds` (0 : sans limite). QUERY_TIMEOUTS (ex. "lots_overview=120") remplace
+	cette valeur par nom de fonction.
+	"""
+	def decorate(fn):
+		@functools.wraps(fn)
+		def wrapper(*args, **kwargs):
+			limit = get_config().query_timeouts.get(fn.__name__, seconds)
+			with cancellable(timeout=limit or None):
+				return fn(*args, **kwargs)
+		return wrapper
+	return decorate
+
+
+@contextmanager
+def _attached(conns: list):
+	# Connexions hors pool (snapshot_connections) rattachées au scope du thread, s'il y en a un
+	scope = getattr(_local, "scope", None)
+	if scope is None:
+		yield conns
+		return
+	attached = []
+	try:
+		for conn in conns:
+			attached.append(_CancellableConnection(conn, scope))
+		yield attached
+	finally:
+		for conn in attached:
+			conn.detach()
+
+
+def _checkout(pool: Optional[str] = None):
+	name = pool or getattr(_local, "pool", None) or OLTP
+	conn = _pool(name).get_connection()
+	if _query_listeners:
+		conn = _ObservedConnection(conn)
+	scope = getattr(_local, "scope", None)
+	if scope is not None:
+		try:
+			conn = _CancellableConnection(conn, scope)
+		except BaseException:
+			# Traitement déjà annulé : la connexion retourne au pool
+			conn.close()
+			raise
+	return conn
+
+
+def get_connection(pool: Optional[str] = None):
+	"""
+	Retourne une connexion du pool `pool` (à défaut celui de use_pool(), sinon OLTP),
+	ou la connexion de la transaction() en cours sur ce thread : les DAO appelés dans
+	un transaction() la rejoignent implicitement.
+	"""
+	state = getattr(_local, "tx", None)
+	if state is not None:
+		return _SharedConnection(state["conn"], state)
+	return _checkout(pool)
+
+
+@contextmanager
+def transaction(pool: Optional[str] = None):
+	"""
+	Unité de travail : tous les appels DAO du bloc partagent une seule connexion
+	et sont validés par un unique commit à la sortie (rollback en cas d'exception).
+	Un transaction() imbriqué rejoint simplement la transaction englobante.
+	"""
+	state = getattr(_local, "tx", None)
+	if state is not None:
+		yield _SharedConnection(state["conn"], state)
+		return
+	conn = _checkout(pool)
+	state = {"conn": conn, "rollback_only": False, "after_commit": []}
+	_local.tx = state
+	try:
+		yield _SharedConnection(conn, state)
+		if state["rollback_only"]:
+			raise RuntimeError("Transaction annulée par une opération imbriquée")
+		conn.commit()
+	except BaseException:
+		conn.rollback()
+		raise
+	finally:
+		_local.tx = None
+		conn.close()
+	for callback in state["after_commit"]:
+		callback()
+
+
+def after_commit(callback: Callable[[], None]) -> None:
+	"""
+	Appelle callback() une fois les écritures validées : au commit du transaction()
+	en cours sur ce thread (jamais après un rollback), sinon immédiatement.
+	Sert à invalider les caches dérivés de la base (KPI du tableau de bord).
+	"""
+	state = getattr(_local, "tx", None)
+	if state is None:
+		callback()
+	else:
+		state["after_commit"].append(callback)
+
+
+def open_connection(with_database: bool = True):
+	"""
+	Connexion hors pool, pour les traitements de masse (exports, sauvegardes) qui
+	occupent une connexion longtemps : le pool reste disponible pour l'interface.
+	Avec with_database=False, aucune base n'est sélectionnée (création de la base).
+	"""
+	if backend() == SQLITE:
+		from app.sqlite_backend import connect
+
+		return connect(get_config().db_path)
+	return mysql.connector.connect(**_connect_args(with_database))
+
+
+# Erreur MySQL quand le privilège RELOAD manque pour FLUSH TABLES WITH READ LOCK
+_ER_SPECIFIC_ACCESS_DENIED = 1227
+
+
+@contextmanager
+def snapshot_connections(count: int):
+	"""
+	Ouvre `count` connexions hors pool, chacune dans une transaction
+	START TRANSACTION WITH CONSISTENT SNAPSHOT en lecture seule, et produit
+	(connexions, synchronisé).
+
+	Les instantanés sont ouverts sous FLUSH TABLES WITH READ LOCK, relâché aussitôt :
+	toutes les connexions voient alors exactement le même état de la base.
+	Sans le privilège RELOAD, ils sont ouverts l'un après l'autre sans verrou
+	(synchronisé = False) : chaque table reste cohérente, mais une écriture
+	concurrente peut séparer deux connexions.
+
+	Avec SQLite, chaque connexion fige son instantané WAL à sa première lecture,
+	l'une après l'autre (synchronisé = False).
+
+	Dans un cancellable(), les connexions sont rattachées à son scope.
+	"""
+	if backend() == SQLITE:
+		with _sqlite_snapshots(count) as conns, _attached(conns) as attached:
+			yield attached, False
+		return
+	conns = []
+	coordinator = open_connection()
+	try:
+		synchronized = True
+		with coordinator.cursor() as cur:
+			try:
+				cur.execute("FLUSH TABLES WITH READ LOCK")
+			except mysql.connector.Error as ex:
+				if ex.errno != _ER_SPECIFIC_ACCESS_DENIED:
+					raise
+				synchronized = False
+			try:
+				for _ in range(count):
+					conn = open_connection()
+					conns.append(conn)
+					with conn.cursor() as wcur:
+						wcur.execute("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+						wcur.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY")
+			finally:
+				if synchronized:
+					cur.execute("UNLOCK TABLES")
+		coordinator.close()
+		coordinator = None
+		with _attached(conns) as attached:
+			yield attached, synchronized
+	finally:
+		if coordinator is not None:
+			coordinator.close()
+		for conn in conns:
+			try:
+				conn.rollback()
+			finally:
+				conn.close()
 
 
+@contextmanager
+def _sqlite_snapshots(count: int):
+	conns = []
+	try:
+		for _ in range(count):
+			conn = open_connection()
+			conns.append(conn)
+			conn.raw.execute("BEGIN")
+			conn.raw.execute("SELECT COUNT(*) FROM sqlite_master").fetchall()
+		yield conns
+	finally:
+		for conn in conns:
+			try:
+				conn.rollback()
+			finally:
+				conn.close()
@@ -0,0 +1,186 @@
+import hashlib
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import mysql.connector
+
+from app.config import get_config
+from app.db import MYSQL, backend, open_connection
+from app.utils.sql_script import first_keyword, iter_statements
+
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[1] / "migrations"
+TRACKING_TABLE = "schema_migrations"
+
+_FILE_RE = re.compile(r"^(\d+)_.+\.sql$")
+_CREATE_DATABASE_RE = re.compile(r"^\s*CREATE\s+(DATABASE|SCHEMA)\b", re.IGNORECASE)
+
+_ER_BAD_DB = 1049
+_ER_NO_SUCH_TABLE = 1146
+# Objet déjà présent : une migration rejouée sur une base créée avant le suivi des
+# versions (ou depuis gestion_elevage.sql) ne doit pas échouer pour autant. Seules ces
+# erreurs sont ignorées : une table manquante (1146) reste une erreur, chaque migration
+# ne doit utiliser que des tables créées par une migration précédente (voir
+# tests/test_migrations.py)
+TOLERATED_ERRORS = {
+	1050,  # table existe déjà
+	1060,  # colonne en double
+	1061,  # nom d'index en double
+	1826,  # nom de clé étrangère en double
+}
+
+# Verrou nommé : deux instances lancées en même temps n'appliquent pas deux fois la même migration
+_LOCK_NAME = "farm_schema_migrations"
+_LOCK_TIMEOUT = 60
+
+_CREATE_TRACKING = f"""
+CREATE TABLE IF NOT EXISTS {TRACKING_TABLE} (
+	version INT PRIMARY KEY,
+	name VARCHAR(255) NOT NULL,
+	checksum CHAR(64) NOT NULL,
+	applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+	execution_ms INT NOT NULL DEFAULT 0
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+"""
+
+
+@dataclass
+class Migration:
+	version: int
+	name: str
+	path: Path
+	checksum: str
+
+
+def available_migrations(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+	"""Fichiers NNN_nom.sql du dossier, triés par version. Somme de contrôle indépendante des fins de ligne."""
+	migrations = []
+	if not directory.is_dir():
+		return migrations
+	for path in directory.glob("*.sql"):
+		m = _FILE_RE.match(path.name)
+		if not m:
+			continue
+		content = path.read_bytes().replace(b"\r\n", b"\n")
+		migrations.append(Migration(int(m.group(1)), path.name, path, hashlib.sha256(content).hexdigest()))
+	migrations.sort(key=lambda mig: mig.version)
+	versions = [mig.version for mig in migrations]
+	if len(set(versions)) != len(versions):
+		raise RuntimeError("Deux fichiers de migration portent le même numéro de version")
+	return migrations
+
+
+def _applied(conn) -> Optional[Dict[int, str]]:
+	"""{version: checksum} des migrations appliquées ; None si la table de suivi n'existe pas."""
+	try:
+		with conn.cursor() as cur:
+			cur.execute(f"SELECT version, checksum FROM {TRACKING_TABLE}")
+			return {int(v): c for v, c in cur.fetchall()}
+	except mysql.connector.Error as ex:
+		if ex.errno == _ER_NO_SUCH_TABLE:
+			return None
+		raise
+
+
+def _check_checksums(migrations: List[Migration], applied: Dict[int, str]) -> None:
+	changed = [m.name for m in migrations if m.version in applied and applied[m.version] != m.checksum]
+	if changed:
+		raise RuntimeError(
+			"Migration(s) modifiée(s) après application : " + ", ".join(changed)
+			+ ". Ajoutez une nouvelle migration plutôt que de modifier une migration appliquée."
+		)
+
+
+def pending_migrations(migrations: Optional[List[Migration]] = None) -> List[Migration]:
+	"""
+	Migrations restant à appliquer. Une seule requête quand la base est à jour :
+	c'est la vérification faite au démarrage de l'application.
+	Toujours vide avec SQLite, dont le schéma est embarqué (app/sqlite_backend.py).
+	"""
+	if backend() != MYSQL:
+		return []
+	migrations = available_migrations() if migrations is None else migrations
+	try:
+		conn = open_connection()
+	except mysql.connector.Error as ex:
+		if ex.errno == _ER_BAD_DB:
+			return migrations
+		raise
+	try:
+		applied = _applied(conn)
+	finally:
+		conn.close()
+	if applied is None:
+		return migrations
+	_check_checksums(migrations, applied)
+	return [m for m in migrations if m.version not in applied]
+
+
+def _run_migration(cur, migration: Migration) -> None:
+	with open(migration.path, encoding="utf-8") as f:
+		for stmt in iter_statements(f):
+			keyword = first_keyword(stmt)
+			# La base visée est celle de la configuration (DB_NAME), pas celle écrite dans le fichier
+			if keyword == "USE" or _CREATE_DATABASE_RE.match(stmt):
+				continue
+			try:
+				cur.execute(stmt)
+			except mysql.connector.Error as ex:
+				if ex.errno not in TOLERATED_ERRORS:
+					raise RuntimeError(f"{migration.name} : {ex} — instruction : {stmt[:200]}") from ex
+			if cur.with_rows:
+				cur.fetchall()
+
+
+def migrate(progress: Optional[Callable[[str], None]] = None) -> List[str]:
+	"""
+	Applique les migrations en attente, dans l'ordre, et les enregistre dans
+	schema_migrations (version, somme de contrôle, date, durée). Crée la base si besoin.
+	Ne fait qu'une requête si tout est déjà appliqué. Retourne les fichiers appliqués.
+	Avec SQLite, ouvre seulement la base : le schéma embarqué est créé à la première connexion.
+	"""
+	if backend() != MYSQL:
+		open_connection().close()
+		return []
+	migrations = available_migrations()
+	if not pending_migrations(migrations):
+		return []
+
+	config = get_config()
+	conn = open_connection(with_database=False)
+	conn.autocommit = True
+	applied_names = []
+	try:
+		with conn.cursor() as cur:
+			db = "`" + config.db_name.replace("`", "``") + "`"
+			cur.execute(f"CREATE DATABASE IF NOT EXISTS {db} CHARACTER SET utf8mb4 COLLATE utf8mb4_general_ci")
+			cur.execute(f"USE {db}")
+			cur.execute("SELECT GET_LOCK(%s, %s)", (_LOCK_NAME, _LOCK_TIMEOUT))
+			if cur.fetchone()[0] != 1:
+				raise RuntimeError("Migrations en cours dans une autre instance de l'application")
+			try:
+				cur.execute(_CREATE_TRACKING)
+				# Relu sous verrou : une autre instance a pu appliquer des migrations entre-temps
+				applied = _applied(conn) or {}
+				_check_checksums(migrations, applied)
+				for migration in migrations:
+					if migration.version in applied:
+						continue
+					if progress:
+						progress(migration.name)
+					t0 = time.perf_counter()
+					_run_migration(cur, migration)
+					cur.execute(
+						f"INSERT INTO {TRACKING_TABLE}(version, name, checksum, execution_ms) VALUES (%s, %s, %s, %s)",
+						(migration.version, migration.name, migration.checksum, int((time.perf_counter() - t0) * 1000)),
+					)
+					applied_names.append(migration.name)
+			finally:
+				cur.execute("SELECT RELEASE_LOCK(%s)", (_LOCK_NAME,))
+				cur.fetchall()
+	finally:
+		conn.close()
+	return applied_names
@@ -0,0 +1,227 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+
+class PoolTimeout(RuntimeError):
+	"""Aucune connexion libérée dans le délai d'attente : le pool est saturé."""
+
+
+class PooledConnection:
+	"""Connexion prêtée par ConnectionPool : close() la rend au pool au lieu de la fermer."""
+
+	def __init__(self, pool: "ConnectionPool", conn):
+		self._pool = pool
+		self._conn = conn
+
+	def close(self) -> None:
+		conn, self._conn = self._conn, None
+		if conn is not None:
+			self._pool.release(conn)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+	def __getattr__(self, name):
+		if self._conn is None:
+			raise RuntimeError("Connexion déjà rendue au pool")
+		return getattr(self._conn, name)
+
+
+class ConnectionPool:
+	"""
+	Pool élastique : `min_size` connexions ouvertes dès la création, jusqu'à `max_size`
+	ouvertes à la demande ; au-delà, get_connection() attend qu'une connexion soit rendue
+	(au plus `timeout` secondes, puis PoolTimeout). Les connexions au repos depuis plus de
+	`idle_timeout` secondes sont fermées tant qu'il en reste plus de `min_size`.
+
+	Une connexion restée au repos plus de `ping_after` secondes est validée par ping()
+	avant d'être prêtée (0 : à chaque emprunt) ; en échec, elle est remplacée. Le serveur
+	a pu la fermer entre-temps (wait_timeout, redémarrage). reset() est appelé au retour.
+	"""
+
+	def __init__(
+		self,
+		connect: Callable[[], object],
+		ping: Optional[Callable[[object], None]] = None,
+		reset: Optional[Callable[[object], None]] = None,
+		min_size: int = 1,
+		max_size: int = 5,
+		timeout: float = 10.0,
+		idle_timeout: float = 300.0,
+		ping_after: float = 5.0,
+	):
+		if max_size < 1 or min_size < 0 or min_size > max_size:
+			raise ValueError("Tailles de pool invalides (0 <= min <= max, max >= 1)")
+		self._connect = connect
+		self._ping = ping
+		self._reset = reset
+		self.min_size = min_size
+		self.max_size = max_size
+		self.timeout = timeout
+		self.idle_timeout = idle_timeout
+		self.ping_after = ping_after
+		# (connexion, rendue_à) ; emprunt et retour par la droite : les connexions
+		# chaudes servent d'abord, les plus anciennes vieillissent à gauche
+		self._idle: deque = deque()
+		self._cond = threading.Condition()
+		self._size = 0  # connexions ouvertes, prêtées ou au repos
+		self._in_use = 0
+		self._closed = False
+		self._metrics = {
+			"checkouts": 0,
+			"waits": 0,
+			"wait_time_total": 0.0,
+			"wait_time_max": 0.0,
+			"timeouts": 0,
+			"max_in_use": 0,
+			"created": 0,
+			"closed": 0,
+			"errors": 0,
+		}
+		for _ in range(min_size):
+			conn = self._open()
+			with self._cond:
+				self._size += 1
+				self._idle.append((conn, time.monotonic()))
+
+	def _open(self):
+		try:
+			conn = self._connect()
+		except Exception:
+			with self._cond:
+				self._metrics["errors"] += 1
+			raise
+		with self._cond:
+			self._metrics["created"] += 1
+		return conn
+
+	def _discard(self, conn) -> None:
+		try:
+			conn.close()
+		except Exception:
+			pass
+		with self._cond:
+			self._size -= 1
+			self._metrics["closed"] += 1
+			self._cond.notify()
+
+	def _shrink(self, now: float) -> list:
+		# Sous le verrou : retire les connexions au repos en trop depuis idle_timeout
+		expired = []
+		while self._idle and self._size - len(expired) > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+			expired.append(self._idle.popleft()[0])
+		return expired
+
+	def get_connection(self, timeout: Optional[float] = None) -> PooledConnection:
+		timeout = self.timeout if timeout is None else timeout
+		start = time.monotonic()
+		waited = False
+		while True:
+			conn = idle_since = None
+			opening = False
+			with self._cond:
+				if self._closed:
+					raise RuntimeError("Pool de connexions fermé")
+				while not self._idle and self._size >= self.max_size:
+					remaining = timeout - (time.monotonic() - start)
+					if remaining <= 0:
+						self._metrics["timeouts"] += 1
+						raise PoolTimeout(
+							f"Aucune connexion disponible après {timeout:g} s "
+							f"({self._in_use} connexions utilisées sur {self.max_size})"
+						)
+					waited = True
+					self._cond.wait(remaining)
+				if self._idle:
+					conn, idle_since = self._idle.pop()
+				else:
+					# Place réservée avant l'ouverture, faite hors verrou
+					self._size += 1
+					opening = True
+				expired = self._shrink(time.monotonic())
+			for old in expired:
+				self._discard(old)
+			if opening:
+				try:
+					conn = self._open()
+				except Exception:
+					with self._cond:
+						self._size -= 1
+						self._cond.notify()
+					raise
+			elif self._ping is not None and time.monotonic() - idle_since >= self.ping_after:
+				try:
+					self._ping(conn)
+				except Exception:
+					# Connexion morte (fermée par le serveur) : remplacée au tour suivant
+					with self._cond:
+						self._metrics["errors"] += 1
+					self._discard(conn)
+					continue
+			break
+		wait = time.monotonic() - start if waited else 0.0
+		with self._cond:
+			self._in_use += 1
+			m = self._metrics
+			m["checkouts"] += 1
+			m["max_in_use"] = max(m["max_in_use"], self._in_use)
+			if waited:
+				m["waits"] += 1
+				m["wait_time_total"] += wait
+				m["wait_time_max"] = max(m["wait_time_max"], wait)
+		return PooledConnection(self, conn)
+
+	def release(self, conn) -> None:
+		"""Remet la connexion dans le pool après reset() ; fermée si reset() échoue."""
+		with self._cond:
+			self._in_use -= 1
+		if self._reset is not None:
+			try:
+				self._reset(conn)
+			except Exception:
+				with self._cond:
+					self._metrics["errors"] += 1
+				self._discard(conn)
+				return
+		with self._cond:
+			if self._closed:
+				keep = False
+			else:
+				keep = True
+				self._idle.append((conn, time.monotonic()))
+				self._cond.notify()
+			expired = self._shrink(time.monotonic())
+		if not keep:
+			self._discard(conn)
+		for old in expired:
+			self._discard(old)
+
+	def stats(self) -> Dict:
+		"""
+		Compteurs depuis la création : emprunts, attentes (nombre, durées totale et maximale,
+		délais dépassés), connexions utilisées (maintenant et au plus haut), ouvertes,
+		créées, fermées et erreurs (connexion, ping, remise à zéro).
+		"""
+		with self._cond:
+			stats = dict(self._metrics)
+			stats.update(
+				size=self._size, idle=len(self._idle), in_use=self._in_use,
+				min_size=self.min_size, max_size=self.max_size,
+			)
+		stats["wait_time_avg"] = stats["wait_time_total"] / stats["waits"] if stats["waits"] else 0.0
+		return stats
+
+	def close(self) -> None:
+		"""Ferme les connexions au repos ; celles encore prêtées sont fermées à leur retour."""
+		with self._cond:
+			self._closed = True
+			idle = [conn for conn, _ in self._idle]
+			self._idle.clear()
+			self._cond.notify_all()
+		for conn in idle:
+			self._discard(conn)
@@ -1,60 +1,110 @@
 from typing import Dict, List, Optional
 
-from app.db import get_connection
+from app.db import REPORTING, get_connection, query_timeout, uses_pool
 
 
-def kpis_by_lot(lot_id: int) -> Dict[str, float]:
+@uses_pool(REPORTING)
+@query_timeout(60)
+def lots_profitability(lot_id: Optional[int] = None) -> List[Dict]:
+	"""
+	Compte de résultat de tous les lots (ou d'un seul) en une requête : effectifs depuis
+	lot_counters, coût des soins agrégé par lot, dépenses/recettes depuis finance_monthly.
+
+	Chaque ligne contient: id, type_animal, statut, initial, morts, vendus, abattus, restants,
+	mortalite_pct, cout_soins, depenses, recettes, marge (recettes - dépenses - soins)
+	et marge_par_tete (marge rapportée à l'effectif initial).
+	"""
+	lot_filter, soin_filter, fin_filter, params = "", "", "", ()
+	if lot_id:
+		# Filtre répété dans les sous-requêtes pour n'agréger que le lot demandé
+		soin_filter = " WHERE lot_id=%s"
+		fin_filter = " AND lot_id=%s"
+		lot_filter = " WHERE l.id=%s"
+		params = (lot_id, lot_id, lot_id)
 	conn = get_connection()
 	try:
 		with conn.cursor(dictionary=True) as cur:
-			cur.execute("SELECT nombre_initial, poids_moyen FROM lots WHERE id=%s", (lot_id,))
-			lot = cur.fetchone() or {"nombre_initial": 0, "poids_moyen": None}
-			cur.execute("SELECT COALESCE(SUM(quantite),0) AS morts FROM mortalites WHERE lot_id=%s", (lot_id,))
-			morts = cur.fetchone()["morts"]
-			cur.execute("SELECT COALESCE(SUM(quantite),0) AS vendus FROM ventes_animaux WHERE lot_id=%s", (lot_id,))
-			vendus = cur.fetchone()["vendus"]
-			cur.execute("SELECT COALESCE(SUM(cout),0) AS cout_soins FROM soins WHERE lot_id=%s", (lot_id,))
-			cout_soins = float(cur.fetchone()["cout_soins"])
-			cur.execute("SELECT COALESCE(SUM(montant),0) AS depenses FROM depenses WHERE lot_id=%s", (lot_id,))
-			depenses = float(cur.fetchone()["depenses"])
-			cur.execute("SELECT COALESCE(SUM(montant),0) AS recettes FROM recettes WHERE lot_id=%s", (lot_id,))
-			recettes = float(cur.fetchone()["recettes"])
-			restants = lot["nombre_initial"] - morts - vendus
-			mortalite_pct = (morts / lot["nombre_initial"]) * 100 if lot["nombre_initial"] else 0.0
-			marge = recettes - depenses
-			return {
-				"initial": float(lot["nombre_initial"]),
-				"morts": float(morts),
-				"vendus": float(vendus),
-				"restants": float(restants),
-				"mortalite_pct": float(mortalite_pct),
-				"depenses": depenses,
-				"recettes": recettes,
-				"marge": marge,
-			}
+			cur.execute(
+				f"""
+				SELECT l.id, l.type_animal, l.statut, l.nombre_initial AS initial,
+				  COALESCE(c.morts,0) AS morts,
+				  COALESCE(c.vendus,0) AS vendus,
+				  COALESCE(c.abattus,0) AS abattus,
+				  COALESCE(s.cout,0) AS cout_soins,
+				  COALESCE(f.depenses,0) AS depenses,
+				  COALESCE(f.recettes,0) AS recettes
+				FROM lots l
+				LEFT JOIN lot_counters c ON c.lot_id=l.id
+				LEFT JOIN (SELECT lot_id, SUM(cout) AS cout FROM soins{soin_filter} GROUP BY lot_id) s ON s.lot_id=l.id
+				LEFT JOIN (
+				  SELECT lot_id,
+				    SUM(CASE WHEN sens='depense' THEN total ELSE 0 END) AS depenses,
+				    SUM(CASE WHEN sens='recette' THEN total ELSE 0 END) AS recettes
+				  FROM finance_monthly WHERE lot_id > 0{fin_filter} GROUP BY lot_id
+				) f ON f.lot_id=l.id{lot_filter}
+				ORDER BY l.id DESC
+				""",
+				params,
+			)
+			rows = cur.fetchall()
 	finally:
 		conn.close()
+	for r in rows:
+		initial = int(r["initial"] or 0)
+		r["initial"] = initial
+		for k in ("morts", "vendus", "abattus"):
+			r[k] = int(r[k])
+		for k in ("cout_soins", "depenses", "recettes"):
+			r[k] = float(r[k])
+		r["restants"] = initial - r["morts"] - r["vendus"] - r["abattus"]
+		r["mortalite_pct"] = (r["morts"] / initial) * 100 if initial else 0.0
+		r["marge"] = r["recettes"] - r["depenses"] - r["cout_soins"]
+		r["marge_par_tete"] = r["marge"] / initial if initial else 0.0
+	return rows
 
 
+@uses_pool(REPORTING)
+@query_timeout(30)
+def kpis_by_lot(lot_id: int) -> Dict[str, float]:
+	rows = lots_profitability(lot_id)
+	if not rows:
+		rows = [{"initial": 0, "morts": 0, "vendus": 0, "abattus": 0, "restants": 0, "mortalite_pct": 0.0,
+			"cout_soins": 0.0, "depenses": 0.0, "recettes": 0.0, "marge": 0.0, "marge_par_tete": 0.0}]
+	r = rows[0]
+	return {
+		k: float(r[k])
+		for k in ("initial", "morts", "vendus", "abattus", "restants", "mortalite_pct",
+			"cout_soins", "depenses", "recettes", "marge", "marge_par_tete")
+	}
+
+
+@uses_pool(REPORTING)
+@query_timeout(30)
 def monthly_summary(year: int, month: int) -> Dict[str, float]:
+	# Lu dans le cumul finance_monthly : quelques lignes au lieu de toutes les transactions du mois
 	conn = get_connection()
 	try:
 		with conn.cursor(dictionary=True) as cur:
 			cur.execute(
-				"SELECT COALESCE(SUM(montant),0) AS s FROM depenses WHERE YEAR(date_depense)=%s AND MONTH(date_depense)=%s",
-				(year, month),
-			)
-			dep = float(cur.fetchone()["s"]) 
-			cur.execute(
-				"SELECT COALESCE(SUM(montant),0) AS s FROM recettes WHERE YEAR(date_recette)=%s AND MONTH(date_recette)=%s",
+				"""
+				SELECT
+				  COALESCE(SUM(CASE WHEN sens='depense' THEN total END),0) AS dep,
+				  COALESCE(SUM(CASE WHEN sens='recette' THEN total END),0) AS rec
+				FROM finance_monthly
+				WHERE annee=%s AND mois=%s
+				""",
 				(year, month),
 			)
-			rec = float(cur.fetchone()["s"]) 
+			row = cur.fetchone()
+			dep = float(row["dep"])
+			rec = float(row["rec"])
 			return {"depenses": dep, "recettes": rec, "solde": rec - dep}
 	finally:
 		conn.close()
 
 
+@uses_pool(REPORTING)
+@query_timeout(60)
 def lots_overview() -> List[Dict]:
 	conn = get_connection()
 	try:
@@ -62,12 +112,12 @@ def lots_overview() -> List[Dict]:
 			cur.execute(
 				"""
 				SELECT l.id, l.type_animal, l.nombre_initial,
-				  COALESCE(m.q,0) AS morts,
-				  COALESCE(v.q,0) AS vendus,
-				  (l.nombre_initial - COALESCE(m.q,0) - COALESCE(v.q,0)) AS restants
+				  COALESCE(c.morts,0) AS morts,
+				  COALESCE(c.vendus,0) AS vendus,
+				  COALESCE(c.abattus,0) AS abattus,
+				  (l.nombre_initial - COALESCE(c.morts,0) - COALESCE(c.vendus,0) - COALESCE(c.abattus,0)) AS restants
 				FROM lots l
-				LEFT JOIN (SELECT lot_id, SUM(quantite) AS q FROM mortalites GROUP BY lot_id) m ON m.lot_id=l.id
-				LEFT JOIN (SELECT lot_id, SUM(quantite) AS q FROM ventes_animaux GROUP BY lot_id) v ON v.lot_id=l.id
+				LEFT JOIN lot_counters c ON c.lot_id=l.id
 				ORDER BY l.id DESC
 				"""
 			)
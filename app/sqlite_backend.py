@@ -0,0 +1,518 @@
+import re
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Optional, Tuple
+
+
+# Attente maximale (secondes) d'un verrou d'écriture tenu par une autre connexion
+BUSY_TIMEOUT = 10.0
+
+# UPSERT sans cible de conflit (traduction de ON DUPLICATE KEY UPDATE) : SQLite 3.35+
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+# Version du schéma embarqué (PRAGMA user_version) ; à incrémenter avec un nouveau bloc de _SCHEMA
+SCHEMA_VERSION = 1
+
+# Schéma équivalent à gestion_elevage.sql + migrations. Pas de suivi des modifications
+# (updated_at, suppressions) : sauvegardes, restaurations et vérifications restent propres à MySQL.
+_SCHEMA = """
+BEGIN IMMEDIATE;
+
+CREATE TABLE IF NOT EXISTS utilisateurs (
+	id INTEGER PRIMARY KEY,
+	nom VARCHAR(100) NOT NULL,
+	email VARCHAR(100) NOT NULL UNIQUE COLLATE NOCASE,
+	mot_de_passe VARCHAR(255) NOT NULL,
+	role TEXT DEFAULT 'Fermier' CHECK (role IN ('Admin', 'Fermier', 'Veterinaire', 'Gestionnaire', 'Commercial')),
+	date_creation DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS lots (
+	id INTEGER PRIMARY KEY,
+	type_animal TEXT NOT NULL CHECK (type_animal IN ('Poulet', 'Porc')),
+	date_arrivee DATE NOT NULL,
+	nombre_initial INT NOT NULL,
+	poids_moyen FLOAT,
+	source VARCHAR(100),
+	statut TEXT DEFAULT 'Actif' CHECK (statut IN ('Actif', 'Vendu', 'Mort', 'Abattu', 'Terminé')),
+	remarque TEXT,
+	cout_initial FLOAT DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_lots_date_arrivee ON lots(date_arrivee);
+CREATE INDEX IF NOT EXISTS idx_lots_statut ON lots(statut);
+CREATE INDEX IF NOT EXISTS idx_lots_type ON lots(type_animal);
+
+CREATE TABLE IF NOT EXISTS mortalites (
+	id INTEGER PRIMARY KEY,
+	lot_id INT NOT NULL REFERENCES lots(id) ON DELETE CASCADE,
+	date_event DATE NOT NULL,
+	quantite INT NOT NULL,
+	motif VARCHAR(255)
+);
+CREATE INDEX IF NOT EXISTS idx_mortalites_lot_date ON mortalites(lot_id, date_event);
+CREATE INDEX IF NOT EXISTS idx_mortalites_date ON mortalites(date_event);
+
+CREATE TABLE IF NOT EXISTS clients (
+	id INTEGER PRIMARY KEY,
+	nom VARCHAR(100) NOT NULL,
+	telephone VARCHAR(20),
+	email VARCHAR(100),
+	adresse TEXT,
+	type_client TEXT DEFAULT 'Particulier' CHECK (type_client IN ('Particulier', 'Restaurant', 'Boucherie', 'Autre')),
+	date_creation DATETIME DEFAULT CURRENT_TIMESTAMP,
+	actif BOOLEAN DEFAULT TRUE
+);
+CREATE INDEX IF NOT EXISTS idx_clients_nom ON clients(nom);
+
+CREATE TABLE IF NOT EXISTS ventes_animaux (
+	id INTEGER PRIMARY KEY,
+	lot_id INT NOT NULL REFERENCES lots(id) ON DELETE CASCADE,
+	date_vente DATE NOT NULL,
+	quantite INT NOT NULL,
+	prix_unitaire FLOAT NOT NULL,
+	client VARCHAR(100),
+	client_id INT NULL REFERENCES clients(id) ON DELETE SET NULL,
+	moyen_paiement TEXT DEFAULT 'Espèces' CHECK (moyen_paiement IN ('Espèces', 'Chèque', 'Virement', 'Autre')),
+	statut_paiement TEXT DEFAULT 'Payé' CHECK (statut_paiement IN ('Payé', 'En attente', 'Partiel')),
+	notes TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_ventes_lot_date ON ventes_animaux(lot_id, date_vente);
+CREATE INDEX IF NOT EXISTS idx_ventes_date ON ventes_animaux(date_vente);
+CREATE INDEX IF NOT EXISTS idx_ventes_client ON ventes_animaux(client_id);
+
+CREATE TABLE IF NOT EXISTS abattages (
+	id INTEGER PRIMARY KEY,
+	lot_id INT NOT NULL REFERENCES lots(id) ON DELETE CASCADE,
+	date_abattage DATE NOT NULL,
+	quantite INT NOT NULL,
+	poids_unitaire FLOAT
+);
+CREATE INDEX IF NOT EXISTS idx_abattages_lot_date ON abattages(lot_id, date_abattage);
+CREATE INDEX IF NOT EXISTS idx_abattages_date ON abattages(date_abattage);
+
+CREATE TABLE IF NOT EXISTS lot_counters (
+	lot_id INT PRIMARY KEY REFERENCES lots(id) ON DELETE CASCADE,
+	morts INT NOT NULL DEFAULT 0,
+	vendus INT NOT NULL DEFAULT 0,
+	abattus INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS soins (
+	id INTEGER PRIMARY KEY,
+	lot_id INT NOT NULL REFERENCES lots(id) ON DELETE CASCADE,
+	date_soin DATE NOT NULL,
+	type_soin VARCHAR(100) NOT NULL,
+	description TEXT,
+	cout FLOAT DEFAULT 0,
+	effectue_par VARCHAR(100)
+);
+CREATE INDEX IF NOT EXISTS idx_soins_lot_date ON soins(lot_id, date_soin);
+CREATE INDEX IF NOT EXISTS idx_soins_date ON soins(date_soin);
+
+CREATE TABLE IF NOT EXISTS depenses (
+	id INTEGER PRIMARY KEY,
+	type_depense TEXT NOT NULL CHECK (type_depense IN ('Alimentation', 'Soin', 'Entretien', 'Autre')),
+	description TEXT,
+	montant FLOAT NOT NULL,
+	date_depense DATE NOT NULL,
+	lot_id INT NULL REFERENCES lots(id) ON DELETE SET NULL
+);
+CREATE INDEX IF NOT EXISTS idx_depenses_lot_date ON depenses(lot_id, date_depense);
+CREATE INDEX IF NOT EXISTS idx_depenses_date ON depenses(date_depense);
+
+CREATE TABLE IF NOT EXISTS recettes (
+	id INTEGER PRIMARY KEY,
+	type_recette TEXT NOT NULL CHECK (type_recette IN ('Vente', 'Produit dérivé', 'Autre')),
+	montant FLOAT NOT NULL,
+	date_recette DATE NOT NULL,
+	lot_id INT NULL REFERENCES lots(id) ON DELETE SET NULL,
+	client VARCHAR(100)
+);
+CREATE INDEX IF NOT EXISTS idx_recettes_lot_date ON recettes(lot_id, date_recette);
+CREATE INDEX IF NOT EXISTS idx_recettes_date ON recettes(date_recette);
+
+CREATE TABLE IF NOT EXISTS finance_monthly (
+	annee SMALLINT NOT NULL,
+	mois TINYINT NOT NULL,
+	lot_id INT NOT NULL DEFAULT 0,
+	sens TEXT NOT NULL CHECK (sens IN ('depense', 'recette')),
+	categorie VARCHAR(50) NOT NULL,
+	nb INT NOT NULL DEFAULT 0,
+	total DOUBLE NOT NULL DEFAULT 0,
+	PRIMARY KEY (annee, mois, lot_id, sens, categorie)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_finance_monthly_lot ON finance_monthly(lot_id);
+
+-- seuil (migration 003, saisi par le DAO) et seuil_alerte (gestion_elevage.sql, lu par les alertes)
+CREATE TABLE IF NOT EXISTS stocks (
+	id INTEGER PRIMARY KEY,
+	nom_produit VARCHAR(100) NOT NULL,
+	type_produit TEXT NOT NULL CHECK (type_produit IN ('Aliment', 'Médicament', 'Matériel')),
+	quantite INT DEFAULT 0,
+	unite VARCHAR(50),
+	seuil INT NULL DEFAULT 0,
+	seuil_alerte INT DEFAULT 10,
+	fournisseur VARCHAR(100),
+	date_ajout DATE DEFAULT CURRENT_DATE
+);
+CREATE INDEX IF NOT EXISTS idx_stocks_nom ON stocks(nom_produit);
+CREATE INDEX IF NOT EXISTS idx_stocks_seuil ON stocks(seuil_alerte, quantite);
+
+CREATE TABLE IF NOT EXISTS journal_activites (
+	id INTEGER PRIMARY KEY,
+	utilisateur_id INT NOT NULL REFERENCES utilisateurs(id) ON DELETE CASCADE,
+	action VARCHAR(255),
+	module VARCHAR(50),
+	details TEXT,
+	date_action DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_journal_user ON journal_activites(utilisateur_id);
+CREATE INDEX IF NOT EXISTS idx_journal_date ON journal_activites(date_action);
+
+CREATE TABLE IF NOT EXISTS soins_preconfigures (
+	id INTEGER PRIMARY KEY,
+	type_animal TEXT NOT NULL CHECK (type_animal IN ('Poulet', 'Porc')),
+	jour_application INT NOT NULL,
+	type_soin VARCHAR(100) NOT NULL,
+	description TEXT,
+	cout_estime FLOAT DEFAULT 0,
+	actif BOOLEAN DEFAULT TRUE,
+	date_creation DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_soins_preconfig_type_jour ON soins_preconfigures(type_animal, jour_application);
+
+CREATE TABLE IF NOT EXISTS parametres (
+	id INTEGER PRIMARY KEY,
+	cle VARCHAR(50) NOT NULL UNIQUE,
+	valeur VARCHAR(255),
+	description TEXT,
+	date_modification DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS produits_derives (
+	id INTEGER PRIMARY KEY,
+	type_produit TEXT NOT NULL CHECK (type_produit IN ('Œufs', 'Fumier', 'Plumes', 'Autre')),
+	quantite DECIMAL(10,2) NOT NULL,
+	unite VARCHAR(50) NOT NULL,
+	prix_unitaire FLOAT NOT NULL,
+	date_vente DATE NOT NULL,
+	client_id INT NULL REFERENCES clients(id) ON DELETE SET NULL,
+	client_nom VARCHAR(100),
+	montant_total FLOAT NOT NULL,
+	moyen_paiement TEXT DEFAULT 'Espèces' CHECK (moyen_paiement IN ('Espèces', 'Chèque', 'Virement', 'Autre')),
+	notes TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_produits_derives_date ON produits_derives(date_vente);
+
+INSERT INTO soins_preconfigures (type_animal, jour_application, type_soin, description, cout_estime)
+SELECT * FROM (VALUES
+	('Poulet', 1, 'Vaccin Marek', 'Vaccination contre la maladie de Marek (si poussin)', 500),
+	('Poulet', 7, 'Vaccin Gumboro', 'Première vaccination contre la maladie de Gumboro', 800),
+	('Poulet', 14, 'Vaccin Newcastle', 'Vaccination contre la maladie de Newcastle', 1000),
+	('Poulet', 21, 'Rappel Gumboro', 'Rappel vaccination Gumboro', 800),
+	('Poulet', 28, 'Vermifuge', 'Traitement vermifuge', 600),
+	('Poulet', 35, 'Complément Vitamines', 'Complément vitaminique pour croissance', 400),
+	('Porc', 0, 'Vaccin Circovirus', 'Vaccination contre le circovirus porcin à l''arrivée', 1500),
+	('Porc', 14, 'Vermifuge', 'Traitement vermifuge première fois', 800),
+	('Porc', 42, 'Vaccin Rouget', 'Vaccination contre le rouget', 1200),
+	('Porc', 70, 'Rappel Vaccins', 'Rappel des vaccinations principales', 1500)
+) WHERE NOT EXISTS (SELECT 1 FROM soins_preconfigures);
+
+INSERT OR IGNORE INTO parametres (cle, valeur, description) VALUES
+	('seuil_mortalite', '3', 'Seuil d''alerte mortalité en pourcentage'),
+	('duree_cycle_poulets', '47', 'Durée maximale cycle poulets en jours'),
+	('devise', 'FCFA', 'Devise utilisée dans l''application'),
+	('format_date', 'DD/MM/YYYY', 'Format d''affichage des dates'),
+	('alerte_stock_jours', '7', 'Nombre de jours avant alerte fin de cycle'),
+	('seuil_mortalite_critique', '5', 'Seuil critique de mortalité en pourcentage');
+
+PRAGMA user_version = 1;
+COMMIT;
+"""
+
+
+# ---------------------------------------------------------------------------
+# Traduction du dialecte MySQL utilisé par les DAO
+# ---------------------------------------------------------------------------
+
+# Littéraux et commentaires : masqués pendant la traduction pour ne jamais être réécrits
+_LITERAL_RE = re.compile(r"""'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*"|`(?:[^`]|``)*`|--[^\n]*|/\*.*?\*/""", re.DOTALL)
+_MASK_RE = re.compile(r"\x00(\d+)\x00")
+
+_DATE_PART_RE = re.compile(r"\b(YEAR|MONTH|DAY)\s*\(", re.IGNORECASE)
+_DATE_PART_FORMATS = {"YEAR": "%Y", "MONTH": "%m", "DAY": "%d"}
+_FOR_UPDATE_RE = re.compile(r"\s+FOR\s+UPDATE\s*;?\s*$", re.IGNORECASE)
+_UPSERT_RE = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE)
+_UPSERT_VALUES_RE = re.compile(r"\bVALUES\s*\(\s*(`?\w+`?)\s*\)", re.IGNORECASE)
+_INSERT_SELECT_RE = re.compile(r"^(\s*INSERT\s+INTO\s+[`\w]+\s*\([^)]*\)\s*)(SELECT\b.*)$", re.IGNORECASE | re.DOTALL)
+_TRUNCATE_RE = re.compile(r"^\s*TRUNCATE\s+(?:TABLE\s+)?", re.IGNORECASE)
+_INSERT_IGNORE_RE = re.compile(r"^\s*INSERT\s+IGNORE\b", re.IGNORECASE)
+_FK_CHECKS_RE = re.compile(r"^\s*SET\s+(?:SESSION\s+)?FOREIGN_KEY_CHECKS\s*=\s*(\w+)\s*;?\s*$", re.IGNORECASE)
+_SET_RE = re.compile(r"^\s*SET\b", re.IGNORECASE)
+_KEYWORD_RE = re.compile(r"^\s*(\w+)")
+
+_WRITE_KEYWORDS = {"INSERT", "UPDATE", "DELETE", "REPLACE", "CREATE", "DROP", "ALTER"}
+
+
+def _rewrite_date_parts(sql: str) -> str:
+	# YEAR(x) -> CAST(strftime('%Y', x) AS INTEGER), parenthèses imbriquées comprises
+	while True:
+		m = _DATE_PART_RE.search(sql)
+		if not m:
+			return sql
+		depth = 1
+		i = m.end()
+		while i < len(sql) and depth:
+			if sql[i] == "(":
+				depth += 1
+			elif sql[i] == ")":
+				depth -= 1
+			i += 1
+		if depth:
+			raise ValueError(f"Parenthèse non fermée après {m.group(1)} : {sql[:200]}")
+		inner = sql[m.end():i - 1]
+		fmt = _DATE_PART_FORMATS[m.group(1).upper()]
+		sql = f"{sql[:m.start()]}CAST(strftime('{fmt}', {inner}) AS INTEGER){sql[i:]}"
+
+
+@lru_cache(maxsize=1024)
+def translate(sql: str) -> Tuple[Optional[str], bool]:
+	"""
+	Traduit une requête écrite pour MySQL en SQLite. Retourne (requête, écriture) ; la requête
+	vaut None pour une instruction sans équivalent (SET de session), `écriture` indique qu'elle
+	doit ouvrir une transaction d'écriture (DML, DDL, SELECT ... FOR UPDATE).
+
+	Réécrit : %s en ?, YEAR()/MONTH()/DAY() en strftime(), ON DUPLICATE KEY UPDATE ... VALUES(col)
+	en ON CONFLICT DO UPDATE ... excluded.col, TRUNCATE en DELETE, INSERT IGNORE,
+	SET FOREIGN_KEY_CHECKS en PRAGMA foreign_keys ; supprime FOR UPDATE.
+	"""
+	literals = []
+
+	def mask(m):
+		literals.append(m.group(0))
+		return f"\x00{len(literals) - 1}\x00"
+
+	s = _LITERAL_RE.sub(mask, sql)
+
+	m = _FK_CHECKS_RE.match(s)
+	if m:
+		return f"PRAGMA foreign_keys = {'OFF' if m.group(1) in ('0', 'OFF', 'off') else 'ON'}", False
+	if _SET_RE.match(s):
+		return None, False
+
+	# Marqueurs du connecteur MySQL : %s -> ?, %% -> %
+	s = s.replace("%%", "\x01").replace("%s", "?").replace("\x01", "%")
+
+	locking = False
+	m = _FOR_UPDATE_RE.search(s)
+	if m:
+		# Le verrou de ligne devient le verrou d'écriture de la base (BEGIN IMMEDIATE)
+		s = s[:m.start()]
+		locking = True
+
+	s = _rewrite_date_parts(s)
+	s = _TRUNCATE_RE.sub("DELETE FROM ", s)
+	s = _INSERT_IGNORE_RE.sub("INSERT OR IGNORE", s)
+
+	m = _UPSERT_RE.search(s)
+	if m:
+		head, tail = s[:m.start()], s[m.end():]
+		select = _INSERT_SELECT_RE.match(head)
+		if select:
+			# INSERT ... SELECT ... ON CONFLICT : le WHERE lève l'ambiguïté avec un ON de jointure
+			head = f"{select.group(1)}SELECT * FROM ({select.group(2).rstrip()}) WHERE true "
+		s = head + "ON CONFLICT DO UPDATE SET" + _UPSERT_VALUES_RE.sub(r"excluded.\1", tail)
+
+	s = _MASK_RE.sub(lambda m: literals[int(m.group(1))], s)
+	keyword = _KEYWORD_RE.match(s)
+	writes = locking or bool(keyword and keyword.group(1).upper() in _WRITE_KEYWORDS)
+	return s, writes
+
+
+# ---------------------------------------------------------------------------
+# Connexions
+# ---------------------------------------------------------------------------
+
+def _convert_date(value: bytes):
+	try:
+		return date.fromisoformat(value.decode())
+	except ValueError:
+		return value.decode()
+
+
+def _convert_datetime(value: bytes):
+	try:
+		return datetime.fromisoformat(value.decode())
+	except ValueError:
+		return value.decode()
+
+
+_types_registered = False
+
+
+def _register_types() -> None:
+	# Mêmes types Python que le connecteur MySQL : date, datetime ; Decimal accepté en paramètre
+	global _types_registered
+	if _types_registered:
+		return
+	sqlite3.register_adapter(date, lambda d: d.isoformat())
+	sqlite3.register_adapter(datetime, lambda d: d.isoformat(" "))
+	sqlite3.register_adapter(Decimal, float)
+	sqlite3.register_converter("DATE", _convert_date)
+	sqlite3.register_converter("DATETIME", _convert_datetime)
+	sqlite3.register_converter("TIMESTAMP", _convert_datetime)
+	_types_registered = True
+
+
+def _dict_row(cursor, row) -> dict:
+	return {d[0]: v for d, v in zip(cursor.description, row)}
+
+
+class SQLiteCursor:
+	"""Curseur au comportement du connecteur MySQL (dictionary=True, with_rows, contexte `with`)."""
+
+	def __init__(self, conn: "SQLiteConnection", dictionary: bool = False):
+		self._conn = conn
+		self._dictionary = dictionary
+		self._cursor = self._new_cursor()
+
+	def _new_cursor(self) -> sqlite3.Cursor:
+		cursor = self._conn.raw.cursor()
+		if self._dictionary:
+			cursor.row_factory = _dict_row
+		return cursor
+
+	def _prepare(self, operation: str) -> Optional[str]:
+		sql, writes = translate(operation)
+		if sql is not None and writes and not self._conn.autocommit and not self._conn.raw.in_transaction:
+			# Prend d'emblée le verrou d'écriture : pas d'échec en cours de transaction si
+			# une autre connexion a écrit entre-temps (lecture puis écriture)
+			self._conn.raw.execute("BEGIN IMMEDIATE")
+		return sql
+
+	def execute(self, operation, params=()):
+		sql = self._prepare(operation)
+		if sql is None:
+			# Réglage de session MySQL sans équivalent : aucun résultat
+			self._cursor.close()
+			self._cursor = self._new_cursor()
+			return
+		self._cursor.execute(sql, tuple(params or ()))
+
+	def executemany(self, operation, seq_params):
+		sql = self._prepare(operation)
+		if sql is not None:
+			self._cursor.executemany(sql, seq_params)
+
+	def fetchone(self):
+		return self._cursor.fetchone()
+
+	def fetchmany(self, size: int = 1):
+		return self._cursor.fetchmany(size)
+
+	def fetchall(self):
+		return self._cursor.fetchall()
+
+	@property
+	def description(self):
+		return self._cursor.description
+
+	@property
+	def column_names(self):
+		return tuple(d[0] for d in self._cursor.description or ())
+
+	@property
+	def with_rows(self) -> bool:
+		return self._cursor.description is not None
+
+	@property
+	def rowcount(self) -> int:
+		return self._cursor.rowcount
+
+	@property
+	def lastrowid(self):
+		return self._cursor.lastrowid
+
+	def close(self) -> None:
+		self._cursor.close()
+
+	def __iter__(self):
+		return iter(self._cursor)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+class SQLiteConnection:
+	"""
+	Connexion SQLite présentée comme une connexion du connecteur MySQL : autocommit
+	désactivé par défaut (une écriture ouvre la transaction, commit()/rollback() la terminent).
+	"""
+
+	def __init__(self, raw: sqlite3.Connection):
+		self.raw = raw
+		self.autocommit = False
+
+	def cursor(self, dictionary: bool = False, buffered=None, **_kwargs) -> SQLiteCursor:
+		# buffered=False sans objet : un curseur SQLite lit déjà les lignes au fil de l'eau
+		return SQLiteCursor(self, dictionary=dictionary)
+
+	def commit(self) -> None:
+		self.raw.commit()
+
+	def rollback(self) -> None:
+		self.raw.rollback()
+
+	def consume_results(self) -> None:
+		pass
+
+	@property
+	def in_transaction(self) -> bool:
+		return self.raw.in_transaction
+
+	def close(self) -> None:
+		self.raw.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+def _connect_raw(path: str) -> sqlite3.Connection:
+	"""Ouvre la base (créée au besoin) en mode WAL et applique le schéma embarqué s'il manque."""
+	if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+		raise RuntimeError(
+			f"SQLite {sqlite3.sqlite_version} trop ancien : version "
+			+ ".".join(map(str, MIN_SQLITE_VERSION)) + " ou plus récente requise"
+		)
+	_register_types()
+	raw = sqlite3.connect(
+		path,
+		timeout=BUSY_TIMEOUT,
+		isolation_level=None,  # transactions pilotées par SQLiteCursor (BEGIN IMMEDIATE)
+		check_same_thread=False,  # passée d'un thread à l'autre par le pool, jamais utilisée simultanément
+		detect_types=sqlite3.PARSE_DECLTYPES,
+	)
+	try:
+		# WAL : les lectures ne bloquent pas l'écriture ; NORMAL reste sûr en WAL (pas de corruption)
+		raw.execute("PRAGMA journal_mode = WAL")
+		raw.execute("PRAGMA synchronous = NORMAL")
+		raw.execute("PRAGMA foreign_keys = ON")
+		if raw.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+			raw.executescript(_SCHEMA)
+	except Exception:
+		raw.close()
+		raise
+	return raw
+
+
+def connect(path: str) -> SQLiteConnection:
+	"""Équivalent de mysql.connector.connect pour le fichier `path`."""
+	return SQLiteConnection(_connect_raw(path))
@@ -1,12 +1,15 @@
-import subprocess
-import os
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from pathlib import Path
+from typing import Optional
 
-from app.config import get_config
-from app.utils.export import export_table_csv, export_table_excel
+from app.utils.export import export_table_csv, export_table_excel, export_all_tables
+from app.utils.parquet_export import export_analytics
 from app.utils.pdf import export_table_pdf
+from app.utils.backup import backup_database, read_manifest, restore_chain
+from app.utils.checksum import describe_diff, verify_backup
+from app.db import OLTP, REPORTING, pool_stats
+from app.ui.tasks import TaskRunner
 
 
 TABLES = [
@@ -15,6 +18,7 @@ TABLES = [
 	"soins",
 	"mortalites",
 	"ventes_animaux",
+	"abattages",
 	"depenses",
 	"recettes",
 	"stocks",
@@ -25,6 +29,10 @@ TABLES = [
 class BackupFrame(ttk.Frame):
 	def __init__(self, master):
 		super().__init__(master, padding=8)
+		self._tasks = TaskRunner(self)
+		self._busy = False
+		# Clé de la tâche en cours si elle peut être annulée (pas la restauration)
+		self._cancel_key: Optional[str] = None
 		self._build()
 
 	def _build(self):
@@ -45,14 +53,32 @@ class BackupFrame(ttk.Frame):
 			btne = ttk.Button(frm, text="Excel", command=lambda t=tbl: self._export_excel(t))
 			btne.pack(side=tk.LEFT)
 			row += 1
+		btn_all = ttk.Button(exp, text="Tout exporter (.zip)", command=self._export_all)
+		btn_all.grid(row=row, column=0, sticky="w", pady=(8, 0))
+		row += 1
+		btn_pq = ttk.Button(exp, text="Export analytique (Parquet)...", command=self._export_analytics)
+		btn_pq.grid(row=row, column=0, sticky="w", pady=(4, 0))
+		row += 1
+		self.progress = ttk.Progressbar(exp, mode="determinate", maximum=100, length=260)
+		self.progress.grid(row=row, column=0, sticky="w", pady=(8, 0))
+		self.btn_cancel = ttk.Button(exp, text="Annuler", command=self._cancel, state=tk.DISABLED)
+		self.btn_cancel.grid(row=row, column=1, sticky="w", padx=6, pady=(8, 0))
+		self.lbl_progress = ttk.Label(exp, text="")
+		self.lbl_progress.grid(row=row + 1, column=0, sticky="w")
 
 		# Backup / Restore SQL
 		br = ttk.LabelFrame(self, text="Sauvegarde / Restauration base", padding=8)
 		br.pack(fill=tk.X, pady=6)
-		btn_b = ttk.Button(br, text="Sauvegarder (.sql)", command=self._backup)
+		btn_b = ttk.Button(br, text="Sauvegarder (.sql.gz)", command=self._backup)
 		btn_b.pack(side=tk.LEFT, padx=4)
-		btn_r = ttk.Button(br, text="Restaurer (.sql)", command=self._restore)
+		btn_i = ttk.Button(br, text="Sauvegarde incrémentale", command=self._backup_incremental)
+		btn_i.pack(side=tk.LEFT, padx=4)
+		btn_r = ttk.Button(br, text="Restaurer...", command=self._restore)
 		btn_r.pack(side=tk.LEFT, padx=4)
+		btn_v = ttk.Button(br, text="Vérifier...", command=self._verify)
+		btn_v.pack(side=tk.LEFT, padx=4)
+		btn_p = ttk.Button(br, text="Connexions", command=self._pool_stats)
+		btn_p.pack(side=tk.LEFT, padx=4)
 
 		# Guide utilisateur
 		guide = ttk.LabelFrame(self, text="Guide utilisateur", padding=8)
@@ -61,72 +87,217 @@ class BackupFrame(ttk.Frame):
 		btn_g.pack(side=tk.LEFT, padx=4)
 
 	def _export_csv(self, table: str):
+		if self._busy:
+			messagebox.showinfo("Export", "Un export est déjà en cours")
+			return
 		path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV", "*.csv")], title=f"Exporter {table} en CSV")
 		if not path:
 			return
-		try:
-			export_table_csv(table, Path(path))
-			messagebox.showinfo("Export", f"{table} exporté en CSV")
-		except Exception as e:
-			messagebox.showerror("Erreur", str(e))
+		self._start_export(f"Export de {table}", "export")
+		self._tasks.submit(
+			"export", export_table_csv, table, Path(path),
+			on_success=lambda n: self._export_done(f"{table} exporté en CSV ({n} lignes)"),
+			on_error=self._export_failed,
+			on_progress=lambda p: self._show_progress(f"Export de {table}", p),
+		)
+
+	def _export_all(self):
+		if self._busy:
+			messagebox.showinfo("Export", "Un export est déjà en cours")
+			return
+		path = filedialog.asksaveasfilename(defaultextension=".zip", filetypes=[("Archive zip", "*.zip")], title="Exporter toutes les tables")
+		if not path:
+			return
+		self._start_export("Export de toutes les tables", "export")
+		self._tasks.submit(
+			"export", export_all_tables, TABLES, Path(path),
+			on_success=lambda m: self._export_done(
+				f"{len(m['tables'])} tables exportées ({sum(t['rows'] for t in m['tables'].values())} lignes)"
+			),
+			on_error=self._export_failed,
+			on_progress=lambda p: self._show_progress("Export de toutes les tables", p),
+		)
+
+	def _start_export(self, what: str, cancel_key: Optional[str] = None):
+		self._busy = True
+		self._cancel_key = cancel_key
+		if cancel_key:
+			self.btn_cancel.configure(state=tk.NORMAL)
+		self.progress.configure(mode="indeterminate")
+		self.progress.start(15)
+		self.lbl_progress.configure(text=f"{what}...")
+
+	def _show_progress(self, what: str, value, unit: str = "lignes"):
+		done, total = value
+		if total:
+			if str(self.progress.cget("mode")) != "determinate":
+				self.progress.stop()
+				self.progress.configure(mode="determinate")
+			self.progress["value"] = min(100.0, done * 100.0 / total)
+			self.lbl_progress.configure(text=f"{what} : {done}/{total} {unit}")
+		else:
+			self.lbl_progress.configure(text=f"{what} : {done} {unit}")
+
+	def _stop_export(self, text: str):
+		self._busy = False
+		self._cancel_key = None
+		self.btn_cancel.configure(state=tk.DISABLED)
+		self.progress.stop()
+		self.progress.configure(mode="determinate")
+		self.progress["value"] = 0
+		self.lbl_progress.configure(text=text)
+
+	def _export_analytics(self):
+		if self._busy:
+			messagebox.showinfo("Export", "Un export est déjà en cours")
+			return
+		path = filedialog.askdirectory(title="Dossier de l'export analytique (Parquet)")
+		if not path:
+			return
+		self._start_export("Export analytique", "export")
+		self._tasks.submit(
+			"export", export_analytics, Path(path),
+			on_success=lambda m: self._export_done(
+				f"{len(m['tables'])} tables exportées en Parquet ({sum(t['rows'] for t in m['tables'].values())} lignes)"
+			),
+			on_error=self._export_failed,
+			on_progress=lambda p: self._show_progress("Export analytique", p),
+		)
+
+	def _cancel(self):
+		# Requêtes en cours interrompues, connexions rendues au pool ; le résultat est ignoré.
+		# L'écran reste occupé jusqu'à la fin effective du worker (fichier encore ouvert)
+		if self._cancel_key:
+			self._tasks.cancel(self._cancel_key, on_stopped=lambda: self._stop_export("Opération annulée"))
+			self._cancel_key = None
+			self.btn_cancel.configure(state=tk.DISABLED)
+			self.lbl_progress.configure(text="Annulation...")
+
+	def _export_done(self, message: str):
+		self._stop_export(message)
+		messagebox.showinfo("Export", message)
+
+	def _export_failed(self, exc: BaseException):
+		self._stop_export("")
+		messagebox.showerror("Erreur", str(exc))
 
 	def _export_excel(self, table: str):
+		if self._busy:
+			messagebox.showinfo("Export", "Un export est déjà en cours")
+			return
 		path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel", "*.xlsx")], title=f"Exporter {table} en Excel")
 		if not path:
 			return
-		try:
-			export_table_excel(table, Path(path))
-			messagebox.showinfo("Export", f"{table} exporté en Excel")
-		except Exception as e:
-			messagebox.showerror("Erreur", str(e))
+		self._start_export(f"Export de {table}", "export")
+		self._tasks.submit(
+			"export", export_table_excel, table, Path(path),
+			on_success=lambda n: self._export_done(f"{table} exporté en Excel ({n} lignes)"),
+			on_error=self._export_failed,
+			on_progress=lambda p: self._show_progress(f"Export de {table}", p),
+		)
 
-	def _backup(self):
-		cfg = get_config()
-		path = filedialog.asksaveasfilename(defaultextension=".sql", filetypes=[("SQL", "*.sql")], title="Sauvegarder la base")
+	def _backup(self, parent: Optional[dict] = None):
+		if self._busy:
+			messagebox.showinfo("Backup", "Une opération est déjà en cours")
+			return
+		path = filedialog.asksaveasfilename(
+			defaultextension=".sql.gz", filetypes=[("SQL compressé", "*.sql.gz")],
+			title="Sauvegarde incrémentale" if parent else "Sauvegarder la base",
+		)
 		if not path:
 			return
-		cmd = [
-			"mysqldump",
-			f"-h{cfg.db_host}",
-			f"-P{cfg.db_port}",
-			f"-u{cfg.db_user}",
-			f"-p{cfg.db_password}",
-			cfg.db_name,
-		]
+		what = "Sauvegarde incrémentale" if parent else "Sauvegarde de la base"
+		self._start_export(what, "backup")
+		self._tasks.submit(
+			"backup", backup_database, Path(path), parent=parent,
+			on_success=lambda m: self._export_done(
+				f"{what} terminée ({len(m['tables'])} tables, {sum(m['tables'].values())} lignes"
+				+ (f", {sum(m['deleted'].values())} suppressions)" if parent else ")")
+			),
+			on_error=self._export_failed,
+			on_progress=lambda p: self._show_progress(what, p),
+		)
+
+	def _backup_incremental(self):
+		prev = filedialog.askopenfilename(
+			filetypes=[("SQL compressé", "*.sql.gz")], title="Choisir la dernière sauvegarde (complète ou incrémentale)"
+		)
+		if not prev:
+			return
 		try:
-			with open(path, "w", encoding="utf-8") as f:
-				proc = subprocess.run(cmd, stdout=f, stderr=subprocess.PIPE, text=True, shell=False)
-				if proc.returncode != 0:
-					raise RuntimeError(proc.stderr.strip() or "mysqldump a échoué")
-			messagebox.showinfo("Backup", "Sauvegarde terminée")
-		except FileNotFoundError:
-			messagebox.showerror("Erreur", "mysqldump introuvable. Ajoutez MySQL bin au PATH.")
+			parent = read_manifest(Path(prev))
 		except Exception as e:
 			messagebox.showerror("Erreur", str(e))
+			return
+		self._backup(parent)
 
 	def _restore(self):
-		cfg = get_config()
-		path = filedialog.askopenfilename(filetypes=[("SQL", "*.sql")], title="Choisir un fichier .sql")
+		if self._busy:
+			messagebox.showinfo("Restore", "Une opération est déjà en cours")
+			return
+		paths = filedialog.askopenfilenames(
+			filetypes=[("SQL", "*.sql *.sql.gz")], title="Choisir la sauvegarde complète et ses incrémentales"
+		)
+		if not paths:
+			return
+		if not messagebox.askyesno("Restaurer", "Les données actuelles seront remplacées. Continuer ?"):
+			return
+		self._start_export("Restauration")
+		self._tasks.submit(
+			"restore", restore_chain, [Path(p) for p in paths],
+			on_success=lambda chain: self._export_done(f"Restauration terminée ({max(len(chain), 1)} fichier(s))"),
+			on_error=self._export_failed,
+			# Progression en octets lus dans les fichiers, affichée en Mo
+			on_progress=lambda p: self._show_progress("Restauration", (p[0] >> 20, max(1, p[1] >> 20)), unit="Mo"),
+		)
+
+	def _verify(self):
+		if self._busy:
+			messagebox.showinfo("Vérifier", "Une opération est déjà en cours")
+			return
+		path = filedialog.askopenfilename(filetypes=[("SQL compressé", "*.sql.gz")], title="Choisir une sauvegarde complète")
 		if not path:
 			return
-		cmd = [
-			"mysql",
-			f"-h{cfg.db_host}",
-			f"-P{cfg.db_port}",
-			f"-u{cfg.db_user}",
-			f"-p{cfg.db_password}",
-			cfg.db_name,
-		]
-		try:
-			with open(path, "r", encoding="utf-8") as f:
-				proc = subprocess.run(cmd, stdin=f, stderr=subprocess.PIPE, text=True, shell=False)
-				if proc.returncode != 0:
-					raise RuntimeError(proc.stderr.strip() or "mysql restore a échoué")
-			messagebox.showinfo("Restore", "Restauration terminée")
-		except FileNotFoundError:
-			messagebox.showerror("Erreur", "mysql introuvable. Ajoutez MySQL bin au PATH.")
-		except Exception as e:
-			messagebox.showerror("Erreur", str(e))
+		self._start_export("Vérification", "verify")
+		self._tasks.submit(
+			"verify", verify_backup, Path(path),
+			on_success=self._verify_done,
+			on_error=self._export_failed,
+			on_progress=lambda p: self._show_progress("Vérification", p),
+		)
+
+	def _verify_done(self, diffs):
+		lines = describe_diff(diffs, "la sauvegarde", "la base")
+		self._stop_export("Sauvegarde identique à la base" if not diffs else f"{len(diffs)} table(s) différente(s)")
+		if diffs:
+			messagebox.showwarning("Vérifier", "\n".join(lines[:20]))
+		else:
+			messagebox.showinfo("Vérifier", "La sauvegarde correspond à la base.")
+
+	def _pool_stats(self):
+		# Dimensionnement des pools (saisie : DB_POOL_*, rapports : DB_REPORTING_POOL_*) d'après l'usage de la session
+		pools = pool_stats()
+		if not pools:
+			messagebox.showinfo("Connexions", "Pool de connexions non initialisé")
+			return
+		settings = {OLTP: "DB_POOL_MAX", REPORTING: "DB_REPORTING_POOL_MAX"}
+		labels = {OLTP: "Saisie", REPORTING: "Rapports et exports"}
+		lines = []
+		for name, s in pools.items():
+			if lines:
+				lines.append("")
+			lines += [
+				f"{labels.get(name, name)} ({name})",
+				f"Connexions ouvertes : {s['size']} (dont {s['idle']} au repos), limites {s['min_size']}-{s['max_size']}",
+				f"Utilisées : {s['in_use']} maintenant, {s['max_in_use']} au plus haut",
+				f"Emprunts : {s['checkouts']}, dont {s['waits']} avec attente"
+				f" (moyenne {s['wait_time_avg'] * 1000:.0f} ms, max {s['wait_time_max'] * 1000:.0f} ms)",
+				f"Délais dépassés : {s['timeouts']}",
+				f"Créées : {s['created']}, fermées : {s['closed']}, erreurs : {s['errors']}",
+			]
+			if s["waits"] or s["timeouts"]:
+				lines.append(f"Des emprunts ont attendu : augmenter {settings.get(name, 'DB_POOL_MAX')}.")
+		messagebox.showinfo("Connexions", "\n".join(lines))
 
 	def _guide(self):
 		path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF", "*.pdf")], title="Enregistrer le guide utilisateur")
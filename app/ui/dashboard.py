@@ -1,15 +1,30 @@
 import tkinter as tk
 from tkinter import ttk
 
-from app.dao.kpis import fetch_kpis
+from app.config import get_config
+from app.dao.kpis import get_kpis, cached_kpis
+from app.ui.tasks import TaskRunner
 
 
 class DashboardFrame(ttk.Frame):
     def __init__(self, master):
         super().__init__(master, padding=20) # Augmentation du padding pour une meilleure esthétique
         self.columnconfigure(0, weight=1) # Permet au contenu de s'étendre
+        self._tasks = TaskRunner(self) # Appels DAO hors du thread Tk
+        self._ttl_ms = max(1, get_config().kpi_cache_ttl) * 1000
+        self._auto_id = None
         self._build()
-        self._refresh()
+        # Affichage immédiat des dernières valeurs connues, puis mise à jour en arrière-plan
+        cached = cached_kpis()
+        if cached:
+            self._show(cached)
+        self._refresh(force=False)
+
+    def destroy(self):
+        if self._auto_id is not None:
+            self.after_cancel(self._auto_id)
+            self._auto_id = None
+        super().destroy()
 
     def _build(self):
         # Utilisation d'un style plus grand pour le titre
@@ -55,10 +70,20 @@ class DashboardFrame(ttk.Frame):
         
         return value_label # Retourne le label de valeur pour la mise à jour
 
-    def _refresh(self):
-        """Récupère les données via le DAO et met à jour les Labels."""
+    def _refresh(self, force: bool = True):
+        """
+        Lance la récupération des KPI en arrière-plan; les Labels sont mis à jour par _show.
+        Sans `force`, le cache est utilisé s'il a moins de KPI_CACHE_TTL secondes.
+        """
+        self._tasks.submit("refresh", get_kpis, 0 if force else None, on_success=self._show, on_error=self._show_error)
+        # Rafraîchissement périodique tant que le tableau de bord est affiché
+        if self._auto_id is not None:
+            self.after_cancel(self._auto_id)
+        self._auto_id = self.after(self._ttl_ms, self._refresh)
+
+    def _show(self, k: dict):
+        """Met à jour les Labels avec les KPI récupérés."""
         try:
-            k = fetch_kpis() # Appel au DAO
             self.lbl_lots.configure(text=f"{k['lots_actifs']}")
             self.lbl_low.configure(text=f"{k['stocks_low']}")
             self.lbl_dep.configure(text=f"{k['dep_mois']:.0f} XAF")
@@ -74,7 +99,10 @@ class DashboardFrame(ttk.Frame):
             self.lbl_mort.configure(text=f"{k['mort_30']}")
             
         except Exception as e:
-            # Gérer les erreurs de rafraîchissement (ex: BD déconnectée)
-            print(f"Erreur de rafraîchissement des KPI: {e}")
-            # Afficher un message d'erreur dans le tableau de bord si nécessaire
-            self.lbl_lots.configure(text="Erreur")
\ No newline at end of file
+            self._show_error(e)
+
+    def _show_error(self, e: BaseException):
+        # Gérer les erreurs de rafraîchissement (ex: BD déconnectée)
+        print(f"Erreur de rafraîchissement des KPI: {e}")
+        # Afficher un message d'erreur dans le tableau de bord si nécessaire
+        self.lbl_lots.configure(text="Erreur")
\ No newline at end of file
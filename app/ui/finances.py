@@ -12,9 +12,12 @@ from app.dao.finances import (
 	update_recette,
 	delete_recette,
 	summary,
+	summarize_rows,
 )
 from app.dao.lots import list_active_lots
 from app.utils.validators import is_valid_date, parse_positive_float
+from app.ui.tasks import TaskRunner
+from app.ui.paged_tree import PagedTreeview
 
 
 class FilterBar(ttk.Frame):
@@ -24,19 +27,25 @@ class FilterBar(ttk.Frame):
 		self.v_start = tk.StringVar()
 		self.v_end = tk.StringVar()
 		self.v_lot = tk.StringVar()
-		self._lots = list_active_lots()
-		self._lot_choices = ["(tous)"] + [f"{l['id']} - {l['type_animal']}" for l in self._lots]
+		self._lot_choices = ["(tous)"]
+		self._tasks = TaskRunner(self)
 
 		ttk.Label(self, text="Du").pack(side=tk.LEFT)
 		ttk.Entry(self, textvariable=self.v_start, width=12).pack(side=tk.LEFT, padx=4)
 		ttk.Label(self, text="au").pack(side=tk.LEFT)
 		ttk.Entry(self, textvariable=self.v_end, width=12).pack(side=tk.LEFT, padx=4)
 		ttk.Label(self, text="Lot").pack(side=tk.LEFT, padx=(8, 0))
-		cb = ttk.Combobox(self, textvariable=self.v_lot, values=self._lot_choices, state="readonly", width=18)
-		cb.current(0)
-		cb.pack(side=tk.LEFT, padx=4)
+		self._cb_lot = ttk.Combobox(self, textvariable=self.v_lot, values=self._lot_choices, state="readonly", width=18)
+		self._cb_lot.current(0)
+		self._cb_lot.pack(side=tk.LEFT, padx=4)
 		btn = ttk.Button(self, text="Appliquer", command=self._on_apply)
 		btn.pack(side=tk.LEFT, padx=8)
+		# La liste des lots est chargée en arrière-plan
+		self._tasks.submit("lots", list_active_lots, on_success=self._set_lots)
+
+	def _set_lots(self, lots: list):
+		self._lot_choices = ["(tous)"] + [f"{l['id']} - {l['type_animal']}" for l in lots]
+		self._cb_lot.configure(values=self._lot_choices)
 
 	def current_filters(self) -> dict:
 		lot_id: Optional[int] = None
@@ -208,6 +217,7 @@ class RecetteForm(tk.Toplevel):
 class FinancesFrame(ttk.Frame):
 	def __init__(self, master):
 		super().__init__(master, padding=8)
+		self._tasks = TaskRunner(self)
 		self._build()
 		self._refresh()
 
@@ -230,10 +240,17 @@ class FinancesFrame(ttk.Frame):
 		tk.Button(bar_d, text="Modifier", command=self._edit_dep).pack(side=tk.LEFT, padx=6)
 		tk.Button(bar_d, text="Supprimer", command=self._del_dep).pack(side=tk.LEFT)
 		cols_d = ("id", "type", "montant", "date", "lot", "desc")
-		self.tree_dep = ttk.Treeview(self.tab_dep, columns=cols_d, show="headings", height=14)
+		self.list_dep = PagedTreeview(
+			self.tab_dep, cols_d,
+			row_values=lambda d: (d["id"], d["type_depense"], d["montant"], str(d["date_depense"]), d.get("lot_id") or "", (d.get("description") or "")[:60]),
+			row_key=lambda d: (d["date_depense"], d["id"]),
+			on_page=lambda rows, first: self._on_first_page("dep", first),
+			height=14,
+		)
+		self.tree_dep = self.list_dep.tree
 		for k, t in zip(cols_d, ["ID", "Type", "Montant", "Date", "Lot", "Description"]):
 			self.tree_dep.heading(k, text=t)
-		self.tree_dep.pack(fill=tk.BOTH, expand=True, pady=6)
+		self.list_dep.pack(fill=tk.BOTH, expand=True, pady=6)
 
 		# Recettes
 		bar_r = ttk.Frame(self.tab_rec)
@@ -242,33 +259,60 @@ class FinancesFrame(ttk.Frame):
 		tk.Button(bar_r, text="Modifier", command=self._edit_rec).pack(side=tk.LEFT, padx=6)
 		tk.Button(bar_r, text="Supprimer", command=self._del_rec).pack(side=tk.LEFT)
 		cols_r = ("id", "type", "montant", "date", "lot", "client")
-		self.tree_rec = ttk.Treeview(self.tab_rec, columns=cols_r, show="headings", height=14)
+		self.list_rec = PagedTreeview(
+			self.tab_rec, cols_r,
+			row_values=lambda r: (r["id"], r["type_recette"], r["montant"], str(r["date_recette"]), r.get("lot_id") or "", r.get("client") or ""),
+			row_key=lambda r: (r["date_recette"], r["id"]),
+			on_page=lambda rows, first: self._on_first_page("rec", first),
+			height=14,
+		)
+		self.tree_rec = self.list_rec.tree
 		for k, t in zip(cols_r, ["ID", "Type", "Montant", "Date", "Lot", "Client"]):
 			self.tree_rec.heading(k, text=t)
-		self.tree_rec.pack(fill=tk.BOTH, expand=True, pady=6)
+		self.list_rec.pack(fill=tk.BOTH, expand=True, pady=6)
 
 		# Résumé
 		self.summary_label = ttk.Label(self, text="")
 		self.summary_label.pack(fill=tk.X, pady=(4, 0))
+		self.breakdown_label = ttk.Label(self, text="", foreground="#555")
+		self.breakdown_label.pack(fill=tk.X)
 
 	def _filters(self) -> dict:
 		return self.filter.current_filters()
 
 	def _refresh(self):
 		f = self._filters()
-		# Dépenses
-		for i in self.tree_dep.get_children():
-			self.tree_dep.delete(i)
-		for d in list_depenses(f.get("start"), f.get("end"), f.get("lot_id")):
-			self.tree_dep.insert("", tk.END, values=(d["id"], d["type_depense"], d["montant"], str(d["date_depense"]), d.get("lot_id") or "", (d.get("description") or "")[:60]))
-		# Recettes
-		for i in self.tree_rec.get_children():
-			self.tree_rec.delete(i)
-		for r in list_recettes(f.get("start"), f.get("end"), f.get("lot_id")):
-			self.tree_rec.insert("", tk.END, values=(r["id"], r["type_recette"], r["montant"], str(r["date_recette"]), r.get("lot_id") or "", r.get("client") or ""))
-		# Résumé
-		sumry = summary(f.get("start"), f.get("end"), f.get("lot_id"))
-		self.summary_label.configure(text=f"Dépenses: {sumry['depenses']:.0f} XAF    Recettes: {sumry['recettes']:.0f} XAF    Benefice: {sumry['solde']:.0f} XAF")
+		self._summary_filters = (f.get("start"), f.get("end"), f.get("lot_id"))
+		self._loaded_first = set()
+		self._tasks.cancel("summary")
+		start, end, lot_id = self._summary_filters
+		# Listes paginées (première page seulement); le résumé attend ces premières pages
+		self.list_dep.load(lambda after, limit: list_depenses(start, end, lot_id, after=after, limit=limit))
+		self.list_rec.load(lambda after, limit: list_recettes(start, end, lot_id, after=after, limit=limit))
+
+	def _on_first_page(self, which: str, first: bool):
+		if not first:
+			return
+		self._loaded_first.add(which)
+		if self._loaded_first != {"dep", "rec"}:
+			return
+		if self.list_dep.exhausted and self.list_rec.exhausted:
+			# Toutes les lignes de la période sont déjà à l'écran : pas de seconde lecture
+			self._show_summary(summarize_rows(self.list_dep.rows, self.list_rec.rows))
+		else:
+			self._tasks.submit("summary", summary, *self._summary_filters, on_success=self._show_summary)
+
+	def _show_summary(self, sumry: dict):
+		self.summary_label.configure(
+			text=f"Dépenses: {sumry['depenses']:.0f} XAF ({sumry['nb_depenses']})    "
+			f"Recettes: {sumry['recettes']:.0f} XAF ({sumry['nb_recettes']})    "
+			f"Benefice: {sumry['solde']:.0f} XAF"
+		)
+		parts = [f"{k}: {v:.0f}" for k, v in sorted(sumry["par_type_depense"].items(), key=lambda kv: -kv[1])]
+		parts_r = [f"{k}: {v:.0f}" for k, v in sorted(sumry["par_type_recette"].items(), key=lambda kv: -kv[1])]
+		self.breakdown_label.configure(
+			text=f"Dépenses par type — {', '.join(parts) or '-'}    Recettes par type — {', '.join(parts_r) or '-'}"
+		)
 
 	def _sel_dep_id(self) -> Optional[int]:
 		it = self.tree_dep.selection()
@@ -1,14 +1,17 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Tuple
 from datetime import date
 from pathlib import Path
 from tkinter import filedialog
 import time
+import functools
 from app.dao.lots import list_lots, create_lot, update_lot, get_lot, close_lot, delete_lot 
 from app.dao.lot_events import record_mortality, record_partial_sale, get_lot_counters, record_slaughter 
 from app.utils.validators import is_valid_date
 from app.utils.pdf import export_table_pdf, export_sale_receipt 
+from app.ui.paged_tree import PagedTreeview
+from app.ui.tasks import TaskRunner
 
 # ----------------------------------------------------------------------
 # --- FONCTION UTILITAIRE POUR LE CENTRAGE ---
@@ -26,6 +29,19 @@ def _center_toplevel(toplevel: tk.Toplevel):
     toplevel.focus_set()
 
 
+def lots_page_loader(espece: str, statut: str) -> Callable[[Optional[Tuple], int], List[Dict[str, Any]]]:
+    """
+    Chargeur de pages de LotsFrame pour les filtres affichés ("Tous" : sans filtre).
+    Chaque appel fetch(after, limit) lit une page de list_lots, compteurs inclus.
+    """
+    type_animal = espece if espece != "Tous" else None
+    statut = statut if statut != "Tous" else None
+
+    def fetch(after: Optional[Tuple], limit: int) -> List[Dict[str, Any]]:
+        return list_lots(type_animal=type_animal, statut=statut, after=after, limit=limit)
+    return fetch
+
+
 # ----------------------------------------------------------------------
 ## Classe LotForm (Formulaire d'Édition/Création)
 # ----------------------------------------------------------------------
@@ -41,6 +57,8 @@ class LotForm(tk.Toplevel):
 
         self._lot_id = lot_id       
         self._on_saved = on_saved
+        self._lot: Optional[Dict[str, Any]] = None
+        self._tasks = TaskRunner(self) # Appels DAO hors du thread Tk
 
         self.transient(master)
         self.grab_set()
@@ -129,11 +147,13 @@ class LotForm(tk.Toplevel):
         row += 1
         
         # Bouton Enregistrer
-        btn = ttk.Button(container, text="Enregistrer", command=self._save)
-        btn.grid(row=row, column=0, columnspan=2, pady=12, sticky="ew")
+        self.btn_save = ttk.Button(container, text="Enregistrer", command=self._save)
+        self.btn_save.grid(row=row, column=0, columnspan=2, pady=12, sticky="ew")
 
         # Logique d'édition : charger les données et bloquer les champs sensibles
         if lot_id:
+            # Enregistrement possible une fois le lot chargé
+            self.btn_save.config(state="disabled")
             self._load()
             # BLOCAGE DES CHAMPS SENSIBLES EN MODE ÉDITION
             self.date_entry.config(state="readonly")
@@ -141,19 +161,21 @@ class LotForm(tk.Toplevel):
             self.cb_type_animal.config(state="disabled")
 
     def _load(self):
-        """Charge les données du lot existant pour l'édition."""
-        try:
-            lot = get_lot(self._lot_id)
-        except Exception as e:
-            messagebox.showerror("Erreur DAO", f"Échec du chargement du lot : {e}")
-            self.destroy()
-            return
-            
+        """Charge en arrière-plan les données du lot existant pour l'édition."""
+        self._tasks.submit("load", get_lot, self._lot_id, on_success=self._fill, on_error=self._load_failed)
+
+    def _load_failed(self, e: BaseException):
+        messagebox.showerror("Erreur DAO", f"Échec du chargement du lot : {e}")
+        self.destroy()
+
+    def _fill(self, lot: Optional[Dict[str, Any]]):
+        """Remplit le formulaire avec le lot chargé."""
         if not lot:
             messagebox.showerror("Erreur", "Lot introuvable")
             self.destroy()
             return
             
+        self._lot = lot
         self.var_type.set(lot["type_animal"])
         self.var_date.set(str(lot["date_arrivee"]))
         self.var_nombre.set(lot["nombre_initial"]) 
@@ -162,6 +184,7 @@ class LotForm(tk.Toplevel):
         self.var_statut.set(lot["statut"]) 
         self.var_remarque.set(lot.get("remarque") or "") 
         self.var_cout_initial.set(str(lot.get("cout_initial", 0)))
+        self.btn_save.config(state="normal")
         
 
     def _save(self):
@@ -187,39 +210,50 @@ class LotForm(tk.Toplevel):
             messagebox.showwarning("Validation", "Format de date invalide (attendu : YYYY-MM-DD)")
             return
         
-        # Logique d'enregistrement
-        try:
-            if self._lot_id:
-                current_lot = get_lot(self._lot_id)
-                update_lot(
-                    self._lot_id,
-                    current_lot["type_animal"], 
-                    str(current_lot["date_arrivee"]),
-                    current_lot["nombre_initial"],
-                    poids,
-                    self.var_source.get() or None,
-                    self.var_statut.get(), 
-                    self.var_remarque.get() or None,
-                    cout_initial,
-                )
-            else:
-                create_lot(
-                    self.var_type.get(),
-                    self.var_date.get(),
-                    int(self.var_nombre.get()),
-                    poids,
-                    self.var_source.get() or None,
-                    "Actif", 
-                    self.var_remarque.get() or None,
-                    cout_initial,
-                )
-        except Exception as e:
-            messagebox.showerror("Erreur DAO", f"Échec de l'enregistrement du lot : {e}")
-            return
-            
+        # Logique d'enregistrement, hors du thread Tk
+        self.btn_save.config(state="disabled")
+        if self._lot_id:
+            # Champs verrouillés en édition : ceux du lot chargé par _load()
+            current_lot = self._lot
+            self._tasks.submit(
+                "save",
+                update_lot,
+                self._lot_id,
+                current_lot["type_animal"],
+                str(current_lot["date_arrivee"]),
+                current_lot["nombre_initial"],
+                poids,
+                self.var_source.get() or None,
+                self.var_statut.get(),
+                self.var_remarque.get() or None,
+                cout_initial,
+                on_success=self._saved,
+                on_error=self._save_failed,
+            )
+        else:
+            self._tasks.submit(
+                "save",
+                create_lot,
+                self.var_type.get(),
+                self.var_date.get(),
+                int(self.var_nombre.get()),
+                poids,
+                self.var_source.get() or None,
+                "Actif",
+                self.var_remarque.get() or None,
+                cout_initial,
+                on_success=self._saved,
+                on_error=self._save_failed,
+            )
+
+    def _saved(self, _result):
         self._on_saved()
         self.destroy()
 
+    def _save_failed(self, e: BaseException):
+        self.btn_save.config(state="normal")
+        messagebox.showerror("Erreur DAO", f"Échec de l'enregistrement du lot : {e}")
+
 #Classe LotsFrame (Vue Principale)
 
 class LotsFrame(ttk.Frame):
@@ -231,6 +265,7 @@ class LotsFrame(ttk.Frame):
         
         self.columnconfigure(0, weight=1)
         self.rowconfigure(2, weight=1) 
+        self._tasks = TaskRunner(self) # Appels DAO hors du thread Tk
         
         self._build()
         self._refresh()
@@ -288,9 +323,13 @@ class LotsFrame(ttk.Frame):
         
         ttk.Separator(toolbar, orient=tk.VERTICAL).pack(side=tk.LEFT, padx=10, fill='y')
         
-        # Treeview pour la liste des lots (Ligne 2)
+        # Treeview paginé pour la liste des lots (Ligne 2) : les pages sont chargées au défilement
         cols = ("id", "type", "date", "nombre", "morts", "vendus", "abattus", "restants", "poids", "source", "statut", "remarque")
-        self.tree = ttk.Treeview(self, columns=cols, show="headings", height=18)
+        self.list = PagedTreeview(
+            self, cols, row_values=self._row_values, row_key=lambda r: (r["id"],),
+            height=18,
+        )
+        self.tree = self.list.tree
         
         # Configuration des colonnes et des en-têtes
         self.tree.column("id", width=40, anchor=tk.CENTER)
@@ -318,56 +357,32 @@ class LotsFrame(ttk.Frame):
         self.tree.heading("statut", text="Statut")
         self.tree.heading("remarque", text="Remarque")
 
-        self.tree.grid(row=2, column=0, sticky="nsew", pady=6) 
-        
-        scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.grid(row=2, column=1, sticky='ns') 
+        self.list.grid(row=2, column=0, sticky="nsew", pady=6) 
 
     def _refresh(self):
-        """Charge et affiche la liste des lots depuis la base de données."""
-        
-        statut_filter = self.var_statut_filter.get() if self.var_statut_filter.get() != "Tous" else None
-        espece_filter = self.var_espece_filter.get() if self.var_espece_filter.get() != "Tous" else None
-
-        # Efface les lignes existantes
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        
-        try:
-            lot_list = list_lots(search=espece_filter, statut=statut_filter)
-        except Exception as e:
-            messagebox.showerror("Erreur de Base de Données", f"Impossible de charger les lots : {e}")
-            return
-
-        for row in lot_list:
-            
-            # Récupérer les compteurs pour chaque lot et GÉRER LES ERREURS/CLÉS MANQUANTES (CORRECTION)
-            try:
-                counters = get_lot_counters(row["id"])
-                if counters is None:
-                    counters = {}
-            except Exception as e:
-                print(f"Avertissement: Échec de la récupération des compteurs pour le lot #{row['id']}: {e}")
-                counters = {}
-
-            poids_moyen = f"{row.get('poids_moyen'):.2f} kg" if row.get("poids_moyen") is not None else "-"
-            
-            self.tree.insert("", tk.END, values=(
-                row["id"], 
-                row["type_animal"], 
-                str(row["date_arrivee"]), 
-                row["nombre_initial"], 
-                counters.get("morts", 0),      
-                counters.get("vendus", 0),     
-                counters.get("abattus", 0),    
-                # Si 'restants' manque, utilise le nombre initial du lot comme valeur par défaut
-                counters.get("restants", row["nombre_initial"]), 
-                poids_moyen, 
-                row.get("source") or "-", 
-                row["statut"],
-                row.get("remarque") or "-" 
-            ))
+        """
+        Recharge la liste des lots en arrière-plan, page par page. Un changement rapide
+        de filtre annule l'affichage du chargement précédent.
+        """
+        self.list.load(lots_page_loader(self.var_espece_filter.get(), self.var_statut_filter.get()))
+
+    @staticmethod
+    def _row_values(row: Dict[str, Any]) -> tuple:
+        poids_moyen = f"{row.get('poids_moyen'):.2f} kg" if row.get("poids_moyen") is not None else "-"
+        return (
+            row["id"], 
+            row["type_animal"], 
+            str(row["date_arrivee"]), 
+            row["nombre_initial"], 
+            row.get("morts", 0),      
+            row.get("vendus", 0),     
+            row.get("abattus", 0),    
+            row.get("restants", row["nombre_initial"]), 
+            poids_moyen, 
+            row.get("source") or "-", 
+            row["statut"],
+            row.get("remarque") or "-" 
+        )
 
     def _selected_id(self) -> Optional[int]:
         """Récupère l'ID du lot sélectionné dans le Treeview."""
@@ -380,6 +395,54 @@ class LotsFrame(ttk.Frame):
         except (ValueError, IndexError):
             return None
 
+    def _cached_counters(self, lot_id: int) -> Optional[Dict[str, int]]:
+        """Compteurs du lot issus du dernier chargement, ou None s'il n'est plus dans la fenêtre affichée."""
+        # Lignes de la fenêtre affichée : list_lots renvoie déjà les compteurs
+        row = next((r for r in self.list.rows if r["id"] == lot_id), None)
+        if row is None:
+            return None
+        return {
+            "initial": row["nombre_initial"],
+            "morts": row.get("morts", 0),
+            "vendus": row.get("vendus", 0),
+            "abattus": row.get("abattus", 0),
+            "restants": row.get("restants", row["nombre_initial"]),
+        }
+
+    def _with_counters(self, lot_id: int, then: Callable[[Dict[str, int]], None]):
+        """Appelle then(compteurs) : ceux déjà affichés, ou lus en base (une requête) hors du thread Tk."""
+        counters = self._cached_counters(lot_id)
+        if counters is not None:
+            then(counters)
+            return
+        self._tasks.submit(
+            "counters", get_lot_counters, lot_id,
+            on_success=then,
+            on_error=lambda e: messagebox.showerror("Erreur DAO", f"Impossible de charger les compteurs : {e}"),
+        )
+
+    def _with_lot(self, lot_id: int, then: Callable[[Dict[str, Any]], None]):
+        """Charge le lot hors du thread Tk puis appelle then(lot) sur le thread Tk."""
+        def loaded(lot):
+            if not lot:
+                messagebox.showerror("Erreur", "Lot introuvable")
+                return
+            then(lot)
+        self._tasks.submit(
+            "lot", get_lot, lot_id,
+            on_success=loaded,
+            on_error=lambda e: messagebox.showerror("Erreur DAO", "Impossible de charger les données du lot."),
+        )
+
+    def _with_active_lot(self, lot_id: int, then: Callable[[Dict[str, Any]], None]):
+        """Comme _with_lot, mais refuse un lot qui n'est plus actif."""
+        def loaded(lot):
+            if lot["statut"] != "Actif":
+                messagebox.showwarning("Action impossible", f"Le lot #{lot_id} n'est pas actif.")
+                return
+            then(lot)
+        self._with_lot(lot_id, loaded)
+
 
     # --- Gestion des actions (Nouveau, Modifier, Clôturer, etc.) ---
     
@@ -401,14 +464,9 @@ class LotsFrame(ttk.Frame):
         if not id_:
             messagebox.showinfo("Info", "Sélectionnez un lot à supprimer.")
             return
-            
-        try:
-            lot = get_lot(id_)
-            counters = get_lot_counters(id_)
-        except Exception as e:
-            messagebox.showerror("Erreur DAO", f"Échec de la récupération des données pour la suppression: {e}")
-            return
-            
+        self._with_counters(id_, lambda counters: self._confirm_delete(id_, counters))
+
+    def _confirm_delete(self, id_: int, counters: Dict[str, int]):
         has_events = counters and (counters.get("morts", 0) > 0 or counters.get("vendus", 0) > 0 or counters.get("abattus", 0) > 0)
         
         if has_events:
@@ -418,13 +476,16 @@ class LotsFrame(ttk.Frame):
         else:
             if not messagebox.askyesno("Confirmation de Suppression", f"Voulez-vous supprimer définitivement Lot #{id_} ?"):
                 return
-                
-        try:
-            delete_lot(id_)
+
+        def deleted(_result):
             messagebox.showinfo("Succès", f"Lot #{id_} a été supprimé.")
             self._refresh()
-        except Exception as e:
-            messagebox.showerror("Erreur de Suppression", f"Impossible de supprimer le lot. Erreur: {e}")
+
+        self._tasks.submit(
+            "write", delete_lot, id_,
+            on_success=deleted,
+            on_error=lambda e: messagebox.showerror("Erreur de Suppression", f"Impossible de supprimer le lot. Erreur: {e}"),
+        )
 
     def _slaughter(self):
         """Ouvre le dialogue pour enregistrer l'abattage PARTIEL pour le lot sélectionné."""
@@ -432,16 +493,7 @@ class LotsFrame(ttk.Frame):
         if not id_:
             messagebox.showinfo("Info", "Sélectionnez un lot.")
             return
-        try:
-            lot = get_lot(id_)
-        except Exception:
-            messagebox.showerror("Erreur DAO", "Impossible de charger les données du lot.")
-            return
-
-        if lot and lot.get("statut") != "Actif":
-            messagebox.showwarning("Action impossible", f"Le lot #{id_} n'est pas actif.")
-            return
-        self._open_slaughter_dialog(id_)
+        self._with_active_lot(id_, self._open_slaughter_dialog)
     
     def _close(self):
         """Clôture le lot sélectionné et le marque comme 'Vendu'."""
@@ -449,22 +501,16 @@ class LotsFrame(ttk.Frame):
         if not id_:
             messagebox.showinfo("Info", "Sélectionnez un lot à clôturer.")
             return
-        try:
-            lot = get_lot(id_)
-        except Exception:
-            messagebox.showerror("Erreur DAO", "Impossible de charger les données du lot.")
-            return
 
-        if lot["statut"] != "Actif":
-            messagebox.showwarning("Clôture", f"Le lot #{id_} est déjà en statut '{lot['statut']}'")
-            return
-            
-        try:
-            counters = get_lot_counters(id_)
-        except Exception:
-            messagebox.showerror("Erreur DAO", "Impossible de charger les compteurs.")
-            return
+        def loaded(lot):
+            if lot["statut"] != "Actif":
+                messagebox.showwarning("Clôture", f"Le lot #{id_} est déjà en statut '{lot['statut']}'")
+                return
+            self._with_counters(id_, lambda counters: self._confirm_close(id_, counters))
+
+        self._with_lot(id_, loaded)
 
+    def _confirm_close(self, id_: int, counters: Dict[str, int]):
         if counters.get("restants", 0) > 0:
             if not messagebox.askyesno("Confirmation de Clôture", 
                                        f"Lot #{id_}: Il reste {counters.get('restants', 0)} animaux. "
@@ -474,11 +520,11 @@ class LotsFrame(ttk.Frame):
             if not messagebox.askyesno("Confirmation", f"Clôturer Lot #{id_} en 'Vendu' ?"):
                 return
             
-        try:
-            close_lot(id_, "Vendu")
-            self._refresh()
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Erreur lors de la clôture du lot : {e}")
+        self._tasks.submit(
+            "write", close_lot, id_, "Vendu",
+            on_success=lambda _result: self._refresh(),
+            on_error=lambda e: messagebox.showerror("Erreur", f"Erreur lors de la clôture du lot : {e}"),
+        )
 
     def _mortality(self):
         """Prépare l'ouverture du dialogue de mortalité pour le lot sélectionné."""
@@ -486,15 +532,7 @@ class LotsFrame(ttk.Frame):
         if not id_:
             messagebox.showinfo("Info", "Sélectionnez un lot.")
             return
-        try:
-            lot = get_lot(id_)
-        except Exception:
-            messagebox.showerror("Erreur DAO", "Impossible de charger les données du lot.")
-            return
-        if lot["statut"] != "Actif":
-            messagebox.showwarning("Action impossible", f"Le lot #{id_} n'est pas actif.")
-            return
-        self._open_mortality_dialog(id_)
+        self._with_active_lot(id_, self._open_mortality_dialog)
 
     def _sale(self):
         """Prépare l'ouverture du dialogue de vente partielle pour le lot sélectionné."""
@@ -502,20 +540,48 @@ class LotsFrame(ttk.Frame):
         if not id_:
             messagebox.showinfo("Info", "Sélectionnez un lot.")
             return
-        try:
-            lot = get_lot(id_)
-        except Exception:
-            messagebox.showerror("Erreur DAO", "Impossible de charger les données du lot.")
-            return
-        if lot["statut"] != "Actif":
-            messagebox.showwarning("Action impossible", f"Le lot #{id_} n'est pas actif.")
-            return
-        self._open_sale_dialog(id_)
+        self._with_active_lot(id_, self._open_sale_dialog)
+
+    def _record_event(self, lot_id: int, dlg: tk.Toplevel, btn: ttk.Button, quantite: int,
+                      record: Callable[[], None], what: str, success: Optional[str] = None):
+        """
+        Vérifie les restants puis appelle record(), le tout hors du thread Tk.
+        Le bouton du dialogue reste désactivé pendant l'opération (pas de double saisie).
+        """
+        def release():
+            # Le dialogue a pu être fermé pendant l'opération
+            if btn.winfo_exists():
+                btn.config(state="normal")
+
+        def checked(counters):
+            if quantite > counters.get("restants", 0):
+                release()
+                messagebox.showwarning("Validation", f"Quantité ({quantite}) supérieure aux restants ({counters.get('restants', 0)}).")
+                return
+            self._tasks.submit("event", record, on_success=recorded, on_error=failed)
+
+        def recorded(_result):
+            if success:
+                messagebox.showinfo("Succès", success)
+            dlg.destroy()
+            self._refresh()
+
+        def failed(e):
+            release()
+            messagebox.showerror("Erreur DAO", f"Échec de l'enregistrement {what} : {e}")
+
+        def counters_failed(_e):
+            release()
+            messagebox.showerror("Erreur DAO", "Impossible de charger les compteurs.")
+
+        btn.config(state="disabled")
+        self._tasks.submit("event", get_lot_counters, lot_id, on_success=checked, on_error=counters_failed)
 
     # --- Gestion des Dialogues d'Événements (Contient les corrections de centrage) ---
     
-    def _open_mortality_dialog(self, lot_id: int):
+    def _open_mortality_dialog(self, lot: Dict[str, Any]):
         """Dialogue pour enregistrer la mortalité (avec validation de la date)."""
+        lot_id = lot["id"]
         dlg = tk.Toplevel(self.master)
         dlg.title(f"Mortalité - Lot #{lot_id}")
         dlg.transient(self.master)
@@ -524,18 +590,6 @@ class LotsFrame(ttk.Frame):
         frm = ttk.Frame(dlg, padding=12)
         frm.grid()
         
-        try:
-            lot = get_lot(lot_id)
-        except Exception:
-            messagebox.showerror("Erreur DAO", "Impossible de charger les données du lot.")
-            dlg.destroy()
-            return
-
-        if not lot:
-            messagebox.showerror("Erreur", "Lot introuvable")
-            dlg.destroy()
-            return
-            
         date_arrivee = lot["date_arrivee"]
 
         v_date = tk.StringVar(value=date.today().strftime("%Y-%m-%d"))
@@ -566,32 +620,24 @@ class LotsFrame(ttk.Frame):
                     messagebox.showwarning("Validation", 
                                           f"La date de mortalité ({v_date.get()}) ne peut être antérieure à la date d'arrivée du lot ({date_arrivee}).")
                     return
-            try:
-                counters = get_lot_counters(lot_id)
-            except Exception:
-                messagebox.showerror("Erreur DAO", "Impossible de charger les compteurs.")
-                return
-
-            if v_q.get() > counters.get("restants", 0):
-                messagebox.showwarning("Validation", f"Quantité ({v_q.get()}) supérieure aux restants ({counters.get('restants', 0)}).")
-                return
-            
-            try:
-                record_mortality(lot_id, v_date.get(), int(v_q.get()), v_motif.get() or None)
-                dlg.destroy()
-                self._refresh()
-            except Exception as e:
-                messagebox.showerror("Erreur DAO", f"Échec de l'enregistrement de la mortalité : {e}")
+            quantite = int(v_q.get())
+            self._record_event(
+                lot_id, dlg, btn, quantite,
+                functools.partial(record_mortality, lot_id, v_date.get(), quantite, v_motif.get() or None),
+                "de la mortalité",
+            )
 
             
-        ttk.Button(frm, text="Enregistrer la mortalité", command=save).grid(row=row, column=0, columnspan=2, pady=12, sticky="ew")
+        btn = ttk.Button(frm, text="Enregistrer la mortalité", command=save)
+        btn.grid(row=row, column=0, columnspan=2, pady=12, sticky="ew")
         
         # NOUVEAU PLACEMENT DU CENTRAGE : Après le placement de TOUS les widgets
         dlg.update_idletasks() 
         _center_toplevel(dlg)
 
-    def _open_sale_dialog(self, lot_id: int):
+    def _open_sale_dialog(self, lot: Dict[str, Any]):
         """Dialogue pour enregistrer une vente partielle (avec validation de la date)."""
+        lot_id = lot["id"]
         dlg = tk.Toplevel(self.master)
         dlg.title(f"Vente Partielle - Lot #{lot_id}")
         dlg.transient(self.master)
@@ -600,18 +646,6 @@ class LotsFrame(ttk.Frame):
         frm = ttk.Frame(dlg, padding=12)
         frm.grid()
         
-        try:
-            lot = get_lot(lot_id)
-        except Exception:
-            messagebox.showerror("Erreur DAO", "Impossible de charger les données du lot.")
-            dlg.destroy()
-            return
-            
-        if not lot:
-            messagebox.showerror("Erreur", "Lot introuvable")
-            dlg.destroy()
-            return
-            
         date_arrivee = lot["date_arrivee"]
         
         v_date = tk.StringVar(value=date.today().strftime("%Y-%m-%d"))
@@ -653,35 +687,24 @@ class LotsFrame(ttk.Frame):
                     messagebox.showwarning("Validation", 
                                           f"La date de vente ({v_date.get()}) ne peut être antérieure à la date d'arrivée du lot ({date_arrivee}).")
                     return
-            try:
-                counters = get_lot_counters(lot_id)
-            except Exception:
-                messagebox.showerror("Erreur DAO", "Impossible de charger les compteurs.")
-                return
-
-
-            if v_q.get() > counters.get("restants", 0):
-                messagebox.showwarning("Validation", f"Quantité ({v_q.get()}) supérieure aux restants ({counters.get('restants', 0)}).")
-                return
-                
-            try:
-                record_partial_sale(lot_id, v_date.get(), int(v_q.get()), prix, v_client.get() or None)
-            except Exception as e:
-                messagebox.showerror("Erreur DAO", f"Échec de l'enregistrement de la vente : {e}")
-                return
+            quantite = int(v_q.get())
+            self._record_event(
+                lot_id, dlg, btn, quantite,
+                functools.partial(record_partial_sale, lot_id, v_date.get(), quantite, prix, v_client.get() or None),
+                "de la vente",
+                success=f"{quantite} animaux vendus enregistrés pour le Lot #{lot_id}.",
+            )
             
-            messagebox.showinfo("Succès", f"{v_q.get()} animaux vendus enregistrés pour le Lot #{lot_id}.")
-            dlg.destroy()
-            self._refresh()
-            
-        ttk.Button(frm, text="Enregistrer la vente", command=save).grid(row=row, column=0, columnspan=2, pady=12, sticky="ew")
+        btn = ttk.Button(frm, text="Enregistrer la vente", command=save)
+        btn.grid(row=row, column=0, columnspan=2, pady=12, sticky="ew")
 
         # PLACEMENT DU CENTRAGE
         dlg.update_idletasks() 
         _center_toplevel(dlg)
 
-    def _open_slaughter_dialog(self, lot_id: int):
+    def _open_slaughter_dialog(self, lot: Dict[str, Any]):
         """Dialogue pour enregistrer un abattage partiel (avec validation)."""
+        lot_id = lot["id"]
         dlg = tk.Toplevel(self.master)
         dlg.title(f"Abattage Partiel - Lot #{lot_id}")
         dlg.transient(self.master)
@@ -690,18 +713,6 @@ class LotsFrame(ttk.Frame):
         frm = ttk.Frame(dlg, padding=12)
         frm.grid()
         
-        try:
-            lot = get_lot(lot_id)
-        except Exception:
-            messagebox.showerror("Erreur DAO", "Impossible de charger les données du lot.")
-            dlg.destroy()
-            return
-
-        if not lot:
-            messagebox.showerror("Erreur", "Lot introuvable")
-            dlg.destroy()
-            return
-            
         date_arrivee = lot["date_arrivee"]
 
         v_date = tk.StringVar(value=date.today().strftime("%Y-%m-%d"))
@@ -742,25 +753,16 @@ class LotsFrame(ttk.Frame):
                                        f"La date d'abattage ({v_date.get()}) ne peut être antérieure à la date d'arrivée du lot ({date_arrivee}).")
                 return
 
-            try:
-                counters = get_lot_counters(lot_id)
-            except Exception:
-                messagebox.showerror("Erreur DAO", "Impossible de charger les compteurs.")
-                return
-            
-            if v_q.get() > counters.get("restants", 0):
-                messagebox.showwarning("Validation", f"Quantité ({v_q.get()}) supérieure aux restants ({counters.get('restants', 0)}).")
-                return
-
-            try:
-                record_slaughter(lot_id, v_date.get(), int(v_q.get()), poids_unitaire)
-                messagebox.showinfo("Succès", f"{v_q.get()} animaux abattus enregistrés pour le Lot #{lot_id}.")
-                dlg.destroy()
-                self._refresh()
-            except Exception as e:
-                messagebox.showerror("Erreur DAO", f"Échec de l'enregistrement de l'abattage : {e}")
+            quantite = int(v_q.get())
+            self._record_event(
+                lot_id, dlg, btn, quantite,
+                functools.partial(record_slaughter, lot_id, v_date.get(), quantite, poids_unitaire),
+                "de l'abattage",
+                success=f"{quantite} animaux abattus enregistrés pour le Lot #{lot_id}.",
+            )
                 
-        ttk.Button(frm, text="Enregistrer l'Abattage", command=save).grid(row=row, column=0, columnspan=2, pady=12, sticky="ew")
+        btn = ttk.Button(frm, text="Enregistrer l'Abattage", command=save)
+        btn.grid(row=row, column=0, columnspan=2, pady=12, sticky="ew")
 
         # PLACEMENT DU CENTRAGE
         dlg.update_idletasks() 
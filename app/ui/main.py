@@ -1,5 +1,5 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
 from pathlib import Path
 from typing import Optional, Dict
 
@@ -12,6 +12,7 @@ from app.ui.finances import FinancesFrame
 from app.ui.reports import ReportsFrame
 from app.ui.dashboard import DashboardFrame
 from app.ui.backup import BackupFrame
+from app.migrations import migrate
 
 # === Import des rôles et fonctions d’authentification ===
 from app.auth import user_has_role, ROLE_ADMIN, ROLE_FERMIER, ROLE_VETERINAIRE, ROLE_GESTIONNAIRE
@@ -49,9 +50,18 @@ class App(tk.Tk):
         self.main_content_frame: Optional[ttk.Frame] = None
         self._sidebar_buttons: Dict[str, ttk.Button] = {}
 
+        self._apply_migrations()
+
         # Écran de connexion au démarrage
         self._show_login()
 
+    def _apply_migrations(self):
+        """Met le schéma à jour ; une seule requête si aucune migration n'est en attente."""
+        try:
+            migrate()
+        except Exception as e:
+            messagebox.showerror("Migrations", f"Mise à jour de la base impossible : {e}")
+
     # =================================================================
     # CONFIGURATION DU THÈME
     # =================================================================
@@ -0,0 +1,204 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.ui.tasks import TaskRunner
+
+
+PAGE_SIZE = 200
+# Fraction de défilement à partir de laquelle la page suivante (ou précédente) est demandée
+PREFETCH_AT = 0.85
+# Pages gardées dans le Treeview : au-delà, la page la plus éloignée de la zone visible est retirée
+WINDOW_PAGES = 5
+
+
+class _PageWindow:
+	"""
+	Fenêtre de pages d'une liste paginée par clé : au plus `size` pages consécutives
+	chargées. La clé `after` de chaque page déjà lue est conservée (un tuple par page),
+	de quoi relire une page retirée quand le défilement revient vers elle.
+	"""
+
+	def __init__(self, size: int, page_size: int, row_key: Callable[[Dict], Tuple]):
+		self.size = max(2, size)
+		self.page_size = page_size
+		self.row_key = row_key
+		# {"index", "rows", "items"} dans l'ordre d'affichage ; items : éléments du Treeview
+		self.pages: List[Dict] = []
+		self.keys: List[Optional[Tuple]] = [None]
+		self.exhausted = False
+
+	@property
+	def rows(self) -> List[Dict]:
+		return [row for page in self.pages for row in page["rows"]]
+
+	def next_index(self) -> Optional[int]:
+		"""Page à lire sous la fenêtre (0 si vide), None si la fin de la requête est atteinte."""
+		if self.exhausted:
+			return None
+		return self.pages[-1]["index"] + 1 if self.pages else 0
+
+	def previous_index(self) -> Optional[int]:
+		"""Page retirée juste au-dessus de la fenêtre, None s'il n'y en a pas."""
+		if not self.pages or self.pages[0]["index"] == 0:
+			return None
+		return self.pages[0]["index"] - 1
+
+	def add(self, index: int, rows: List[Dict], items: List[Any]) -> Tuple[bool, Optional[Dict]]:
+		"""
+		Place la page lue au-dessus ou au-dessous de la fenêtre. Retourne (au-dessus,
+		page retirée à l'autre extrémité ou None).
+		"""
+		page = {"index": index, "rows": rows, "items": items}
+		above = bool(self.pages) and index < self.pages[0]["index"]
+		if above:
+			self.pages.insert(0, page)
+		else:
+			self.pages.append(page)
+			if rows:
+				key = self.row_key(rows[-1])
+				if len(self.keys) == index + 1:
+					self.keys.append(key)
+				else:
+					self.keys[index + 1] = key
+			self.exhausted = len(rows) < self.page_size
+		evicted = None
+		if len(self.pages) > self.size:
+			evicted = self.pages.pop(-1 if above else 0)
+			if above:
+				# La fin de la requête n'est plus chargée : elle sera relue en redescendant
+				self.exhausted = False
+		return above, evicted
+
+
+class PagedTreeview(ttk.Frame):
+	"""
+	Treeview + barre de défilement alimentés page par page avec une pagination par clé
+	(« keyset ») : seule la première page est chargée à l'affichage, les suivantes
+	sont demandées en arrière-plan quand le défilement approche de la fin.
+	Seules `window_pages` pages restent dans le Treeview : la plus éloignée de la zone
+	visible est retirée, puis relue par sa clé si l'on remonte vers elle. Le nombre
+	d'éléments et la mémoire restent bornés quelle que soit la longueur de la liste.
+
+	fetch_page(after, limit) doit renvoyer au plus `limit` lignes situées après la
+	clé `after` (None pour la première page), dans l'ordre d'affichage.
+	"""
+
+	def __init__(
+		self,
+		master,
+		columns: Sequence[str],
+		row_values: Callable[[Dict], Sequence[Any]],
+		row_key: Callable[[Dict], Tuple],
+		row_tags: Optional[Callable[[Dict], Sequence[str]]] = None,
+		on_page: Optional[Callable[[List[Dict], bool], None]] = None,
+		page_size: int = PAGE_SIZE,
+		window_pages: int = WINDOW_PAGES,
+		**tree_options,
+	):
+		super().__init__(master)
+		self.rowconfigure(0, weight=1)
+		self.columnconfigure(0, weight=1)
+
+		self.tree = ttk.Treeview(self, columns=columns, show="headings", **tree_options)
+		self.tree.grid(row=0, column=0, sticky="nsew")
+		self._scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
+		self._scrollbar.grid(row=0, column=1, sticky="ns")
+		self.tree.configure(yscrollcommand=self._on_scroll)
+
+		self._row_values = row_values
+		self._row_key = row_key
+		self._row_tags = row_tags
+		self._on_page = on_page
+		self._page_size = page_size
+		self._window_pages = window_pages
+		self._tasks = TaskRunner(self)
+
+		self._fetch: Optional[Callable] = None
+		self._window = _PageWindow(window_pages, page_size, row_key)
+		self._window.exhausted = True
+		self._loading = False
+
+	@property
+	def rows(self) -> List[Dict]:
+		"""Lignes présentes dans le Treeview (fenêtre chargée), dans l'ordre d'affichage."""
+		return self._window.rows
+
+	@property
+	def exhausted(self) -> bool:
+		"""Vrai quand la fin de la requête courante est chargée."""
+		return self._window.exhausted and not self._loading
+
+	def load(self, fetch_page: Callable[[Optional[Tuple], int], List[Dict]]) -> None:
+		"""Vide la liste et charge la première page de la nouvelle requête."""
+		self._fetch = fetch_page
+		self._window = _PageWindow(self._window_pages, self._page_size, self._row_key)
+		for i in self.tree.get_children():
+			self.tree.delete(i)
+		self._request(0)
+
+	def _request(self, index: int) -> None:
+		# Une nouvelle demande sur la clé "page" rend la précédente obsolète (TaskRunner)
+		self._loading = True
+		self._tasks.submit(
+			"page", self._fetch, self._window.keys[index], self._page_size,
+			on_success=lambda rows: self._insert_page(index, rows), on_error=self._failed,
+		)
+
+	def _top_index(self) -> int:
+		count = len(self.tree.get_children())
+		return int(round(float(self.tree.yview()[0]) * count))
+
+	def _insert_page(self, index: int, rows: List[Dict]) -> None:
+		self._loading = False
+		top = self._top_index()
+		previous = self._window.previous_index()
+		above = previous is not None and index == previous
+		items = []
+		for offset, row in enumerate(rows):
+			tags = tuple(self._row_tags(row)) if self._row_tags else ()
+			items.append(self.tree.insert("", offset if above else tk.END, values=tuple(self._row_values(row)), tags=tags))
+		_, evicted = self._window.add(index, rows, items)
+		if evicted is not None:
+			self.tree.delete(*evicted["items"])
+		# Garde à l'écran les mêmes lignes malgré les insertions et retraits au-dessus
+		shift = (len(items) if above else 0) - (len(evicted["items"]) if evicted is not None and not above else 0)
+		if shift:
+			count = len(self.tree.get_children())
+			self.tree.yview_moveto(max(0, top + shift) / max(1, count))
+		if self._on_page:
+			self._on_page(rows, index == 0)
+		# Si la zone visible n'est pas encore remplie, on enchaîne sur la page suivante
+		self.after_idle(self._maybe_next_page)
+
+	def _failed(self, exc: BaseException) -> None:
+		self._loading = False
+		self._window.exhausted = True
+		messagebox.showerror("Erreur de Base de Données", f"Impossible de charger les données : {exc}")
+
+	def _on_scroll(self, first, last) -> None:
+		self._scrollbar.set(first, last)
+		if float(last) >= PREFETCH_AT:
+			self._maybe_next_page()
+		elif float(first) <= 1 - PREFETCH_AT:
+			self._maybe_previous_page()
+
+	def _maybe_next_page(self) -> None:
+		if self._loading or self._fetch is None:
+			return
+		index = self._window.next_index()
+		if index is None:
+			return
+		try:
+			last = float(self.tree.yview()[1])
+		except tk.TclError:
+			return
+		if last >= PREFETCH_AT:
+			self._request(index)
+
+	def _maybe_previous_page(self) -> None:
+		if self._loading or self._fetch is None:
+			return
+		index = self._window.previous_index()
+		if index is not None:
+			self._request(index)
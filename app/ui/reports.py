@@ -3,14 +3,16 @@ from tkinter import ttk, filedialog, messagebox
 from datetime import date
 from pathlib import Path
 
-from app.reports import kpis_by_lot, monthly_summary, lots_overview
+from app.reports import kpis_by_lot, monthly_summary, lots_overview, lots_profitability
 from app.dao.lots import list_active_lots
 from app.utils.pdf import export_table_pdf
+from app.ui.tasks import TaskRunner
 
 
 class ReportsFrame(ttk.Frame):
 	def __init__(self, master):
 		super().__init__(master, padding=8)
+		self._tasks = TaskRunner(self)
 		self._build()
 
 	def _build(self):
@@ -32,16 +34,20 @@ class ReportsFrame(ttk.Frame):
 		nb.add(tab_over, text="Vue d'ensemble")
 		self._build_overview_tab(tab_over)
 
+		# Profitability tab
+		tab_pl = ttk.Frame(nb)
+		nb.add(tab_pl, text="Rentabilité")
+		self._build_profitability_tab(tab_pl)
+
 	def _build_lot_tab(self, parent):
 		frm = ttk.Frame(parent, padding=8)
 		frm.pack(fill=tk.BOTH, expand=True)
-		self._lots = list_active_lots()
-		choices = [f"{l['id']} - {l['type_animal']}" for l in self._lots]
 		self.v_lot = tk.StringVar()
 		row = 0
 		tk.Label(frm, text="Lot").grid(row=row, column=0, sticky="w")
-		cb = ttk.Combobox(frm, textvariable=self.v_lot, values=choices, state="readonly", width=18)
-		cb.grid(row=row, column=1, pady=4)
+		self._cb_lot = ttk.Combobox(frm, textvariable=self.v_lot, values=[], state="readonly", width=18)
+		self._cb_lot.grid(row=row, column=1, pady=4)
+		self._tasks.submit("lots", list_active_lots, on_success=self._set_lots)
 		row += 1
 		self.lbl_kpi = ttk.Label(frm, text="")
 		self.lbl_kpi.grid(row=row, column=0, columnspan=2, sticky="w", pady=6)
@@ -49,6 +55,10 @@ class ReportsFrame(ttk.Frame):
 		ttk.Button(frm, text="Calculer", command=self._calc_lot).grid(row=row, column=0, pady=4)
 		ttk.Button(frm, text="Exporter PDF", command=self._export_lot_pdf).grid(row=row, column=1, pady=4)
 
+	def _set_lots(self, lots: list):
+		self._lots = lots
+		self._cb_lot.configure(values=[f"{l['id']} - {l['type_animal']}" for l in lots])
+
 	def _parse_selected_lot(self):
 		val = self.v_lot.get()
 		if not val:
@@ -60,21 +70,25 @@ class ReportsFrame(ttk.Frame):
 		if not lot_id:
 			messagebox.showinfo("Info", "Choisissez un lot")
 			return
-		k = kpis_by_lot(lot_id)
-		self.lbl_kpi.configure(text=f"Initial: {k['initial']:.0f}, Morts: {k['morts']:.0f} ({k['mortalite_pct']:.1f}%), Vendus: {k['vendus']:.0f}, Restants: {k['restants']:.0f}, Dépenses: {k['depenses']:.0f} XAF, Recettes: {k['recettes']:.0f} XAF, Marge: {k['marge']:.0f} XAF")
+		self._tasks.submit("lot", kpis_by_lot, lot_id, on_success=self._show_lot)
+
+	def _show_lot(self, k: dict):
+		self.lbl_kpi.configure(text=f"Initial: {k['initial']:.0f}, Morts: {k['morts']:.0f} ({k['mortalite_pct']:.1f}%), Vendus: {k['vendus']:.0f}, Abattus: {k['abattus']:.0f}, Restants: {k['restants']:.0f}\nSoins: {k['cout_soins']:.0f} XAF, Dépenses: {k['depenses']:.0f} XAF, Recettes: {k['recettes']:.0f} XAF, Marge: {k['marge']:.0f} XAF ({k['marge_par_tete']:.0f} XAF/tête)")
 
 	def _export_lot_pdf(self):
 		lot_id = self._parse_selected_lot()
 		if not lot_id:
 			messagebox.showinfo("Info", "Choisissez un lot")
 			return
-		k = kpis_by_lot(lot_id)
 		path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF", "*.pdf")], title="Exporter rapport lot")
 		if not path:
 			return
-		headers = ["Initial", "Morts", "% Mortalité", "Vendus", "Restants", "Dépenses", "Recettes", "Marge"]
-		row = [f"{k['initial']:.0f}", f"{k['morts']:.0f}", f"{k['mortalite_pct']:.1f}", f"{k['vendus']:.0f}", f"{k['restants']:.0f}", f"{k['depenses']:.0f}", f"{k['recettes']:.0f}", f"{k['marge']:.0f}"]
-		export_table_pdf(Path(path), f"Rapport par lot #{lot_id}", headers, [row])
+		self._tasks.submit("lot_pdf", kpis_by_lot, lot_id, on_success=lambda k: self._write_lot_pdf(Path(path), lot_id, k))
+
+	def _write_lot_pdf(self, path: Path, lot_id: int, k: dict):
+		headers = ["Initial", "Morts", "% Mortalité", "Vendus", "Abattus", "Restants", "Soins", "Dépenses", "Recettes", "Marge", "Marge/tête"]
+		row = [f"{k['initial']:.0f}", f"{k['morts']:.0f}", f"{k['mortalite_pct']:.1f}", f"{k['vendus']:.0f}", f"{k['abattus']:.0f}", f"{k['restants']:.0f}", f"{k['cout_soins']:.0f}", f"{k['depenses']:.0f}", f"{k['recettes']:.0f}", f"{k['marge']:.0f}", f"{k['marge_par_tete']:.0f}"]
+		export_table_pdf(path, f"Rapport par lot #{lot_id}", headers, [row])
 		messagebox.showinfo("Export", "PDF généré")
 
 	def _build_month_tab(self, parent):
@@ -98,38 +112,48 @@ class ReportsFrame(ttk.Frame):
 	def _calc_month(self):
 		y = int(self.v_year.get())
 		m = int(self.v_month.get())
-		sumry = monthly_summary(y, m)
+		self._tasks.submit("month", monthly_summary, y, m, on_success=self._show_month)
+
+	def _show_month(self, sumry: dict):
 		self.lbl_month.configure(text=f"Dépenses: {sumry['depenses']:.0f} XAF    Recettes: {sumry['recettes']:.0f} XAF    Solde: {sumry['solde']:.0f} XAF")
 
 	def _export_month_pdf(self):
 		y = int(self.v_year.get())
 		m = int(self.v_month.get())
-		sumry = monthly_summary(y, m)
 		path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF", "*.pdf")], title="Exporter rapport mensuel")
 		if not path:
 			return
+		self._tasks.submit("month_pdf", monthly_summary, y, m, on_success=lambda sumry: self._write_month_pdf(Path(path), y, m, sumry))
+
+	def _write_month_pdf(self, path: Path, y: int, m: int, sumry: dict):
 		headers = ["Dépenses", "Recettes", "Solde"]
 		row = [f"{sumry['depenses']:.0f}", f"{sumry['recettes']:.0f}", f"{sumry['solde']:.0f}"]
-		export_table_pdf(Path(path), f"Rapport mensuel {y}-{m:02d}", headers, [row])
+		export_table_pdf(path, f"Rapport mensuel {y}-{m:02d}", headers, [row])
 		messagebox.showinfo("Export", "PDF généré")
 
 	def _build_overview_tab(self, parent):
 		frm = ttk.Frame(parent, padding=8)
 		frm.pack(fill=tk.BOTH, expand=True)
-		cols = ("id", "espece", "initial", "morts", "mort%", "vendus", "restants")
+		cols = ("id", "espece", "initial", "morts", "mort%", "vendus", "abattus", "restants")
 		self.tree = ttk.Treeview(frm, columns=cols, show="headings", height=18)
-		for k, t in zip(cols, ["ID", "Espèce", "Initial", "Morts", "%", "Vendus", "Restants"]):
+		for k, t in zip(cols, ["ID", "Espèce", "Initial", "Morts", "%", "Vendus", "Abattus", "Restants"]):
 			self.tree.heading(k, text=t)
 		self.tree.pack(fill=tk.BOTH, expand=True)
 		self._refresh_overview()
-		btn = ttk.Button(frm, text="Exporter PDF", command=self._export_overview_pdf)
-		btn.pack(pady=6)
+		bar = ttk.Frame(frm)
+		bar.pack(pady=6)
+		ttk.Button(bar, text="Actualiser", command=self._refresh_overview).pack(side=tk.LEFT)
+		ttk.Button(bar, text="Annuler", command=lambda: self._tasks.cancel("overview")).pack(side=tk.LEFT, padx=6)
+		ttk.Button(bar, text="Exporter PDF", command=self._export_overview_pdf).pack(side=tk.LEFT)
 
 	def _refresh_overview(self):
+		self._tasks.submit("overview", lots_overview, on_success=self._fill_overview)
+
+	def _fill_overview(self, rows: list):
 		for i in self.tree.get_children():
 			self.tree.delete(i)
-		for r in lots_overview():
-			self.tree.insert("", tk.END, values=(r["id"], r["type_animal"], r["nombre_initial"], r["morts"], f"{r['mortalite_pct']:.1f}", r["vendus"], r["restants"]))
+		for r in rows:
+			self.tree.insert("", tk.END, values=(r["id"], r["type_animal"], r["nombre_initial"], r["morts"], f"{r['mortalite_pct']:.1f}", r["vendus"], r["abattus"], r["restants"]))
 
 	def _export_overview_pdf(self):
 		path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF", "*.pdf")], title="Exporter vue d'ensemble")
@@ -138,7 +162,70 @@ class ReportsFrame(ttk.Frame):
 		rows = []
 		for item in self.tree.get_children():
 			rows.append(list(self.tree.item(item, "values")))
-		export_table_pdf(Path(path), "Vue d'ensemble des lots", ["ID", "Espèce", "Initial", "Morts", "%", "Vendus", "Restants"], rows)
+		export_table_pdf(Path(path), "Vue d'ensemble des lots", ["ID", "Espèce", "Initial", "Morts", "%", "Vendus", "Abattus", "Restants"], rows)
 		messagebox.showinfo("Export", "PDF généré")
 
-
+	# Colonnes du classement : (clé, titre, format)
+	_PL_COLUMNS = [
+		("id", "ID", "{}"),
+		("type_animal", "Espèce", "{}"),
+		("statut", "Statut", "{}"),
+		("initial", "Initial", "{}"),
+		("morts", "Morts", "{}"),
+		("mortalite_pct", "% Mort.", "{:.1f}"),
+		("vendus", "Vendus", "{}"),
+		("abattus", "Abattus", "{}"),
+		("restants", "Restants", "{}"),
+		("cout_soins", "Soins", "{:.0f}"),
+		("depenses", "Dépenses", "{:.0f}"),
+		("recettes", "Recettes", "{:.0f}"),
+		("marge", "Marge", "{:.0f}"),
+		("marge_par_tete", "Marge/tête", "{:.0f}"),
+	]
+
+	def _build_profitability_tab(self, parent):
+		frm = ttk.Frame(parent, padding=8)
+		frm.pack(fill=tk.BOTH, expand=True)
+		bar = ttk.Frame(frm)
+		bar.pack(fill=tk.X)
+		ttk.Button(bar, text="Actualiser", command=self._refresh_profitability).pack(side=tk.LEFT)
+		ttk.Button(bar, text="Annuler", command=lambda: self._tasks.cancel("profitability")).pack(side=tk.LEFT, padx=6)
+		ttk.Button(bar, text="Exporter PDF", command=self._export_profitability_pdf).pack(side=tk.LEFT)
+		cols = tuple(k for k, _, _ in self._PL_COLUMNS)
+		self.tree_pl = ttk.Treeview(frm, columns=cols, show="headings", height=18)
+		for k, t, _ in self._PL_COLUMNS:
+			# Un clic sur l'en-tête trie le classement (un second clic inverse l'ordre)
+			self.tree_pl.heading(k, text=t, command=lambda c=k: self._sort_profitability(c))
+			self.tree_pl.column(k, width=80, anchor="e" if k not in ("type_animal", "statut") else "w")
+		self.tree_pl.pack(fill=tk.BOTH, expand=True, pady=6)
+		self._pl_rows = []
+		self._pl_sort = ("marge", True)
+		self._refresh_profitability()
+
+	def _refresh_profitability(self):
+		self._tasks.submit("profitability", lots_profitability, on_success=self._set_profitability)
+
+	def _set_profitability(self, rows: list):
+		self._pl_rows = rows
+		self._fill_profitability()
+
+	def _sort_profitability(self, col: str):
+		key, desc = self._pl_sort
+		self._pl_sort = (col, not desc if col == key else True)
+		self._fill_profitability()
+
+	def _fill_profitability(self):
+		key, desc = self._pl_sort
+		rows = sorted(self._pl_rows, key=lambda r: (r[key] is None, r[key] if r[key] is not None else 0), reverse=desc)
+		for i in self.tree_pl.get_children():
+			self.tree_pl.delete(i)
+		for r in rows:
+			self.tree_pl.insert("", tk.END, values=tuple(fmt.format(r[k]) for k, _, fmt in self._PL_COLUMNS))
+
+	def _export_profitability_pdf(self):
+		path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF", "*.pdf")], title="Exporter le classement de rentabilité")
+		if not path:
+			return
+		rows = [list(self.tree_pl.item(item, "values")) for item in self.tree_pl.get_children()]
+		export_table_pdf(Path(path), "Rentabilité des lots", [t for _, t, _ in self._PL_COLUMNS], rows)
+		messagebox.showinfo("Export", "PDF généré")
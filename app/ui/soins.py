@@ -5,6 +5,7 @@ from typing import Optional
 from app.dao.soins import list_soins, create_soin, update_soin, delete_soin
 from app.dao.lots import list_active_lots
 from app.utils.validators import is_valid_date, parse_positive_float
+from app.ui.paged_tree import PagedTreeview
 
 
 class SoinForm(tk.Toplevel):
@@ -109,7 +110,15 @@ class SoinsFrame(ttk.Frame):
 		self.btn_del.pack(side=tk.LEFT)
 
 		cols = ("id", "lot", "espece", "date", "type", "cout", "effectue_par")
-		self.tree = ttk.Treeview(self, columns=cols, show="headings", height=18)
+		self.list = PagedTreeview(
+			self, cols,
+			row_values=lambda row: (
+				row["id"], row["lot_id"], row.get("type_animal"), str(row["date_soin"]), row["type_soin"], row.get("cout", 0), row.get("effectue_par")
+			),
+			row_key=lambda row: (row["date_soin"], row["id"]),
+			height=18,
+		)
+		self.tree = self.list.tree
 		self.tree.heading("id", text="ID")
 		self.tree.heading("lot", text="Lot")
 		self.tree.heading("espece", text="Espèce")
@@ -117,15 +126,10 @@ class SoinsFrame(ttk.Frame):
 		self.tree.heading("type", text="Type")
 		self.tree.heading("cout", text="Coût")
 		self.tree.heading("effectue_par", text="Effectué par")
-		self.tree.pack(fill=tk.BOTH, expand=True, pady=6)
+		self.list.pack(fill=tk.BOTH, expand=True, pady=6)
 
 	def _refresh(self):
-		for i in self.tree.get_children():
-			self.tree.delete(i)
-		for row in list_soins():
-			self.tree.insert("", tk.END, values=(
-				row["id"], row["lot_id"], row.get("type_animal"), str(row["date_soin"]), row["type_soin"], row.get("cout", 0), row.get("effectue_par")
-			))
+		self.list.load(lambda after, limit: list_soins(after=after, limit=limit))
 
 	def _selected_id(self) -> Optional[int]:
 		item = self.tree.selection()
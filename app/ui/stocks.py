@@ -3,6 +3,7 @@ from tkinter import ttk, messagebox
 from typing import Optional
 
 from app.dao.stocks import list_stocks, create_product, add_entry, add_exit, set_threshold
+from app.ui.paged_tree import PagedTreeview
 
 
 class ProductForm(tk.Toplevel):
@@ -119,28 +120,35 @@ class StocksFrame(ttk.Frame):
 		self.btn_thr.pack(side=tk.LEFT, padx=6)
 
 		cols = ("id", "nom", "type", "quantite", "unite", "seuil")
-		self.tree = ttk.Treeview(self, columns=cols, show="headings", height=18)
+		self.list = PagedTreeview(
+			self, cols,
+			row_values=lambda row: (row["id"], row["nom_produit"], row["type_produit"], row.get("quantite", 0), row.get("unite"), row.get("seuil", 0)),
+			row_key=lambda row: (row["nom_produit"], row["id"]),
+			row_tags=self._row_tags,
+			height=18,
+		)
+		self.tree = self.list.tree
 		self.tree.heading("id", text="ID")
 		self.tree.heading("nom", text="Nom")
 		self.tree.heading("type", text="Type")
 		self.tree.heading("quantite", text="Quantité")
 		self.tree.heading("unite", text="Unité")
 		self.tree.heading("seuil", text="Seuil")
-		self.tree.pack(fill=tk.BOTH, expand=True, pady=6)
+		self.tree.tag_configure("low", background="#ffe6e6")
+		self.list.pack(fill=tk.BOTH, expand=True, pady=6)
 
 	def _refresh(self):
-		for i in self.tree.get_children():
-			self.tree.delete(i)
-		for row in list_stocks():
-			vals = (row["id"], row["nom_produit"], row["type_produit"], row.get("quantite", 0), row.get("unite"), row.get("seuil", 0))
-			item = self.tree.insert("", tk.END, values=vals)
-			# low stock highlighting
-			try:
-				if row.get("seuil") and row.get("quantite", 0) <= row.get("seuil"):
-					self.tree.item(item, tags=("low",))
-			except Exception:
-				pass
-		self.tree.tag_configure("low", background="#ffe6e6")
+		self.list.load(lambda after, limit: list_stocks(after=after, limit=limit))
+
+	@staticmethod
+	def _row_tags(row: dict) -> tuple:
+		# low stock highlighting
+		try:
+			if row.get("seuil") and row.get("quantite", 0) <= row.get("seuil"):
+				return ("low",)
+		except Exception:
+			pass
+		return ()
 
 	def _selected_id(self) -> Optional[int]:
 		item = self.tree.selection()
@@ -0,0 +1,145 @@
+import threading
+import tkinter as tk
+from tkinter import messagebox
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.db import CancelScope, cancellable
+
+
+# Moins de workers que de connexions dans le pool : le thread Tk garde de quoi
+# servir les formulaires, qui appellent encore le DAO de façon synchrone.
+MAX_WORKERS = 3
+POLL_MS = 30
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="dao")
+
+
+class _Progress:
+	"""Dernière valeur de progression publiée par un worker, lue depuis le thread Tk."""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._value: Any = None
+		self._dirty = False
+
+	def report(self, value: Any) -> None:
+		with self._lock:
+			self._value = value
+			self._dirty = True
+
+	def take(self):
+		with self._lock:
+			if not self._dirty:
+				return None
+			self._dirty = False
+			return self._value
+
+
+def _run(scope: CancelScope, fn: Callable, *args, **kwargs):
+	with cancellable(scope):
+		return fn(*args, **kwargs)
+
+
+def _default_error(exc: BaseException) -> None:
+	messagebox.showerror("Erreur de Base de Données", str(exc))
+
+
+class TaskRunner:
+	"""
+	Exécute des appels DAO hors du thread Tk et livre les résultats via after().
+	Chaque tâche porte une clé (ex. "refresh") : un nouveau submit() sur la même clé
+	rend la précédente obsolète et son résultat est ignoré. cancel() interrompt en plus
+	ses requêtes en cours (voir CancelScope).
+	"""
+
+	def __init__(self, widget: tk.Misc):
+		self._widget = widget
+		# Les after() sont posés sur la fenêtre principale : ils survivent à la
+		# destruction du cadre (navigation), _alive() filtre alors les résultats.
+		self._scheduler = widget.winfo_toplevel()
+		self._generation: Dict[str, int] = {}
+		self._scopes: Dict[str, CancelScope] = {}
+		self._futures: Dict[str, Future] = {}
+
+	def submit(
+		self,
+		key: str,
+		fn: Callable,
+		*args,
+		on_success: Optional[Callable[[Any], None]] = None,
+		on_error: Optional[Callable[[BaseException], None]] = None,
+		on_progress: Optional[Callable[[Any], None]] = None,
+		**kwargs,
+	) -> Future:
+		"""
+		Lance fn(*args, **kwargs) sur le pool de workers. Si on_progress est fourni,
+		fn reçoit un argument progress(valeur) appelable depuis le worker.
+		"""
+		gen = self._generation.get(key, 0) + 1
+		self._generation[key] = gen
+		progress = None
+		if on_progress is not None:
+			progress = _Progress()
+			kwargs["progress"] = progress.report
+		scope = CancelScope()
+		self._scopes[key] = scope
+		future = _executor.submit(_run, scope, fn, *args, **kwargs)
+		self._futures[key] = future
+		self._scheduler.after(POLL_MS, lambda: self._poll(key, gen, future, on_success, on_error, on_progress, progress))
+		return future
+
+	def cancel(self, key: str, on_stopped: Optional[Callable[[], None]] = None) -> None:
+		"""
+		Abandonne la tâche en cours pour cette clé : ses requêtes sont interrompues
+		(QueryCancelled dans le worker, connexions rendues au pool) et son résultat
+		ne sera pas livré. on_stopped() est appelé sur le thread Tk une fois le worker
+		réellement terminé : jusque-là il peut encore écrire son fichier.
+		"""
+		self._generation[key] = self._generation.get(key, 0) + 1
+		scope = self._scopes.pop(key, None)
+		if scope is not None:
+			# KILL QUERY ouvre une connexion : hors du thread Tk, serveur lent ou non
+			threading.Thread(target=scope.cancel, name="cancel", daemon=True).start()
+		future = self._futures.pop(key, None)
+		if on_stopped is not None:
+			self._scheduler.after(POLL_MS, lambda: self._wait_stopped(future, on_stopped))
+
+	def _wait_stopped(self, future: Optional[Future], on_stopped: Callable[[], None]) -> None:
+		if not self._alive():
+			return
+		if future is not None and not future.done():
+			self._scheduler.after(POLL_MS, lambda: self._wait_stopped(future, on_stopped))
+			return
+		on_stopped()
+
+	def _alive(self) -> bool:
+		try:
+			return bool(self._widget.winfo_exists())
+		except tk.TclError:
+			return False
+
+	def _poll(self, key, gen, future, on_success, on_error, on_progress, progress) -> None:
+		if not self._alive():
+			future.cancel()
+			return
+		if self._generation.get(key) != gen:
+			# Une tâche plus récente a été lancée pour la même vue
+			future.cancel()
+			return
+		if progress is not None:
+			value = progress.take()
+			if value is not None:
+				on_progress(value)
+		if not future.done():
+			self._scheduler.after(POLL_MS, lambda: self._poll(key, gen, future, on_success, on_error, on_progress, progress))
+			return
+		try:
+			result = future.result()
+		except CancelledError:
+			return
+		except Exception as exc:
+			(on_error or _default_error)(exc)
+			return
+		if on_success is not None:
+			on_success(result)
@@ -0,0 +1,441 @@
+import gzip
+import json
+import os
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.db import require_mysql, snapshot_connections
+from app.dao.finance_monthly import rebuild_finance_monthly
+from app.dao.kpis import invalidate_kpis
+from app.dao.lot_counters import rebuild_lot_counters
+from app.utils.restore import restore_files
+
+
+# Connexions (et tables sauvegardées simultanément)
+BACKUP_WORKERS = 4
+# Taille visée d'une instruction INSERT multi-lignes (comme net_buffer_length de mysqldump)
+INSERT_BATCH_BYTES = 1 << 20
+FETCH_ROWS = 5000
+
+# Ligne d'en-tête portant le manifeste JSON de la sauvegarde
+MANIFEST_PREFIX = "-- FARM-BACKUP: "
+# Tables recalculées après restauration, jamais incluses dans une incrémentale
+DERIVED_TABLES = ("lot_counters", "finance_monthly")
+# Journal des suppressions alimenté par triggers (migration 008)
+TOMBSTONE_TABLE = "suppressions"
+TRACKING_COLUMN = "updated_at"
+# Recouvrement entre incrémentales : une transaction ouverte pendant l'instantané précédent
+# peut avoir validé après lui une ligne dont updated_at est antérieur à l'instantané.
+INCREMENTAL_OVERLAP = timedelta(minutes=10)
+_DELETE_CHUNK = 1000
+
+# progress(lignes_sauvegardées, total_estimé)
+ProgressFn = Callable[[int, Optional[int]], None]
+
+_ESCAPES = {
+	"\\": "\\\\",
+	"'": "\\'",
+	"\0": "\\0",
+	"\n": "\\n",
+	"\r": "\\r",
+	"\x1a": "\\Z",
+}
+_ESCAPE_TABLE = str.maketrans(_ESCAPES)
+
+
+def quote_ident(name: str) -> str:
+	return "`" + name.replace("`", "``") + "`"
+
+
+def _format_timedelta(value: timedelta) -> str:
+	# Colonnes TIME : peuvent dépasser 24 h ou être négatives
+	seconds = int(value.total_seconds())
+	sign = "-" if seconds < 0 else ""
+	seconds = abs(seconds)
+	micro = abs(value.microseconds) if value.microseconds else 0
+	text = f"{sign}{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+	return text + (f".{micro:06d}" if micro else "")
+
+
+def sql_literal(value) -> str:
+	"""Littéral SQL MySQL d'une valeur renvoyée par le connecteur (format unique des sauvegardes)."""
+	if value is None:
+		return "NULL"
+	if isinstance(value, bool):
+		return "1" if value else "0"
+	if isinstance(value, int):
+		return str(value)
+	if isinstance(value, float):
+		return repr(value)
+	if isinstance(value, Decimal):
+		return str(value)
+	if isinstance(value, (bytes, bytearray)):
+		return "X'" + bytes(value).hex() + "'" if value else "''"
+	if isinstance(value, datetime):
+		return "'" + value.isoformat(sep=" ") + "'"
+	if isinstance(value, (date, time)):
+		return "'" + value.isoformat() + "'"
+	if isinstance(value, timedelta):
+		return "'" + _format_timedelta(value) + "'"
+	if isinstance(value, set):
+		value = ",".join(sorted(value))
+	return "'" + str(value).translate(_ESCAPE_TABLE) + "'"
+
+
+def list_tables(conn) -> List[str]:
+	with conn.cursor() as cur:
+		cur.execute("SHOW FULL TABLES WHERE Table_type = 'BASE TABLE'")
+		return [row[0] for row in cur.fetchall()]
+
+
+def _create_statement(conn, table: str) -> str:
+	with conn.cursor() as cur:
+		cur.execute(f"SHOW CREATE TABLE {quote_ident(table)}")
+		return cur.fetchone()[1]
+
+
+def _estimated_rows(conn) -> Dict[str, int]:
+	with conn.cursor() as cur:
+		cur.execute(
+			"SELECT TABLE_NAME, COALESCE(TABLE_ROWS, 0) FROM information_schema.TABLES"
+			" WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE'"
+		)
+		return {name: int(n) for name, n in cur.fetchall()}
+
+
+def dump_table_rows(
+	conn,
+	table: str,
+	out,
+	on_rows: Optional[Callable[[int], None]] = None,
+	where: str = "",
+	params: tuple = (),
+	upsert: bool = False,
+) -> int:
+	"""
+	Écrit les lignes de `table` dans `out` sous forme d'INSERT multi-lignes d'environ
+	INSERT_BATCH_BYTES. Retourne le nombre de lignes écrites. Avec `upsert`, une ligne
+	déjà présente est mise à jour sur place (ON DUPLICATE KEY UPDATE) : un REPLACE la
+	supprimerait puis la réinsérerait, et les triggers AFTER DELETE de la migration 008
+	journaliseraient à tort sa suppression.
+	"""
+	cur = conn.cursor(buffered=False)
+	written = 0
+	try:
+		cur.execute(f"SELECT * FROM {quote_ident(table)}{where}", params)
+		names = [quote_ident(d[0]) for d in cur.description]
+		columns = ", ".join(names)
+		prefix = f"INSERT INTO {quote_ident(table)} ({columns}) VALUES\n"
+		suffix = ";\n"
+		if upsert:
+			suffix = "\nON DUPLICATE KEY UPDATE " + ", ".join(f"{c}=VALUES({c})" for c in names) + suffix
+		batch: List[str] = []
+		size = 0
+		while True:
+			rows = cur.fetchmany(FETCH_ROWS)
+			if not rows:
+				break
+			for row in rows:
+				values = "(" + ",".join(sql_literal(v) for v in row) + ")"
+				batch.append(values)
+				size += len(values) + 2
+				if size >= INSERT_BATCH_BYTES:
+					out.write(prefix + ",\n".join(batch) + suffix)
+					batch, size = [], 0
+			written += len(rows)
+			if on_rows:
+				on_rows(len(rows))
+		if batch:
+			out.write(prefix + ",\n".join(batch) + suffix)
+	finally:
+		cur.close()
+	return written
+
+
+def _header(manifest: Dict) -> str:
+	return (
+		f"-- FarmManager - sauvegarde {'complète' if manifest['kind'] == 'full' else 'incrémentale'}\n"
+		+ MANIFEST_PREFIX + json.dumps(manifest, ensure_ascii=False) + "\n"
+		"SET NAMES utf8mb4;\n"
+		"SET @OLD_FOREIGN_KEY_CHECKS=@@FOREIGN_KEY_CHECKS, FOREIGN_KEY_CHECKS=0;\n"
+		"SET @OLD_UNIQUE_CHECKS=@@UNIQUE_CHECKS, UNIQUE_CHECKS=0;\n"
+		"SET @OLD_SQL_MODE=@@SQL_MODE, SQL_MODE='NO_AUTO_VALUE_ON_ZERO';\n"
+		"SET @OLD_TIME_ZONE=@@TIME_ZONE, TIME_ZONE='+00:00';\n\n"
+	)
+
+
+_FOOTER = (
+	"SET TIME_ZONE=@OLD_TIME_ZONE;\n"
+	"SET SQL_MODE=@OLD_SQL_MODE;\n"
+	"SET UNIQUE_CHECKS=@OLD_UNIQUE_CHECKS;\n"
+	"SET FOREIGN_KEY_CHECKS=@OLD_FOREIGN_KEY_CHECKS;\n"
+	"-- Fin de la sauvegarde\n"
+)
+
+
+def read_manifest(path: Path) -> Dict:
+	"""Manifeste d'une sauvegarde produite par backup_database() (lu dans l'en-tête)."""
+	opener = gzip.open if str(path).endswith(".gz") else open
+	with opener(path, "rt", encoding="utf-8") as f:
+		for _, line in zip(range(20), f):
+			if line.startswith(MANIFEST_PREFIX):
+				return json.loads(line[len(MANIFEST_PREFIX):])
+	raise ValueError(f"{Path(path).name} n'est pas une sauvegarde FarmManager (manifeste absent)")
+
+
+def _tracked_tables(conn) -> set:
+	with conn.cursor() as cur:
+		cur.execute(
+			"SELECT TABLE_NAME FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND COLUMN_NAME = %s",
+			(TRACKING_COLUMN,),
+		)
+		return {row[0] for row in cur.fetchall()}
+
+
+def _triggers_sql(conn, table: str) -> str:
+	with conn.cursor() as cur:
+		cur.execute(
+			"SELECT TRIGGER_NAME FROM information_schema.TRIGGERS"
+			" WHERE TRIGGER_SCHEMA = DATABASE() AND EVENT_OBJECT_TABLE = %s ORDER BY ACTION_ORDER",
+			(table,),
+		)
+		names = [row[0] for row in cur.fetchall()]
+		parts = []
+		for name in names:
+			cur.execute(f"SHOW CREATE TRIGGER {quote_ident(name)}")
+			# Sans DEFINER : la restauration ne doit pas exiger le compte d'origine
+			create = re.sub(r"\s+DEFINER\s*=\s*`[^`]*`@`[^`]*`", "", cur.fetchone()[2], count=1)
+			parts.append(f"DROP TRIGGER IF EXISTS {quote_ident(name)};\nDELIMITER ;;\n{create};;\nDELIMITER ;\n")
+		return "".join(parts)
+
+
+def _deleted_rows(conn, since: datetime, tables: Iterable[str]) -> Dict[str, List[int]]:
+	"""Identifiants supprimés depuis `since` et toujours absents dans l'instantané, par table."""
+	wanted = set(tables)
+	with conn.cursor() as cur:
+		cur.execute(
+			f"SELECT table_name, row_id FROM {TOMBSTONE_TABLE} WHERE deleted_at >= %s ORDER BY table_name, row_id",
+			(since,),
+		)
+		by_table: Dict[str, set] = {}
+		for table, row_id in cur.fetchall():
+			if table in wanted:
+				by_table.setdefault(table, set()).add(int(row_id))
+		result = {}
+		for table, ids in sorted(by_table.items()):
+			ids_list = sorted(ids)
+			present = set()
+			for k in range(0, len(ids_list), _DELETE_CHUNK):
+				chunk = ids_list[k:k + _DELETE_CHUNK]
+				cur.execute(
+					f"SELECT id FROM {quote_ident(table)} WHERE id IN ({','.join(['%s'] * len(chunk))})",
+					tuple(chunk),
+				)
+				present.update(int(r[0]) for r in cur.fetchall())
+			gone = [i for i in ids_list if i not in present]
+			if gone:
+				result[table] = gone
+	return result
+
+
+def _deletes_sql(deleted: Dict[str, List[int]]) -> str:
+	if not deleted:
+		return ""
+	# Contraintes actives : la suppression d'un lot se propage à ses événements comme à l'origine
+	parts = ["--\n-- Suppressions\n--\nSET FOREIGN_KEY_CHECKS=1;\n"]
+	for table, ids in deleted.items():
+		for k in range(0, len(ids), _DELETE_CHUNK):
+			chunk = ids[k:k + _DELETE_CHUNK]
+			parts.append(f"DELETE FROM {quote_ident(table)} WHERE id IN ({','.join(str(i) for i in chunk)});\n")
+	parts.append("SET FOREIGN_KEY_CHECKS=0;\n\n")
+	return "".join(parts)
+
+
+def backup_database(
+	out_path: Path,
+	progress: Optional[ProgressFn] = None,
+	workers: int = BACKUP_WORKERS,
+	compresslevel: int = 6,
+	parent: Optional[Dict] = None,
+) -> Dict:
+	"""
+	Sauvegarde en SQL compressé gzip, sans mysqldump. Retourne le manifeste écrit en en-tête.
+
+	Sans `parent` : sauvegarde complète (schéma, données, triggers). Avec le manifeste
+	de la sauvegarde précédente (read_manifest) : sauvegarde incrémentale contenant
+	seulement les lignes modifiées depuis (selon updated_at, réécrites par INSERT … ON
+	DUPLICATE KEY UPDATE) et les suppressions journalisées par les triggers. Les tables
+	dérivées sont omises.
+
+	Chaque worker sauvegarde des tables sur sa propre connexion, toutes ouvertes sur le
+	même instantané (START TRANSACTION WITH CONSISTENT SNAPSHOT). Chaque table est
+	compressée dans un membre gzip séparé, en parallèle ; les membres sont ensuite
+	concaténés dans l'ordre, ce qui forme un fichier gzip valide restaurable par
+	`gunzip < fichier | mysql`.
+	"""
+	require_mysql("Sauvegarde")
+	incremental = parent is not None
+	with snapshot_connections(workers) as (conns, synchronized), tempfile.TemporaryDirectory(prefix="backup_") as tmp:
+		for conn in conns:
+			# Valeurs TIMESTAMP lues (et comparées) en UTC, cohérent avec le TIME_ZONE de l'en-tête
+			with conn.cursor() as cur:
+				cur.execute("SET SESSION time_zone = '+00:00'")
+		with conns[0].cursor() as cur:
+			cur.execute("SELECT UTC_TIMESTAMP(6), DATABASE()")
+			snapshot_at, database = cur.fetchone()
+		tables = list_tables(conns[0])
+		since = None
+		tracked = set()
+		if incremental:
+			tracked = _tracked_tables(conns[0])
+			if not tracked or TOMBSTONE_TABLE not in tables:
+				raise RuntimeError("Suivi des modifications absent : appliquez la migration 008_change_tracking.sql")
+			since = datetime.fromisoformat(parent["snapshot_at"]) - INCREMENTAL_OVERLAP
+			tables = [t for t in tables if t not in DERIVED_TABLES and t != TOMBSTONE_TABLE]
+		estimates = _estimated_rows(conns[0])
+		total = sum(estimates.get(t, 0) for t in tables) or None
+		lock = threading.Lock()
+		done = {"rows": 0}
+		counts: Dict[str, int] = {}
+		todo: "queue.Queue[str]" = queue.Queue()
+		for table in sorted(tables, key=lambda t: -estimates.get(t, 0)):
+			todo.put(table)
+
+		def on_rows(n: int) -> None:
+			with lock:
+				done["rows"] += n
+				current = done["rows"]
+			if progress:
+				progress(current, max(total, current) if total else None)
+
+		def dump_full(conn, table: str, out) -> int:
+			out.write(f"DROP TABLE IF EXISTS {quote_ident(table)};\n")
+			out.write(_create_statement(conn, table) + ";\n")
+			out.write(f"LOCK TABLES {quote_ident(table)} WRITE;\n")
+			n = dump_table_rows(conn, table, out, on_rows)
+			out.write("UNLOCK TABLES;\n")
+			out.write(_triggers_sql(conn, table) + "\n")
+			return n
+
+		def dump_changes(conn, table: str, out) -> int:
+			if table in tracked:
+				where = f" WHERE {quote_ident(TRACKING_COLUMN)} >= %s"
+				return dump_table_rows(conn, table, out, on_rows, where=where, params=(since,), upsert=True)
+			# Table sans suivi : contenu remplacé en entier
+			out.write(f"DELETE FROM {quote_ident(table)};\n")
+			return dump_table_rows(conn, table, out, on_rows)
+
+		def work(conn) -> None:
+			while True:
+				try:
+					table = todo.get_nowait()
+				except queue.Empty:
+					return
+				part = Path(tmp) / f"{table}.sql.gz"
+				with gzip.open(part, "wt", encoding="utf-8", compresslevel=compresslevel) as out:
+					out.write(f"--\n-- Table {quote_ident(table)}\n--\n")
+					n = dump_changes(conn, table, out) if incremental else dump_full(conn, table, out)
+				with lock:
+					counts[table] = n
+
+		workers_used = conns[: max(1, min(len(conns), len(tables)))]
+		with ThreadPoolExecutor(max_workers=len(workers_used), thread_name_prefix="backup") as pool:
+			for future in [pool.submit(work, conn) for conn in workers_used]:
+				future.result()
+		deleted = _deleted_rows(conns[0], since, tracked) if incremental else {}
+
+		backup_id = snapshot_at.strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:8]
+		manifest = {
+			"version": 1,
+			"kind": "incremental" if incremental else "full",
+			"id": backup_id,
+			"base": (parent.get("base") or parent["id"]) if incremental else backup_id,
+			"parent": parent["id"] if incremental else None,
+			"database": database,
+			"snapshot_at": snapshot_at.isoformat(),
+			"since": since.isoformat() if since else None,
+			"synchronized": synchronized,
+			"tables": {t: counts[t] for t in tables},
+			"deleted": {t: len(ids) for t, ids in deleted.items()},
+		}
+		partial = Path(str(out_path) + ".part")
+		try:
+			with open(partial, "wb") as raw:
+				with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=compresslevel) as head:
+					head.write(_header(manifest).encode("utf-8"))
+				for table in tables:
+					with open(Path(tmp) / f"{table}.sql.gz", "rb") as part:
+						shutil.copyfileobj(part, raw)
+				with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=compresslevel) as foot:
+					foot.write((_deletes_sql(deleted) + _FOOTER).encode("utf-8"))
+			os.replace(partial, out_path)
+		except BaseException:
+			partial.unlink(missing_ok=True)
+			raise
+	return manifest
+
+
+def order_chain(paths: Sequence[Path]) -> List[Tuple[Path, Dict]]:
+	"""
+	Ordonne une sauvegarde complète et ses incrémentales : la complète d'abord, puis chaque
+	incrémentale dont le parent est la précédente. Lève ValueError si la chaîne est incomplète.
+	"""
+	items = [(Path(p), read_manifest(p)) for p in paths]
+	fulls = [it for it in items if it[1]["kind"] == "full"]
+	if len(fulls) != 1:
+		raise ValueError("Sélectionnez exactement une sauvegarde complète et ses incrémentales")
+	chain = [fulls[0]]
+	rest = {m["parent"]: (p, m) for p, m in items if m["kind"] == "incremental"}
+	if len(rest) != len(items) - 1:
+		raise ValueError("Deux incrémentales ont le même parent")
+	while chain[-1][1]["id"] in rest:
+		chain.append(rest.pop(chain[-1][1]["id"]))
+	if rest:
+		names = ", ".join(p.name for p, _ in rest.values())
+		raise ValueError(f"Incrémentale(s) hors de la chaîne de {chain[0][0].name} : {names}")
+	base_id = chain[0][1]["id"]
+	for p, m in chain[1:]:
+		if m["base"] != base_id:
+			raise ValueError(f"{p.name} ne dérive pas de {chain[0][0].name}")
+	return chain
+
+
+def rebuild_derived_tables() -> None:
+	"""Recalcule les tables dérivées après une restauration, puis invalide le cache des KPI."""
+	rebuild_lot_counters()
+	rebuild_finance_monthly()
+	invalidate_kpis()
+
+
+def restore_chain(paths: Sequence[Path], progress: Optional[ProgressFn] = None) -> List[Dict]:
+	"""
+	Restaure une sauvegarde complète puis ses incrémentales dans l'ordre de la chaîne,
+	et recalcule lot_counters et finance_monthly. Un simple fichier .sql sans manifeste
+	est rejoué tel quel. progress(octets_lus, octets_total) porte sur l'ensemble des
+	fichiers. Retourne les manifestes appliqués.
+	"""
+	paths = [Path(p) for p in paths]
+	if len(paths) == 1 and not _has_manifest(paths[0]):
+		chain = [(paths[0], None)]
+	else:
+		chain = order_chain(paths)
+	restore_files([path for path, _ in chain], progress)
+	rebuild_derived_tables()
+	return [m for _, m in chain if m]
+
+
+def _has_manifest(path: Path) -> bool:
+	try:
+		read_manifest(path)
+		return True
+	except (ValueError, OSError, UnicodeDecodeError):
+		return False
@@ -0,0 +1,354 @@
+import gzip
+import hashlib
+import re
+import struct
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from app.db import require_mysql, snapshot_connections
+from app.utils.backup import FETCH_ROWS, list_tables, quote_ident, read_manifest
+
+
+# Largeur (en valeurs de clé primaire) d'une tranche : granularité des écarts signalés
+CHUNK_IDS = 10000
+
+_MASK = (1 << 64) - 1
+_INT_TYPES = {"tinyint", "smallint", "mediumint", "int", "integer", "bigint"}
+_FLOAT_TYPES = {"float", "double", "real"}
+_BINARY_TYPES = {"binary", "varbinary", "tinyblob", "blob", "mediumblob", "longblob"}
+# Flottants comparés à 6 décimales : CAST(... AS DECIMAL) côté serveur, Decimal côté fichier
+_FLOAT_SCALE = 6
+_FLOAT_QUANTUM = Decimal(1).scaleb(-_FLOAT_SCALE)
+_NULL = "N"
+
+# progress(lignes_traitées, total_estimé)
+ProgressFn = Callable[[int, Optional[int]], None]
+
+_CREATE_RE = re.compile(r"^CREATE TABLE `((?:[^`]|``)+)` \($")
+_COLUMN_RE = re.compile(r"^\s+`((?:[^`]|``)+)` (\w+)")
+_PRIMARY_RE = re.compile(r"^\s+PRIMARY KEY \((.*)\)")
+_INSERT_RE = re.compile(r"^(?:INSERT|REPLACE) INTO `((?:[^`]|``)+)` \(.*\) VALUES$")
+# Littéraux écrits par sql_literal : NULL, X'hex', 'chaîne échappée', nombre
+_LITERAL_RE = re.compile(r"X'([0-9a-fA-F]*)'|'((?:[^'\\]|\\.)*)'|([^,]+)", re.DOTALL)
+_UNESCAPE_RE = re.compile(r"\\(.)", re.DOTALL)
+_UNESCAPES = {"0": "\0", "n": "\n", "r": "\r", "Z": "\x1a"}
+
+
+def _column_expr(column: str, data_type: str) -> str:
+	"""
+	Texte canonique d'une colonne calculé par MySQL, reproductible en Python depuis le
+	littéral d'une sauvegarde (_canonical) : entiers et décimaux en texte, flottants à
+	6 décimales, dates à la microseconde, chaînes et binaires en hexadécimal.
+	"""
+	col = quote_ident(column)
+	if data_type in _INT_TYPES or data_type in ("decimal", "numeric", "year"):
+		expr = f"CAST({col} AS CHAR)"
+	elif data_type == "bit":
+		expr = f"CAST({col} + 0 AS CHAR)"
+	elif data_type in _FLOAT_TYPES:
+		expr = f"CAST({col} AS DECIMAL(65,{_FLOAT_SCALE}))"
+	elif data_type == "date":
+		expr = f"DATE_FORMAT({col}, '%Y-%m-%d')"
+	elif data_type in ("datetime", "timestamp"):
+		expr = f"DATE_FORMAT({col}, '%Y-%m-%d %H:%i:%s.%f')"
+	elif data_type == "time":
+		expr = f"TIME_FORMAT({col}, '%H:%i:%s.%f')"
+	elif data_type in _BINARY_TYPES:
+		expr = f"HEX({col})"
+	else:
+		expr = f"HEX(CONVERT({col} USING utf8mb4))"
+	return f"IFNULL({expr}, '{_NULL}')"
+
+
+def _row_hash_expr(columns: List[Tuple[str, str]]) -> str:
+	# Empreinte 64 bits de la ligne : 16 premiers chiffres hexadécimaux du MD5 du texte canonique
+	row = "CONCAT_WS('|', " + ", ".join(_column_expr(c, t) for c, t in columns) + ")"
+	return f"CAST(CONV(LEFT(MD5({row}), 16), 16, 10) AS UNSIGNED)"
+
+
+Literal = Union[None, str, bytes]
+
+
+def _parse_values(values_text: str) -> List[Literal]:
+	"""Littéraux d'un tuple (v1,v2,...) de sauvegarde : None, bytes (X'..'), chaîne déséchappée ou nombre (texte)."""
+	values: List[Literal] = []
+	inner = values_text[1:-1]
+	pos = 0
+	while pos <= len(inner):
+		m = _LITERAL_RE.match(inner, pos)
+		if m is None:
+			raise ValueError(f"Tuple de sauvegarde illisible : {values_text[:200]}")
+		hex_text, quoted, bare = m.groups()
+		if hex_text is not None:
+			values.append(bytes.fromhex(hex_text))
+		elif quoted is not None:
+			values.append(_UNESCAPE_RE.sub(lambda e: _UNESCAPES.get(e.group(1), e.group(1)), quoted) if "\\" in quoted else quoted)
+		else:
+			values.append(None if bare == "NULL" else bare)
+		pos = m.end() + 1
+	return values
+
+
+def _canonical(value: Literal, data_type: str) -> str:
+	"""Texte canonique d'un littéral de sauvegarde, identique à celui de _column_expr."""
+	if value is None:
+		return _NULL
+	if data_type in _INT_TYPES or data_type in ("bit", "year"):
+		return str(int(value))
+	if data_type in ("decimal", "numeric"):
+		return format(Decimal(value), "f")
+	if data_type in _FLOAT_TYPES:
+		number = float(value)
+		if data_type == "float":
+			# Colonne FLOAT : MySQL convertit la valeur simple précision stockée
+			number = struct.unpack("<f", struct.pack("<f", number))[0]
+		rounded = Decimal(number).quantize(_FLOAT_QUANTUM, rounding=ROUND_HALF_UP)
+		return format(rounded.copy_abs() if not rounded else rounded, "f")
+	if data_type in ("datetime", "timestamp", "time"):
+		return value if "." in value else value + ".000000"
+	if data_type == "date":
+		return value
+	raw = value if isinstance(value, bytes) else value.encode("utf-8")
+	return raw.hex().upper()
+
+
+def _row_hash(values: List[Literal], types: List[str]) -> int:
+	text = "|".join(_canonical(v, t) for v, t in zip(values, types))
+	return int(hashlib.md5(text.encode("ascii")).hexdigest()[:16], 16)
+
+
+def _new_table(columns: List[str], chunked: bool) -> Dict:
+	"""
+	Somme de contrôle d'une table : colonnes, nombre de lignes et, par tranche de clé
+	primaire, [lignes, somme des empreintes modulo 2^64]. La somme ne dépend pas de l'ordre
+	des lignes. Sans clé primaire entière en première colonne, une seule tranche (0).
+	"""
+	return {"columns": columns, "chunked": chunked, "rows": 0, "chunks": {}}
+
+
+def _add_chunk(entry: Dict, chunk: int, rows: int, digest: int) -> None:
+	slot = entry["chunks"].get(chunk)
+	if slot is None:
+		slot = entry["chunks"][chunk] = [0, 0]
+	slot[0] += rows
+	slot[1] = (slot[1] + digest) & _MASK
+	entry["rows"] += rows
+
+
+def _table_layouts(conn, tables: Iterable[str]) -> Dict[str, Tuple[List[Tuple[str, str]], bool]]:
+	"""([(colonne, type)], découpable) par table : découpable si la clé primaire est la première colonne, seule et entière."""
+	wanted = set(tables)
+	with conn.cursor() as cur:
+		cur.execute(
+			"SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, COLUMN_KEY FROM information_schema.COLUMNS"
+			" WHERE TABLE_SCHEMA = DATABASE() ORDER BY TABLE_NAME, ORDINAL_POSITION"
+		)
+		rows = [r for r in cur.fetchall() if r[0] in wanted]
+	layouts: Dict[str, Tuple[List[Tuple[str, str]], bool]] = {}
+	for table in wanted:
+		cols = [r for r in rows if r[0] == table]
+		primary = [r for r in cols if r[3] == "PRI"]
+		chunked = len(primary) == 1 and primary[0] is cols[0] and cols[0][2].lower() in _INT_TYPES
+		layouts[table] = ([(r[1], r[2].lower()) for r in cols], chunked)
+	return layouts
+
+
+def checksum_database(tables: Optional[Iterable[str]] = None, progress: Optional[ProgressFn] = None, estimated_total: Optional[int] = None) -> Dict[str, Dict]:
+	"""
+	Sommes de contrôle des tables de la base, lues sur un instantané cohérent et calculées
+	par le serveur : une requête d'agrégat par tranche de clé primaire (WHERE id >= a AND
+	id < b, via l'index primaire) renvoie seulement le nombre de lignes et la somme des
+	empreintes. Aucune ligne ne transite par le client. Le texte haché est celui que
+	checksum_backup() reconstitue depuis les littéraux d'une sauvegarde (TIMESTAMP en UTC).
+	"""
+	require_mysql("Vérification de sauvegarde")
+	done = 0
+	result: Dict[str, Dict] = {}
+	with snapshot_connections(1) as (conns, _synchronized):
+		conn = conns[0]
+		with conn.cursor() as cur:
+			cur.execute("SET SESSION time_zone = '+00:00'")
+		tables = list(tables) if tables is not None else list_tables(conn)
+		layouts = _table_layouts(conn, tables)
+		for table in tables:
+			columns, chunked = layouts[table]
+			entry = result[table] = _new_table([c for c, _ in columns], chunked)
+			name = quote_ident(table)
+			digest = f"SELECT COUNT(*), SUM({_row_hash_expr(columns)}) FROM {name}"
+			if not chunked:
+				ranges = [(0, digest)]
+			else:
+				ranges = _chunk_ranges(conn, name, quote_ident(columns[0][0]), digest)
+			for chunk, query in ranges:
+				with conn.cursor() as cur:
+					# Sans paramètres : les formats de DATE_FORMAT contiennent %s
+					cur.execute(query)
+					rows, total = cur.fetchone()
+				if not rows:
+					continue
+				_add_chunk(entry, chunk, int(rows), int(total))
+				done += int(rows)
+				if progress:
+					progress(done, max(estimated_total, done) if estimated_total else None)
+	return result
+
+
+def _chunk_ranges(conn, name: str, pk: str, digest: str):
+	"""(tranche, requête d'agrégat) pour chaque tranche non vide, de la plus petite clé à la plus grande."""
+	start = None
+	while True:
+		with conn.cursor() as cur:
+			if start is None:
+				cur.execute(f"SELECT MIN({pk}) FROM {name}")
+			else:
+				cur.execute(f"SELECT MIN({pk}) FROM {name} WHERE {pk} >= %s", (start,))
+			first = cur.fetchone()[0]
+		if first is None:
+			return
+		chunk = int(first) // CHUNK_IDS
+		start = (chunk + 1) * CHUNK_IDS
+		yield chunk, f"{digest} WHERE {pk} >= {chunk * CHUNK_IDS} AND {pk} < {start}"
+
+
+def checksum_backup(path: Path, progress: Optional[ProgressFn] = None, estimated_total: Optional[int] = None) -> Dict[str, Dict]:
+	"""
+	Sommes de contrôle d'une sauvegarde complète produite par backup_database(), calculées
+	en lisant le fichier ligne à ligne (un tuple VALUES par ligne dans ce format). Chaque
+	littéral est ramené au texte canonique haché par le serveur dans checksum_database().
+	"""
+	manifest = read_manifest(path)
+	if manifest.get("kind") != "full":
+		raise ValueError("La vérification nécessite une sauvegarde complète")
+	total = estimated_total or sum(manifest["tables"].values()) or None
+	done = 0
+	result: Dict[str, Dict] = {}
+	types: Dict[str, List[str]] = {}
+	opener = gzip.open if str(path).endswith(".gz") else open
+	entry = None
+	entry_types: List[str] = []
+	creating: Optional[Dict] = None
+	with opener(path, "rt", encoding="utf-8", newline="") as f:
+		for line in f:
+			line = line.rstrip("\r\n")
+			if entry is not None:
+				# Tuple d'un INSERT multi-lignes, suivi de "," ou du ";" final
+				last = line.endswith(";")
+				values = _parse_values(line[:-1] if line and line[-1] in ",;" else line)
+				chunk = int(values[0]) // CHUNK_IDS if entry["chunked"] else 0
+				_add_chunk(entry, chunk, 1, _row_hash(values, entry_types))
+				done += 1
+				if progress and done % FETCH_ROWS == 0:
+					progress(done, max(total, done) if total else None)
+				if last:
+					entry = None
+				continue
+			if creating is not None:
+				m = _COLUMN_RE.match(line)
+				if m:
+					creating["columns"].append((m.group(1).replace("``", "`"), m.group(2).lower()))
+					continue
+				m = _PRIMARY_RE.match(line)
+				if m:
+					creating["primary"] = [c.strip().strip("`") for c in m.group(1).split(",")]
+					continue
+				if line.startswith(")"):
+					cols = creating["columns"]
+					chunked = (
+						len(creating.get("primary", [])) == 1
+						and bool(cols) and creating["primary"][0] == cols[0][0]
+						and cols[0][1] in _INT_TYPES
+					)
+					result[creating["table"]] = _new_table([c for c, _ in cols], chunked)
+					types[creating["table"]] = [t for _, t in cols]
+					creating = None
+				continue
+			m = _CREATE_RE.match(line)
+			if m:
+				creating = {"table": m.group(1).replace("``", "`"), "columns": []}
+				continue
+			m = _INSERT_RE.match(line)
+			if m:
+				table = m.group(1).replace("``", "`")
+				entry, entry_types = result[table], types[table]
+	if progress:
+		progress(done, max(total, done) if total else None)
+	return result
+
+
+def diff_checksums(a: Dict[str, Dict], b: Dict[str, Dict]) -> List[Dict]:
+	"""
+	Compare deux ensembles de sommes de contrôle. Retourne une entrée par table différente :
+	{"table", "status" ("absente_a", "absente_b", "colonnes", "contenu"), "rows_a", "rows_b",
+	"ranges": [(id_min, id_max), ...]} ; les tranches contiguës sont fusionnées.
+	"""
+	diffs = []
+	for table in sorted(set(a) | set(b)):
+		ta, tb = a.get(table), b.get(table)
+		entry = {
+			"table": table,
+			"rows_a": ta["rows"] if ta else None,
+			"rows_b": tb["rows"] if tb else None,
+			"ranges": [],
+		}
+		if ta is None or tb is None:
+			entry["status"] = "absente_a" if ta is None else "absente_b"
+		elif ta["columns"] != tb["columns"]:
+			entry["status"] = "colonnes"
+		else:
+			chunks = sorted(c for c in set(ta["chunks"]) | set(tb["chunks"]) if ta["chunks"].get(c) != tb["chunks"].get(c))
+			if not chunks:
+				continue
+			entry["status"] = "contenu"
+			if ta["chunked"]:
+				entry["ranges"] = _merge_chunks(chunks)
+		diffs.append(entry)
+	return diffs
+
+
+def _merge_chunks(chunks: List[int]) -> List[Tuple[int, int]]:
+	ranges: List[List[int]] = []
+	for c in chunks:
+		if ranges and ranges[-1][1] == c - 1:
+			ranges[-1][1] = c
+		else:
+			ranges.append([c, c])
+	return [(lo * CHUNK_IDS, (hi + 1) * CHUNK_IDS - 1) for lo, hi in ranges]
+
+
+def verify_backup(path: Path, progress: Optional[ProgressFn] = None) -> List[Dict]:
+	"""Compare une sauvegarde complète (a) à la base actuelle (b). Retourne diff_checksums()."""
+	rows = sum(read_manifest(path)["tables"].values())
+	# Progression commune aux deux passes : environ deux fois le nombre de lignes sauvegardées
+	total = 2 * rows or None
+	backup = checksum_backup(path, progress, estimated_total=total)
+
+	def db_progress(done: int, _total) -> None:
+		if progress:
+			progress(rows + done, max(total, rows + done) if total else None)
+
+	live = checksum_database(progress=db_progress)
+	return diff_checksums(backup, live)
+
+
+def describe_diff(diffs: List[Dict], label_a: str, label_b: str) -> List[str]:
+	"""Lignes lisibles décrivant le résultat de diff_checksums()."""
+	if not diffs:
+		return ["Aucune différence."]
+	lines = []
+	for d in diffs:
+		if d["status"] == "absente_a":
+			lines.append(f"{d['table']} : absente de {label_a}")
+		elif d["status"] == "absente_b":
+			lines.append(f"{d['table']} : absente de {label_b}")
+		elif d["status"] == "colonnes":
+			lines.append(f"{d['table']} : colonnes différentes")
+		else:
+			where = ", ".join(f"{lo}-{hi}" for lo, hi in d["ranges"][:10])
+			if len(d["ranges"]) > 10:
+				where += f" (+{len(d['ranges']) - 10} plages)"
+			lines.append(
+				f"{d['table']} : {d['rows_a']} ligne(s) dans {label_a}, {d['rows_b']} dans {label_b}"
+				+ (f" ; ids {where}" if where else " ; contenu différent")
+			)
+	return lines
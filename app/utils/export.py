@@ -1,32 +1,285 @@
+import csv
+import hashlib
+import json
+import os
+import queue
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-import pandas as pd
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
-from app.db import get_connection
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 
+from app.db import REPORTING, SQLITE, backend, get_connection, lift_time_limit, snapshot_connections
 
-def export_query_to_csv(query: str, params: tuple, out_path: Path) -> None:
-	conn = get_connection()
+
+# Lignes lues par aller-retour : borne la mémoire quelle que soit la taille de la table
+CHUNK_SIZE = 5000
+
+# Limite d'Excel : 1 048 576 lignes par feuille, dont l'en-tête
+EXCEL_MAX_ROWS = 1048576 - 1
+
+# Connexions (et donc tables exportées simultanément) pour un export complet
+EXPORT_WORKERS = 4
+
+# progress(lignes_ecrites, total) ; total vaut None s'il est inconnu
+ProgressFn = Callable[[int, Optional[int]], None]
+
+
+def _stream_query(query: str, params: tuple, chunk_size: int = CHUNK_SIZE, conn=None) -> Iterator[Tuple[List[str], List[tuple]]]:
+	"""
+	Exécute la requête sur un curseur non bufferisé et produit (colonnes, lignes)
+	par paquets de `chunk_size` : le résultat n'est jamais chargé en entier en mémoire.
+	Avec `conn`, la requête s'exécute sur cette connexion, qui reste ouverte ensuite ;
+	sinon sur une connexion du pool REPORTING, sans limite de durée.
+	"""
+	owned = conn is None
+	if owned:
+		conn = get_connection(REPORTING)
+		lift_time_limit(conn)
+	cur = conn.cursor(buffered=False)
+	finished = False
 	try:
-		df = pd.read_sql(query, conn, params=params)
-		df.to_csv(out_path, index=False, encoding="utf-8-sig")
+		cur.execute(query, params)
+		columns = [d[0] for d in cur.description]
+		while True:
+			rows = cur.fetchmany(chunk_size)
+			if not rows:
+				break
+			yield columns, rows
+		finished = True
 	finally:
-		conn.close()
+		if not finished:
+			# Export interrompu : vider le résultat en attente avant de rendre la connexion au pool
+			try:
+				conn.consume_results()
+			except Exception:
+				pass
+		cur.close()
+		if owned:
+			conn.close()
 
 
-def export_query_to_excel(query: str, params: tuple, out_path: Path, sheet_name: str = "Feuille1") -> None:
-	conn = get_connection()
+def count_rows(table: str) -> int:
+	conn = get_connection(REPORTING)
 	try:
-		df = pd.read_sql(query, conn, params=params)
-		df.to_excel(out_path, index=False, sheet_name=sheet_name)
+		with conn.cursor() as cur:
+			cur.execute(f"SELECT COUNT(*) FROM {table}")
+			return int(cur.fetchone()[0])
 	finally:
 		conn.close()
 
 
-def export_table_csv(table: str, out_path: Path) -> None:
-	export_query_to_csv(f"SELECT * FROM {table}", (), out_path)
+def export_query_to_csv(
+	query: str,
+	params: tuple,
+	out_path: Path,
+	progress: Optional[ProgressFn] = None,
+	total: Optional[int] = None,
+	chunk_size: int = CHUNK_SIZE,
+	conn=None,
+) -> int:
+	"""Écrit le résultat de la requête en CSV au fil de l'eau. Retourne le nombre de lignes écrites."""
+	written = 0
+	with open(out_path, "w", newline="", encoding="utf-8-sig") as f:
+		writer = csv.writer(f)
+		header_done = False
+		for columns, rows in _stream_query(query, params, chunk_size, conn=conn):
+			if not header_done:
+				writer.writerow(columns)
+				header_done = True
+			writer.writerows(rows)
+			written += len(rows)
+			if progress:
+				progress(written, total)
+		if not header_done:
+			# Table vide : l'en-tête reste utile pour un import ultérieur
+			writer.writerow(_columns_of(query, params, conn=conn))
+	return written
+
+
+def _columns_of(query: str, params: tuple, conn=None) -> List[str]:
+	owned = conn is None
+	if owned:
+		conn = get_connection(REPORTING)
+	try:
+		with conn.cursor() as cur:
+			cur.execute(f"SELECT * FROM ({query}) q LIMIT 0", params)
+			cur.fetchall()
+			return [d[0] for d in cur.description]
+	finally:
+		if owned:
+			conn.close()
+
+
+def _excel_value(value):
+	# Les caractères de contrôle sont refusés par openpyxl, les octets ne sont pas écrivables tels quels
+	if isinstance(value, (bytes, bytearray)):
+		value = value.decode("utf-8", errors="replace")
+	if isinstance(value, str):
+		return ILLEGAL_CHARACTERS_RE.sub("", value)
+	return value
+
+
+def _sheet_title(base: str, index: int) -> str:
+	# 31 caractères maximum pour un nom de feuille
+	if index == 1:
+		return base[:31]
+	suffix = f"_{index}"
+	return base[:31 - len(suffix)] + suffix
+
+
+def export_query_to_excel(
+	query: str,
+	params: tuple,
+	out_path: Path,
+	sheet_name: str = "Feuille1",
+	progress: Optional[ProgressFn] = None,
+	total: Optional[int] = None,
+	chunk_size: int = CHUNK_SIZE,
+	max_rows: int = EXCEL_MAX_ROWS,
+) -> int:
+	"""
+	Écrit le résultat de la requête dans un classeur en mode écriture seule (lignes
+	envoyées au fil de l'eau, non conservées en mémoire). Au-delà de `max_rows` lignes,
+	la suite part dans une nouvelle feuille (sheet_name_2, sheet_name_3...).
+	Retourne le nombre de lignes écrites.
+	"""
+	wb = Workbook(write_only=True)
+	ws = None
+	sheets = 0
+	in_sheet = 0
+	written = 0
+	for columns, rows in _stream_query(query, params, chunk_size):
+		for row in rows:
+			if ws is None or in_sheet >= max_rows:
+				sheets += 1
+				ws = wb.create_sheet(_sheet_title(sheet_name, sheets))
+				ws.append(columns)
+				in_sheet = 0
+			ws.append([_excel_value(v) for v in row])
+			in_sheet += 1
+		written += len(rows)
+		if progress:
+			progress(written, total)
+	if ws is None:
+		ws = wb.create_sheet(_sheet_title(sheet_name, 1))
+		ws.append(_columns_of(query, params))
+	wb.save(out_path)
+	return written
+
+
+def export_table_csv(table: str, out_path: Path, progress: Optional[ProgressFn] = None) -> int:
+	total = count_rows(table) if progress else None
+	return export_query_to_csv(f"SELECT * FROM {table}", (), out_path, progress=progress, total=total)
+
+
+def export_table_excel(table: str, out_path: Path, progress: Optional[ProgressFn] = None) -> int:
+	total = count_rows(table) if progress else None
+	return export_query_to_excel(f"SELECT * FROM {table}", (), out_path, sheet_name=table, progress=progress, total=total)
+
+
+def _file_sha256(path: Path) -> str:
+	h = hashlib.sha256()
+	with open(path, "rb") as f:
+		for block in iter(lambda: f.read(1 << 20), b""):
+			h.update(block)
+	return h.hexdigest()
+
+
+def estimated_rows(conn, tables: Sequence[str]) -> Dict[str, int]:
+	# Estimation InnoDB (information_schema) : sert à la progression et à l'ordre de traitement
+	if backend() == SQLITE:
+		# Pas de statistiques de table en SQLite : comptage exact, local et rapide
+		result = {}
+		with conn.cursor() as cur:
+			for table in tables:
+				cur.execute(f"SELECT COUNT(*) FROM {table}")
+				result[table] = int(cur.fetchone()[0])
+		return result
+	placeholders = ",".join(["%s"] * len(tables))
+	with conn.cursor() as cur:
+		cur.execute(
+			f"SELECT TABLE_NAME, COALESCE(TABLE_ROWS, 0) FROM information_schema.TABLES"
+			f" WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({placeholders})",
+			tuple(tables),
+		)
+		return {name: int(n) for name, n in cur.fetchall()}
+
+
+def export_all_tables(
+	tables: Sequence[str],
+	out_path: Path,
+	progress: Optional[ProgressFn] = None,
+	workers: int = EXPORT_WORKERS,
+) -> Dict:
+	"""
+	Exporte toutes les tables en CSV dans une seule archive zip, en parallèle : chaque
+	worker dispose de sa propre connexion, toutes ouvertes sur le même instantané
+	(voir snapshot_connections). L'archive contient aussi manifest.json (lignes,
+	taille et SHA-256 de chaque fichier). Retourne le manifeste.
+	"""
+	tables = list(tables)
+	workers = max(1, min(workers, len(tables)))
+	lock = threading.Lock()
+	done = {"rows": 0}
+	entries: Dict[str, Dict] = {}
+
+	with tempfile.TemporaryDirectory(prefix="export_") as tmp, snapshot_connections(workers) as (conns, synchronized):
+		estimates = estimated_rows(conns[0], tables)
+		total = sum(estimates.values()) or None
+		# Les plus grosses tables d'abord : meilleure répartition entre workers
+		todo: "queue.Queue[str]" = queue.Queue()
+		for table in sorted(tables, key=lambda t: -estimates.get(t, 0)):
+			todo.put(table)
+
+		def report(n: int) -> None:
+			with lock:
+				done["rows"] += n
+				current = done["rows"]
+			if progress:
+				progress(current, max(total, current) if total else None)
+
+		def work(conn) -> None:
+			while True:
+				try:
+					table = todo.get_nowait()
+				except queue.Empty:
+					return
+				path = Path(tmp) / f"{table}.csv"
+				last = {"n": 0}
 
+				def table_progress(n, _total, last=last):
+					report(n - last["n"])
+					last["n"] = n
 
-def export_table_excel(table: str, out_path: Path) -> None:
-	export_query_to_excel(f"SELECT * FROM {table}", (), out_path, sheet_name=table)
+				rows = export_query_to_csv(f"SELECT * FROM {table}", (), path, progress=table_progress, conn=conn)
+				entry = {"file": path.name, "rows": rows, "bytes": path.stat().st_size, "sha256": _file_sha256(path)}
+				with lock:
+					entries[table] = entry
 
+		with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export") as pool:
+			for future in [pool.submit(work, conn) for conn in conns]:
+				future.result()
 
+		manifest = {
+			"created_at": datetime.now().isoformat(timespec="seconds"),
+			"format": "csv",
+			"snapshot": "synchronized" if synchronized else "per-connection",
+			"tables": {t: entries[t] for t in tables},
+		}
+		partial = Path(str(out_path) + ".part")
+		try:
+			with zipfile.ZipFile(partial, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+				for table in tables:
+					zf.write(Path(tmp) / entries[table]["file"], arcname=entries[table]["file"])
+				zf.writestr("manifest.json", json.dumps(manifest, indent=2, ensure_ascii=False))
+			os.replace(partial, out_path)
+		except BaseException:
+			partial.unlink(missing_ok=True)
+			raise
+	return manifest
@@ -0,0 +1,209 @@
+import json
+import os
+import queue
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from app.db import require_mysql, snapshot_connections
+from app.utils.export import EXPORT_WORKERS, ProgressFn, estimated_rows
+
+
+# Tables exportées et colonne date servant au partitionnement par année
+ANALYTICS_TABLES = {
+	"lots": "date_arrivee",
+	"mortalites": "date_event",
+	"ventes_animaux": "date_vente",
+	"abattages": "date_abattage",
+	"soins": "date_soin",
+	"depenses": "date_depense",
+	"recettes": "date_recette",
+}
+
+FETCH_ROWS = 5000
+# Lignes par groupe de lignes Parquet : assez pour une bonne compression par colonne
+ROW_GROUP_ROWS = 100_000
+COMPRESSION = "zstd"
+
+
+def _pyarrow():
+	"""Import paresseux : pyarrow n'est nécessaire que pour cet export."""
+	try:
+		import pyarrow
+		import pyarrow.parquet
+	except ImportError as ex:
+		raise RuntimeError("Export analytique indisponible : installez pyarrow (pip install pyarrow)") from ex
+	return pyarrow
+
+
+def _arrow_type(pa, data_type: str, column_type: str, precision, scale):
+	t = data_type.lower()
+	if t in ("tinyint", "smallint", "mediumint", "int", "integer"):
+		return pa.int64() if "unsigned" in column_type.lower() else pa.int32()
+	if t == "bigint":
+		return pa.uint64() if "unsigned" in column_type.lower() else pa.int64()
+	if t == "decimal":
+		return pa.decimal128(int(precision), int(scale))
+	if t in ("float", "double"):
+		return pa.float64()
+	if t == "date":
+		return pa.date32()
+	if t == "datetime":
+		return pa.timestamp("us")
+	if t == "timestamp":
+		# Lu en UTC (time_zone de la session)
+		return pa.timestamp("us", tz="UTC")
+	if t in ("binary", "varbinary", "blob", "tinyblob", "mediumblob", "longblob"):
+		return pa.binary()
+	return pa.string()
+
+
+def _schema(pa, conn, table: str):
+	with conn.cursor() as cur:
+		cur.execute(
+			"SELECT COLUMN_NAME, DATA_TYPE, COLUMN_TYPE, NUMERIC_PRECISION, NUMERIC_SCALE, IS_NULLABLE"
+			" FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s"
+			" ORDER BY ORDINAL_POSITION",
+			(table,),
+		)
+		return pa.schema([
+			pa.field(name, _arrow_type(pa, dt, ct, p, s), nullable=(nullable == "YES"))
+			for name, dt, ct, p, s, nullable in cur.fetchall()
+		])
+
+
+def _years(conn, table: str, date_col: str) -> List[int]:
+	with conn.cursor() as cur:
+		cur.execute(f"SELECT YEAR(MIN({date_col})), YEAR(MAX({date_col})) FROM {table}")
+		first, last = cur.fetchone()
+	if first is None:
+		return []
+	return list(range(int(first), int(last) + 1))
+
+
+def _export_table(pa, conn, table: str, date_col: str, out_dir: Path, on_rows) -> Dict:
+	"""
+	Écrit `table` dans out_dir/<table>/annee=AAAA/data.parquet, une requête par année
+	(plage sur l'index de la colonne date). Retourne {"rows", "years", "bytes"}.
+	"""
+	import pyarrow.parquet as pq
+
+	schema = _schema(pa, conn, table)
+	target = out_dir / table
+	partial = out_dir / f"{table}.part"
+	shutil.rmtree(partial, ignore_errors=True)
+	partial.mkdir(parents=True)
+	rows_total = 0
+	years = {}
+	for year in _years(conn, table, date_col):
+		path = partial / f"annee={year}" / "data.parquet"
+		writer = None
+		pending: List = []
+		pending_rows = 0
+		written = 0
+		cur = conn.cursor(buffered=False)
+		try:
+			cur.execute(
+				f"SELECT * FROM {table} WHERE {date_col} >= %s AND {date_col} < %s",
+				(f"{year}-01-01", f"{year + 1}-01-01"),
+			)
+			while True:
+				rows = cur.fetchmany(FETCH_ROWS)
+				if rows:
+					columns = list(zip(*rows))
+					pending.append(pa.RecordBatch.from_arrays(
+						[pa.array(col, type=field.type) for col, field in zip(columns, schema)], schema=schema
+					))
+					pending_rows += len(rows)
+					on_rows(len(rows))
+				if pending and (pending_rows >= ROW_GROUP_ROWS or not rows):
+					if writer is None:
+						path.parent.mkdir()
+						writer = pq.ParquetWriter(path, schema, compression=COMPRESSION)
+					writer.write_table(pa.Table.from_batches(pending, schema=schema))
+					written += pending_rows
+					pending, pending_rows = [], 0
+				if not rows:
+					break
+		finally:
+			cur.close()
+			if writer is not None:
+				writer.close()
+		if written:
+			years[year] = written
+			rows_total += written
+	if target.exists():
+		shutil.rmtree(target)
+	os.replace(partial, target)
+	size = sum(p.stat().st_size for p in target.rglob("*.parquet"))
+	return {"rows": rows_total, "years": years, "bytes": size}
+
+
+def export_analytics(
+	out_dir: Path,
+	tables: Optional[Sequence[str]] = None,
+	progress: Optional[ProgressFn] = None,
+	workers: int = EXPORT_WORKERS,
+) -> Dict:
+	"""
+	Exporte les tables d'événements et de finances en Parquet (compression zstd), typées
+	(dates, décimaux exacts, TIMESTAMP en UTC) et partitionnées par année au format
+	Hive (<table>/annee=AAAA/data.parquet), lisible directement par pyarrow, pandas,
+	DuckDB ou Polars. Les tables sont exportées en parallèle sur un même instantané.
+	Écrit aussi manifest.json ; retourne le manifeste.
+	"""
+	require_mysql("Export analytique")
+	pa = _pyarrow()
+	tables = list(tables or ANALYTICS_TABLES)
+	out_dir = Path(out_dir)
+	out_dir.mkdir(parents=True, exist_ok=True)
+	workers = max(1, min(workers, len(tables)))
+	lock = threading.Lock()
+	done = {"rows": 0}
+	entries: Dict[str, Dict] = {}
+
+	with snapshot_connections(workers) as (conns, synchronized):
+		for conn in conns:
+			with conn.cursor() as cur:
+				cur.execute("SET SESSION time_zone = '+00:00'")
+		estimates = estimated_rows(conns[0], tables)
+		total = sum(estimates.values()) or None
+		todo: "queue.Queue[str]" = queue.Queue()
+		for table in sorted(tables, key=lambda t: -estimates.get(t, 0)):
+			todo.put(table)
+
+		def on_rows(n: int) -> None:
+			with lock:
+				done["rows"] += n
+				current = done["rows"]
+			if progress:
+				progress(current, max(total, current) if total else None)
+
+		def work(conn) -> None:
+			while True:
+				try:
+					table = todo.get_nowait()
+				except queue.Empty:
+					return
+				entry = _export_table(pa, conn, table, ANALYTICS_TABLES[table], out_dir, on_rows)
+				with lock:
+					entries[table] = entry
+
+		with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analytics") as pool:
+			for future in [pool.submit(work, conn) for conn in conns]:
+				future.result()
+
+	manifest = {
+		"created_at": datetime.now().isoformat(timespec="seconds"),
+		"format": "parquet",
+		"compression": COMPRESSION,
+		"partitioning": "annee",
+		"snapshot": "synchronized" if synchronized else "per-connection",
+		"tables": {t: entries[t] for t in tables},
+	}
+	with open(out_dir / "manifest.json", "w", encoding="utf-8") as f:
+		json.dump(manifest, f, indent=2, ensure_ascii=False)
+	return manifest
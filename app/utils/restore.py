@@ -0,0 +1,202 @@
+import gzip
+import io
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.db import open_connection, require_mysql
+from app.utils.sql_script import first_keyword, iter_statements
+
+
+# Volume d'instructions DML regroupées dans une transaction avant COMMIT
+TXN_BYTES = 32 << 20
+
+# progress(octets_lus, octets_total) sur les fichiers compressés
+ProgressFn = Callable[[int, Optional[int]], None]
+
+_DDL = {"CREATE", "DROP", "ALTER", "TRUNCATE", "RENAME"}
+_DML = {"INSERT", "REPLACE", "DELETE", "UPDATE"}
+# Utiles au client mysql seulement : un seul client écrit pendant la restauration
+_SKIPPED = {"LOCK", "UNLOCK"}
+
+_CREATE_TABLE_RE = re.compile(r"^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(`(?:[^`]|``)+`|\w+)\s*\(", re.IGNORECASE)
+# Définitions retirées du CREATE TABLE et ajoutées après le chargement
+_DEFERRABLE_RE = re.compile(r"^\s*((?:FULLTEXT\s+|SPATIAL\s+)?(?:KEY|INDEX)\s|CONSTRAINT\s.*\bFOREIGN\s+KEY\b|FOREIGN\s+KEY\b)", re.IGNORECASE)
+
+
+class RestoreError(RuntimeError):
+	"""
+	Restauration interrompue. `unindexed` : tables dont les index secondaires et clés
+	étrangères différés n'ont pas pu être recréés (vide si tout a été rétabli).
+	"""
+
+	def __init__(self, message: str, unindexed: List[str]):
+		super().__init__(message)
+		self.unindexed = unindexed
+
+
+def split_create_table(statement: str) -> Tuple[str, str, List[str]]:
+	"""
+	Sépare un CREATE TABLE (format SHOW CREATE TABLE : une définition par ligne) en
+	(table, CREATE sans index secondaires ni clés étrangères, définitions différées).
+	Clé primaire et index UNIQUE restent en place. Sans définition différable, renvoie
+	l'instruction inchangée.
+	"""
+	m = _CREATE_TABLE_RE.match(statement)
+	if not m:
+		return "", statement, []
+	table = m.group(1)
+	lines = statement.split("\n")
+	close = next((i for i in range(len(lines) - 1, 0, -1) if lines[i].lstrip().startswith(")")), None)
+	if close is None:
+		return table, statement, []
+	body = [l.rstrip().rstrip(",") for l in lines[1:close]]
+	kept = [l for l in body if not _DEFERRABLE_RE.match(l)]
+	deferred = [l.strip() for l in body if _DEFERRABLE_RE.match(l)]
+	if not deferred or not kept:
+		return table, statement, []
+	rebuilt = "\n".join([lines[0]] + [l + "," for l in kept[:-1]] + [kept[-1]] + lines[close:])
+	return table, rebuilt, deferred
+
+
+def _apply_deferred(cur, deferred: Dict[str, List[str]], stop_on_error: bool) -> List[str]:
+	"""
+	Recrée les définitions différées par un ALTER TABLE par table ; chaque table rétablie
+	est retirée de `deferred`. Retourne les tables en échec (stop_on_error : lève à la première).
+	"""
+	failed = []
+	cur.execute("SET SESSION FOREIGN_KEY_CHECKS=0")
+	for table, definitions in list(deferred.items()):
+		try:
+			cur.execute(f"ALTER TABLE {table} " + ", ".join("ADD " + d for d in definitions))
+		except Exception:
+			if stop_on_error:
+				raise
+			failed.append(table)
+			continue
+		del deferred[table]
+	return failed
+
+
+class _GzipProgressReader:
+	"""Lecture texte d'un .sql ou .sql.gz qui expose la position dans le fichier brut."""
+
+	def __init__(self, path: Path):
+		self._raw = open(path, "rb")
+		stream = gzip.GzipFile(fileobj=self._raw) if str(path).endswith(".gz") else self._raw
+		self.text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+
+	def position(self) -> int:
+		return self._raw.tell()
+
+	def close(self) -> None:
+		self.text.close()
+		self._raw.close()
+
+
+def restore_file(
+	path: Path,
+	progress: Optional[Callable[[int], None]] = None,
+	defer_indexes: bool = True,
+	txn_bytes: int = TXN_BYTES,
+) -> Dict:
+	"""
+	Rejoue une sauvegarde SQL (.sql ou .sql.gz) sur une connexion dédiée, en continu.
+
+	- contrôles de clés étrangères et d'unicité désactivés pendant le chargement ;
+	- instructions DML regroupées en transactions d'environ `txn_bytes` ;
+	- index secondaires et clés étrangères retirés des CREATE TABLE puis recréés par un
+	  seul ALTER TABLE par table une fois les données chargées (tri unique plutôt
+	  qu'une insertion d'index ligne à ligne) ;
+	- LOCK/UNLOCK TABLES ignorés.
+
+	En cas d'échec en cours de fichier, les définitions différées des tables déjà
+	créées sont recréées avant de lever RestoreError ; le message nomme les tables
+	restées sans leurs index et clés étrangères si cela échoue aussi.
+
+	progress(octets) reçoit la position courante dans le fichier.
+	Retourne {"statements", "tables_indexed"}.
+	"""
+	require_mysql("Restauration")
+	reader = _GzipProgressReader(Path(path))
+	conn = open_connection()
+	conn.autocommit = False
+	# Tables créées dont les index secondaires et clés étrangères restent à recréer
+	deferred: Dict[str, List[str]] = {}
+	indexed = 0
+	statements = 0
+	pending = 0
+	try:
+		with conn.cursor() as cur:
+			cur.execute("SET SESSION FOREIGN_KEY_CHECKS=0")
+			cur.execute("SET SESSION UNIQUE_CHECKS=0")
+			for stmt in iter_statements(reader.text):
+				keyword = first_keyword(stmt)
+				if keyword in _SKIPPED:
+					continue
+				if keyword in _DDL:
+					# Le DDL valide implicitement : on valide d'abord le lot en cours
+					conn.commit()
+					pending = 0
+				later = []
+				if defer_indexes and keyword == "CREATE":
+					table, stmt, later = split_create_table(stmt)
+				try:
+					cur.execute(stmt)
+				except Exception as ex:
+					raise RuntimeError(f"{ex} — instruction : {stmt[:200]}") from ex
+				if later:
+					deferred[table] = later
+				if cur.with_rows:
+					cur.fetchall()
+				statements += 1
+				if keyword in _DML:
+					pending += len(stmt)
+					if pending >= txn_bytes:
+						conn.commit()
+						pending = 0
+						if progress:
+							progress(reader.position())
+			conn.commit()
+			if progress:
+				progress(reader.position())
+			# Le pied de fichier a pu rétablir les contrôles : les clés étrangères recréées
+			# portent sur des données déjà cohérentes, inutile de les revérifier
+			indexed = len(deferred)
+			_apply_deferred(cur, deferred, stop_on_error=True)
+			cur.execute("SET SESSION UNIQUE_CHECKS=1")
+			cur.execute("SET SESSION FOREIGN_KEY_CHECKS=1")
+		return {"statements": statements, "tables_indexed": indexed}
+	except BaseException as ex:
+		if not deferred or not isinstance(ex, Exception):
+			conn.rollback()
+			raise
+		# Tables déjà chargées (en tout ou partie) : leur rendre index et clés étrangères
+		try:
+			conn.rollback()
+			with conn.cursor() as cur:
+				unindexed = _apply_deferred(cur, deferred, stop_on_error=False)
+		except Exception:
+			unindexed = list(deferred)
+		message = f"Restauration de {Path(path).name} interrompue : {ex}"
+		if unindexed:
+			message += " — tables sans index secondaires ni clés étrangères : " + ", ".join(unindexed)
+		raise RestoreError(message, unindexed) from ex
+	finally:
+		reader.close()
+		conn.close()
+
+
+def restore_files(paths: List[Path], progress: Optional[ProgressFn] = None, **options) -> List[Dict]:
+	"""Restaure plusieurs fichiers dans l'ordre, avec une progression globale en octets."""
+	sizes = [Path(p).stat().st_size for p in paths]
+	total = sum(sizes)
+	results = []
+	offset = 0
+	for path, size in zip(paths, sizes):
+		on_bytes = (lambda pos, offset=offset: progress(offset + pos, total)) if progress else None
+		results.append(restore_file(path, on_bytes, **options))
+		offset += size
+		if progress:
+			progress(offset, total)
+	return results
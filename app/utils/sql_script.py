@@ -0,0 +1,88 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Pattern, Tuple
+
+
+_DELIMITER_RE = re.compile(r"^\s*DELIMITER\s+(\S+)\s*$", re.IGNORECASE)
+_LINE_COMMENT_RE = re.compile(r"^\s*(--(\s|$)|#)")
+_FIRST_WORD_RE = re.compile(r"^\s*(?:/\*(?!!).*?\*/\s*|--[^\n]*\n\s*|#[^\n]*\n\s*)*(\w+)", re.DOTALL)
+
+_token_patterns: Dict[str, Pattern] = {}
+
+
+def _tokens(delimiter: str) -> Pattern:
+	"""
+	Jetons d'un script MySQL : chaînes et identifiants entre quotes (fermés ou non),
+	commentaires, délimiteur, et tout le reste par blocs.
+	"""
+	pattern = _token_patterns.get(delimiter)
+	if pattern is None:
+		d = re.escape(delimiter)
+		pattern = re.compile(
+			r"(?P<quoted>'(?:[^'\\]+|\\.|'')*'|\"(?:[^\"\\]+|\\.|\"\")*\"|`(?:[^`]+|``)*`)"
+			r"|(?P<comment>/\*.*?\*/|--(?=\s)[^\n]*|#[^\n]*)"
+			r"|(?P<open>['\"`]|/\*)"  # chaîne ou commentaire non refermé : instruction incomplète
+			rf"|(?P<delim>{d})"
+			rf"|(?P<other>[^'\"`/\-#{re.escape(delimiter[0])}]+|.)",
+			re.DOTALL,
+		)
+		_token_patterns[delimiter] = pattern
+	return pattern
+
+
+def _split(text: str, delimiter: str) -> Tuple[List[str], str]:
+	"""Découpe `text` aux délimiteurs hors chaînes/commentaires. Retourne (instructions, reste)."""
+	statements = []
+	start = 0
+	for m in _tokens(delimiter).finditer(text):
+		kind = m.lastgroup
+		if kind == "open":
+			return statements, text[start:]
+		if kind == "delim":
+			stmt = text[start:m.start()].strip()
+			if stmt:
+				statements.append(stmt)
+			start = m.end()
+	return statements, text[start:]
+
+
+def iter_statements(lines: Iterable[str], delimiter: str = ";") -> Iterator[str]:
+	"""
+	Instructions d'un script SQL lu ligne à ligne, sans délimiteur final. Gère les chaînes
+	et identifiants entre quotes (délimiteur ou commentaire à l'intérieur), les commentaires
+	--, # et /* */ (les commentaires exécutables /*! */ sont conservés), et la commande
+	DELIMITER du client mysql (corps de triggers et procédures).
+
+	La recherche du délimiteur n'est faite que sur les lignes qui le contiennent en fin
+	de ligne : les longues instructions INSERT ne sont analysées qu'une fois.
+	"""
+	buf: List[str] = []
+	for line in lines:
+		stripped = line.strip()
+		if not buf:
+			if not stripped or _LINE_COMMENT_RE.match(stripped):
+				continue
+			m = _DELIMITER_RE.match(stripped)
+			if m:
+				delimiter = m.group(1)
+				continue
+		buf.append(line)
+		if stripped.endswith(delimiter):
+			statements, rest = _split("".join(buf), delimiter)
+			yield from statements
+			buf = [rest] if rest.strip() else []
+	if buf:
+		statements, rest = _split("".join(buf), delimiter)
+		yield from statements
+		rest = rest.strip()
+		if rest and not _only_comments(rest):
+			yield rest
+
+
+def _only_comments(text: str) -> bool:
+	return all(_LINE_COMMENT_RE.match(l) or not l.strip() for l in text.splitlines())
+
+
+def first_keyword(statement: str) -> str:
+	"""Premier mot-clé de l'instruction (en majuscules), commentaires de tête ignorés."""
+	m = _FIRST_WORD_RE.match(statement)
+	return m.group(1).upper() if m else ""
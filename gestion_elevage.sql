@@ -15,7 +15,9 @@ CREATE TABLE IF NOT EXISTS utilisateurs (
 	email VARCHAR(100) UNIQUE NOT NULL COMMENT 'Email (unique)',
 	mot_de_passe VARCHAR(255) NOT NULL COMMENT 'Mot de passe haché (bcrypt)',
 	role ENUM('Admin', 'Fermier', 'Veterinaire', 'Gestionnaire', 'Commercial') DEFAULT 'Fermier' COMMENT 'Rôle de l''utilisateur',
-	date_creation DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT 'Date de création du compte'
+	date_creation DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT 'Date de création du compte',
+	updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Dernière modification (sauvegardes incrémentales)',
+	INDEX idx_utilisateurs_updated (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 -- =============================================
@@ -31,7 +33,9 @@ CREATE TABLE IF NOT EXISTS lots (
 	source VARCHAR(100) COMMENT 'Fournisseur ou source',
 	statut ENUM('Actif', 'Vendu', 'Mort', 'Abattu', 'Terminé') DEFAULT 'Actif' COMMENT 'Statut actuel du lot',
 	remarque TEXT COMMENT 'Remarques additionnelles',
-	cout_initial FLOAT DEFAULT 0 COMMENT 'Coût d''achat initial du lot'
+	cout_initial FLOAT DEFAULT 0 COMMENT 'Coût d''achat initial du lot',
+	updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Dernière modification (sauvegardes incrémentales)',
+	INDEX idx_lots_updated (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 -- =============================================
@@ -45,7 +49,9 @@ CREATE TABLE IF NOT EXISTS mortalites (
 	motif VARCHAR(255) COMMENT 'Raison de la mortalité (optionnel)',
 	FOREIGN KEY (lot_id) REFERENCES lots(id) ON DELETE CASCADE,
 	INDEX idx_mortalites_lot (lot_id),
-	INDEX idx_mortalites_date (date_event)
+	INDEX idx_mortalites_date (date_event),
+	updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Dernière modification (sauvegardes incrémentales)',
+	INDEX idx_mortalites_updated (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 -- =============================================
@@ -64,7 +70,9 @@ CREATE TABLE IF NOT EXISTS ventes_animaux (
 	notes TEXT COMMENT 'Notes additionnelles sur la vente',
 	FOREIGN KEY (lot_id) REFERENCES lots(id) ON DELETE CASCADE,
 	INDEX idx_ventes_lot (lot_id),
-	INDEX idx_ventes_date (date_vente)
+	INDEX idx_ventes_date (date_vente),
+	updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Dernière modification (sauvegardes incrémentales)',
+	INDEX idx_ventes_animaux_updated (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 -- =============================================
@@ -78,7 +86,21 @@ CREATE TABLE IF NOT EXISTS abattages (
     poids_unitaire FLOAT COMMENT 'Poids moyen à l''abattage (optionnel)',
     FOREIGN KEY (lot_id) REFERENCES lots(id) ON DELETE CASCADE,
     INDEX idx_abattages_lot (lot_id),
-    INDEX idx_abattages_date (date_abattage)
+    INDEX idx_abattages_date (date_abattage),
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Dernière modification (sauvegardes incrémentales)',
+    INDEX idx_abattages_updated (updated_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- =============================================
+-- TABLE : lot_counters
+-- =============================================
+-- Compteurs matérialisés par lot, maintenus par les DAO d'événements
+CREATE TABLE IF NOT EXISTS lot_counters (
+	lot_id INT PRIMARY KEY COMMENT 'Référence au lot',
+	morts INT NOT NULL DEFAULT 0 COMMENT 'Total des mortalités',
+	vendus INT NOT NULL DEFAULT 0 COMMENT 'Total des animaux vendus',
+	abattus INT NOT NULL DEFAULT 0 COMMENT 'Total des animaux abattus',
+	FOREIGN KEY (lot_id) REFERENCES lots(id) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 -- =============================================
@@ -93,7 +115,9 @@ CREATE TABLE IF NOT EXISTS soins (
 	cout FLOAT DEFAULT 0 COMMENT 'Coût du soin en FCFA',
 	effectue_par VARCHAR(100) COMMENT 'Personne ayant effectué le soin',
 	FOREIGN KEY (lot_id) REFERENCES lots(id) ON DELETE CASCADE,
-	INDEX idx_soins_lot_date (lot_id, date_soin)
+	INDEX idx_soins_lot_date (lot_id, date_soin),
+	updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Dernière modification (sauvegardes incrémentales)',
+	INDEX idx_soins_updated (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 -- =============================================
@@ -108,7 +132,9 @@ CREATE TABLE IF NOT EXISTS depenses (
 	lot_id INT NULL COMMENT 'Référence au lot (optionnel)',
 	FOREIGN KEY (lot_id) REFERENCES lots(id) ON DELETE SET NULL,
 	INDEX idx_depenses_date (date_depense),
-	INDEX idx_depenses_lot (lot_id)
+	INDEX idx_depenses_lot (lot_id),
+	updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Dernière modification (sauvegardes incrémentales)',
+	INDEX idx_depenses_updated (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 -- =============================================
@@ -123,7 +149,25 @@ CREATE TABLE IF NOT EXISTS recettes (
 	client VARCHAR(100) COMMENT 'Nom du client',
 	FOREIGN KEY (lot_id) REFERENCES lots(id) ON DELETE SET NULL,
 	INDEX idx_recettes_date (date_recette),
-	INDEX idx_recettes_lot (lot_id)
+	INDEX idx_recettes_lot (lot_id),
+	updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Dernière modification (sauvegardes incrémentales)',
+	INDEX idx_recettes_updated (updated_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- =============================================
+-- TABLE : finance_monthly
+-- =============================================
+-- Cumul mensuel des dépenses/recettes, maintenu par les DAO de finances
+CREATE TABLE IF NOT EXISTS finance_monthly (
+	annee SMALLINT NOT NULL COMMENT 'Année',
+	mois TINYINT NOT NULL COMMENT 'Mois (1-12)',
+	lot_id INT NOT NULL DEFAULT 0 COMMENT 'Référence au lot (0 = sans lot)',
+	sens ENUM('depense', 'recette') NOT NULL COMMENT 'Dépense ou recette',
+	categorie VARCHAR(50) NOT NULL COMMENT 'type_depense ou type_recette',
+	nb INT NOT NULL DEFAULT 0 COMMENT 'Nombre de lignes',
+	total DOUBLE NOT NULL DEFAULT 0 COMMENT 'Montant cumulé en FCFA',
+	PRIMARY KEY (annee, mois, lot_id, sens, categorie),
+	INDEX idx_finance_monthly_lot (lot_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 -- =============================================
@@ -138,7 +182,9 @@ CREATE TABLE IF NOT EXISTS stocks (
 	seuil_alerte INT DEFAULT 10 COMMENT 'Seuil d''alerte (quantité minimale)',
 	fournisseur VARCHAR(100) COMMENT 'Nom du fournisseur',
 	date_ajout DATE DEFAULT (CURRENT_DATE) COMMENT 'Date d''ajout du produit',
-	INDEX idx_stocks_seuil (seuil_alerte, quantite)
+	INDEX idx_stocks_seuil (seuil_alerte, quantite),
+	updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Dernière modification (sauvegardes incrémentales)',
+	INDEX idx_stocks_updated (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 -- =============================================
@@ -153,7 +199,9 @@ CREATE TABLE IF NOT EXISTS journal_activites (
 	date_action DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT 'Date et heure de l''action',
 	FOREIGN KEY (utilisateur_id) REFERENCES utilisateurs(id) ON DELETE CASCADE,
 	INDEX idx_journal_user (utilisateur_id),
-	INDEX idx_journal_date (date_action)
+	INDEX idx_journal_date (date_action),
+	updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Dernière modification (sauvegardes incrémentales)',
+	INDEX idx_journal_activites_updated (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 -- =============================================
@@ -168,7 +216,9 @@ CREATE TABLE IF NOT EXISTS soins_preconfigures (
 	cout_estime FLOAT DEFAULT 0 COMMENT 'Coût estimé en FCFA',
 	actif BOOLEAN DEFAULT TRUE COMMENT 'Soin actif ou désactivé',
 	date_creation DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT 'Date de création',
-	INDEX idx_soins_preconfig_type_jour (type_animal, jour_application)
+	INDEX idx_soins_preconfig_type_jour (type_animal, jour_application),
+	updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Dernière modification (sauvegardes incrémentales)',
+	INDEX idx_soins_preconfigures_updated (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 -- =============================================
@@ -179,7 +229,9 @@ CREATE TABLE IF NOT EXISTS parametres (
 	cle VARCHAR(50) UNIQUE NOT NULL COMMENT 'Clé du paramètre',
 	valeur VARCHAR(255) COMMENT 'Valeur du paramètre',
 	description TEXT COMMENT 'Description du paramètre',
-	date_modification DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Date de dernière modification'
+	date_modification DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Date de dernière modification',
+	updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Dernière modification (sauvegardes incrémentales)',
+	INDEX idx_parametres_updated (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 -- =============================================
@@ -194,7 +246,9 @@ CREATE TABLE IF NOT EXISTS clients (
 	type_client ENUM('Particulier', 'Restaurant', 'Boucherie', 'Autre') DEFAULT 'Particulier' COMMENT 'Type de client',
 	date_creation DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT 'Date de création',
 	actif BOOLEAN DEFAULT TRUE COMMENT 'Client actif ou désactivé',
-	INDEX idx_clients_nom (nom)
+	INDEX idx_clients_nom (nom),
+	updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Dernière modification (sauvegardes incrémentales)',
+	INDEX idx_clients_updated (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 -- =============================================
@@ -213,7 +267,9 @@ CREATE TABLE IF NOT EXISTS produits_derives (
 	moyen_paiement ENUM('Espèces', 'Chèque', 'Virement', 'Autre') DEFAULT 'Espèces' COMMENT 'Moyen de paiement',
 	notes TEXT COMMENT 'Notes additionnelles',
 	FOREIGN KEY (client_id) REFERENCES clients(id) ON DELETE SET NULL,
-	INDEX idx_produits_derives_date (date_vente)
+	INDEX idx_produits_derives_date (date_vente),
+	updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Dernière modification (sauvegardes incrémentales)',
+	INDEX idx_produits_derives_updated (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 -- =============================================
@@ -252,6 +308,59 @@ CREATE INDEX idx_lots_date_arrivee ON lots(date_arrivee);
 CREATE INDEX idx_lots_statut ON lots(statut);
 CREATE INDEX idx_lots_type ON lots(type_animal);
 
+-- Filtre par lot + tri par date (listes d'événements, finances par lot)
+CREATE INDEX idx_mortalites_lot_date ON mortalites(lot_id, date_event);
+CREATE INDEX idx_ventes_lot_date ON ventes_animaux(lot_id, date_vente);
+CREATE INDEX idx_abattages_lot_date ON abattages(lot_id, date_abattage);
+CREATE INDEX idx_depenses_lot_date ON depenses(lot_id, date_depense);
+CREATE INDEX idx_recettes_lot_date ON recettes(lot_id, date_recette);
+
+-- Tri des listes de soins et de stocks
+CREATE INDEX idx_soins_date ON soins(date_soin);
+CREATE INDEX idx_stocks_nom ON stocks(nom_produit);
+
+
+-- =============================================
+-- TABLE : suppressions
+-- =============================================
+-- Journal des suppressions (sauvegardes incrémentales), alimenté par les triggers ci-dessous
+CREATE TABLE IF NOT EXISTS suppressions (
+	id BIGINT AUTO_INCREMENT PRIMARY KEY,
+	table_name VARCHAR(64) NOT NULL COMMENT 'Table de la ligne supprimée',
+	row_id INT NOT NULL COMMENT 'Identifiant de la ligne supprimée',
+	deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT 'Date de suppression',
+	INDEX idx_suppressions_deleted (deleted_at, table_name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+DROP TRIGGER IF EXISTS trg_utilisateurs_suppr;
+CREATE TRIGGER trg_utilisateurs_suppr AFTER DELETE ON utilisateurs FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('utilisateurs', OLD.id);
+DROP TRIGGER IF EXISTS trg_lots_suppr;
+CREATE TRIGGER trg_lots_suppr AFTER DELETE ON lots FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('lots', OLD.id);
+DROP TRIGGER IF EXISTS trg_mortalites_suppr;
+CREATE TRIGGER trg_mortalites_suppr AFTER DELETE ON mortalites FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('mortalites', OLD.id);
+DROP TRIGGER IF EXISTS trg_ventes_animaux_suppr;
+CREATE TRIGGER trg_ventes_animaux_suppr AFTER DELETE ON ventes_animaux FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('ventes_animaux', OLD.id);
+DROP TRIGGER IF EXISTS trg_abattages_suppr;
+CREATE TRIGGER trg_abattages_suppr AFTER DELETE ON abattages FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('abattages', OLD.id);
+DROP TRIGGER IF EXISTS trg_soins_suppr;
+CREATE TRIGGER trg_soins_suppr AFTER DELETE ON soins FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('soins', OLD.id);
+DROP TRIGGER IF EXISTS trg_depenses_suppr;
+CREATE TRIGGER trg_depenses_suppr AFTER DELETE ON depenses FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('depenses', OLD.id);
+DROP TRIGGER IF EXISTS trg_recettes_suppr;
+CREATE TRIGGER trg_recettes_suppr AFTER DELETE ON recettes FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('recettes', OLD.id);
+DROP TRIGGER IF EXISTS trg_stocks_suppr;
+CREATE TRIGGER trg_stocks_suppr AFTER DELETE ON stocks FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('stocks', OLD.id);
+DROP TRIGGER IF EXISTS trg_journal_activites_suppr;
+CREATE TRIGGER trg_journal_activites_suppr AFTER DELETE ON journal_activites FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('journal_activites', OLD.id);
+DROP TRIGGER IF EXISTS trg_soins_preconfigures_suppr;
+CREATE TRIGGER trg_soins_preconfigures_suppr AFTER DELETE ON soins_preconfigures FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('soins_preconfigures', OLD.id);
+DROP TRIGGER IF EXISTS trg_parametres_suppr;
+CREATE TRIGGER trg_parametres_suppr AFTER DELETE ON parametres FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('parametres', OLD.id);
+DROP TRIGGER IF EXISTS trg_clients_suppr;
+CREATE TRIGGER trg_clients_suppr AFTER DELETE ON clients FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('clients', OLD.id);
+DROP TRIGGER IF EXISTS trg_produits_derives_suppr;
+CREATE TRIGGER trg_produits_derives_suppr AFTER DELETE ON produits_derives FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('produits_derives', OLD.id);
+
 -- =============================================
 -- DONNÉES PAR DÉFAUT
 -- =============================================
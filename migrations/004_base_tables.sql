@@ -0,0 +1,90 @@
+-- Tables de gestion_elevage.sql absentes de 001 et 002 : une base construite par les
+-- migrations seules (scripts.init_db) doit les avoir avant 005 (lot_counters),
+-- 006 (index) et 008 (suivi des modifications), qui les utilisent.
+-- Sans effet sur une base chargée depuis gestion_elevage.sql (IF NOT EXISTS).
+USE gestion_elevage;
+
+CREATE TABLE IF NOT EXISTS abattages (
+	id INT AUTO_INCREMENT PRIMARY KEY,
+	lot_id INT NOT NULL COMMENT 'Référence au lot',
+	date_abattage DATE NOT NULL COMMENT 'Date de l''abattage',
+	quantite INT NOT NULL COMMENT 'Nombre d''animaux abattus',
+	poids_unitaire FLOAT COMMENT 'Poids moyen à l''abattage (optionnel)',
+	FOREIGN KEY (lot_id) REFERENCES lots(id) ON DELETE CASCADE,
+	INDEX idx_abattages_lot (lot_id),
+	INDEX idx_abattages_date (date_abattage)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+CREATE TABLE IF NOT EXISTS soins_preconfigures (
+	id INT AUTO_INCREMENT PRIMARY KEY,
+	type_animal ENUM('Poulet', 'Porc') NOT NULL COMMENT 'Type d''animal',
+	jour_application INT NOT NULL COMMENT 'Jour dans le cycle (0 = à l''arrivée)',
+	type_soin VARCHAR(100) NOT NULL COMMENT 'Type de soin',
+	description TEXT COMMENT 'Description du soin',
+	cout_estime FLOAT DEFAULT 0 COMMENT 'Coût estimé en FCFA',
+	actif BOOLEAN DEFAULT TRUE COMMENT 'Soin actif ou désactivé',
+	date_creation DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT 'Date de création',
+	INDEX idx_soins_preconfig_type_jour (type_animal, jour_application)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+CREATE TABLE IF NOT EXISTS parametres (
+	id INT AUTO_INCREMENT PRIMARY KEY,
+	cle VARCHAR(50) UNIQUE NOT NULL COMMENT 'Clé du paramètre',
+	valeur VARCHAR(255) COMMENT 'Valeur du paramètre',
+	description TEXT COMMENT 'Description du paramètre',
+	date_modification DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Date de dernière modification'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+CREATE TABLE IF NOT EXISTS clients (
+	id INT AUTO_INCREMENT PRIMARY KEY,
+	nom VARCHAR(100) NOT NULL COMMENT 'Nom du client',
+	telephone VARCHAR(20) COMMENT 'Numéro de téléphone',
+	email VARCHAR(100) COMMENT 'Adresse email',
+	adresse TEXT COMMENT 'Adresse complète',
+	type_client ENUM('Particulier', 'Restaurant', 'Boucherie', 'Autre') DEFAULT 'Particulier' COMMENT 'Type de client',
+	date_creation DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT 'Date de création',
+	actif BOOLEAN DEFAULT TRUE COMMENT 'Client actif ou désactivé',
+	INDEX idx_clients_nom (nom)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+CREATE TABLE IF NOT EXISTS produits_derives (
+	id INT AUTO_INCREMENT PRIMARY KEY,
+	type_produit ENUM('Œufs', 'Fumier', 'Plumes', 'Autre') NOT NULL COMMENT 'Type de produit',
+	quantite DECIMAL(10,2) NOT NULL COMMENT 'Quantité vendue',
+	unite VARCHAR(50) NOT NULL COMMENT 'Unité de mesure (kg, unités, etc.)',
+	prix_unitaire FLOAT NOT NULL COMMENT 'Prix unitaire en FCFA',
+	date_vente DATE NOT NULL COMMENT 'Date de vente',
+	client_id INT NULL COMMENT 'Référence au client enregistré',
+	client_nom VARCHAR(100) COMMENT 'Nom du client si non enregistré',
+	montant_total FLOAT NOT NULL COMMENT 'Montant total en FCFA',
+	moyen_paiement ENUM('Espèces', 'Chèque', 'Virement', 'Autre') DEFAULT 'Espèces' COMMENT 'Moyen de paiement',
+	notes TEXT COMMENT 'Notes additionnelles',
+	FOREIGN KEY (client_id) REFERENCES clients(id) ON DELETE SET NULL,
+	INDEX idx_produits_derives_date (date_vente)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- Données par défaut de gestion_elevage.sql ; soins préconfigurés insérés seulement
+-- dans une table vide (pas de clé unique pour dédoublonner)
+INSERT INTO soins_preconfigures (type_animal, jour_application, type_soin, description, cout_estime)
+SELECT d.* FROM (
+	SELECT 'Poulet' AS type_animal, 1 AS jour_application, 'Vaccin Marek' AS type_soin, 'Vaccination contre la maladie de Marek (si poussin)' AS description, 500 AS cout_estime
+	UNION ALL SELECT 'Poulet', 7, 'Vaccin Gumboro', 'Première vaccination contre la maladie de Gumboro', 800
+	UNION ALL SELECT 'Poulet', 14, 'Vaccin Newcastle', 'Vaccination contre la maladie de Newcastle', 1000
+	UNION ALL SELECT 'Poulet', 21, 'Rappel Gumboro', 'Rappel vaccination Gumboro', 800
+	UNION ALL SELECT 'Poulet', 28, 'Vermifuge', 'Traitement vermifuge', 600
+	UNION ALL SELECT 'Poulet', 35, 'Complément Vitamines', 'Complément vitaminique pour croissance', 400
+	UNION ALL SELECT 'Porc', 0, 'Vaccin Circovirus', 'Vaccination contre le circovirus porcin à l''arrivée', 1500
+	UNION ALL SELECT 'Porc', 14, 'Vermifuge', 'Traitement vermifuge première fois', 800
+	UNION ALL SELECT 'Porc', 42, 'Vaccin Rouget', 'Vaccination contre le rouget', 1200
+	UNION ALL SELECT 'Porc', 70, 'Rappel Vaccins', 'Rappel des vaccinations principales', 1500
+) d
+WHERE NOT EXISTS (SELECT 1 FROM soins_preconfigures);
+
+INSERT INTO parametres (cle, valeur, description) VALUES
+('seuil_mortalite', '3', 'Seuil d''alerte mortalité en pourcentage'),
+('duree_cycle_poulets', '47', 'Durée maximale cycle poulets en jours'),
+('devise', 'FCFA', 'Devise utilisée dans l''application'),
+('format_date', 'DD/MM/YYYY', 'Format d''affichage des dates'),
+('alerte_stock_jours', '7', 'Nombre de jours avant alerte fin de cycle'),
+('seuil_mortalite_critique', '5', 'Seuil critique de mortalité en pourcentage')
+ON DUPLICATE KEY UPDATE valeur=valeur;
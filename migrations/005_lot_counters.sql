@@ -0,0 +1,20 @@
+-- Compteurs matérialisés par lot (morts, vendus, abattus)
+-- Maintenus par les DAO d'événements dans la même transaction que l'insertion.
+USE gestion_elevage;
+
+CREATE TABLE IF NOT EXISTS lot_counters (
+	lot_id INT PRIMARY KEY,
+	morts INT NOT NULL DEFAULT 0,
+	vendus INT NOT NULL DEFAULT 0,
+	abattus INT NOT NULL DEFAULT 0,
+	FOREIGN KEY (lot_id) REFERENCES lots(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- Initialisation (ou recalcul) à partir des tables d'événements existantes
+INSERT INTO lot_counters(lot_id, morts, vendus, abattus)
+SELECT l.id, COALESCE(m.q,0), COALESCE(v.q,0), COALESCE(a.q,0)
+FROM lots l
+LEFT JOIN (SELECT lot_id, SUM(quantite) AS q FROM mortalites GROUP BY lot_id) m ON m.lot_id = l.id
+LEFT JOIN (SELECT lot_id, SUM(quantite) AS q FROM ventes_animaux GROUP BY lot_id) v ON v.lot_id = l.id
+LEFT JOIN (SELECT lot_id, SUM(quantite) AS q FROM abattages GROUP BY lot_id) a ON a.lot_id = l.id
+ON DUPLICATE KEY UPDATE morts = VALUES(morts), vendus = VALUES(vendus), abattus = VALUES(abattus);
@@ -0,0 +1,10 @@
+-- Index composites pour les requêtes du DAO (filtre par lot + tri par date, tri par date seul)
+USE gestion_elevage;
+
+CREATE INDEX idx_mortalites_lot_date ON mortalites(lot_id, date_event);
+CREATE INDEX idx_ventes_lot_date ON ventes_animaux(lot_id, date_vente);
+CREATE INDEX idx_abattages_lot_date ON abattages(lot_id, date_abattage);
+CREATE INDEX idx_soins_date ON soins(date_soin);
+CREATE INDEX idx_depenses_lot_date ON depenses(lot_id, date_depense);
+CREATE INDEX idx_recettes_lot_date ON recettes(lot_id, date_recette);
+CREATE INDEX idx_stocks_nom ON stocks(nom_produit);
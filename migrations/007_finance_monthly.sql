@@ -0,0 +1,27 @@
+-- Cumul mensuel des dépenses et recettes par (année, mois, lot, type)
+-- Maintenu par les DAO de finances dans la même transaction que la ligne de détail.
+-- lot_id = 0 regroupe les montants sans lot.
+USE gestion_elevage;
+
+CREATE TABLE IF NOT EXISTS finance_monthly (
+	annee SMALLINT NOT NULL,
+	mois TINYINT NOT NULL,
+	lot_id INT NOT NULL DEFAULT 0,
+	sens ENUM('depense', 'recette') NOT NULL,
+	categorie VARCHAR(50) NOT NULL,
+	nb INT NOT NULL DEFAULT 0,
+	total DOUBLE NOT NULL DEFAULT 0,
+	PRIMARY KEY (annee, mois, lot_id, sens, categorie),
+	INDEX idx_finance_monthly_lot (lot_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- Initialisation (ou recalcul) à partir des tables de détail existantes
+INSERT INTO finance_monthly(annee, mois, lot_id, sens, categorie, nb, total)
+SELECT YEAR(date_depense), MONTH(date_depense), COALESCE(lot_id, 0), 'depense', type_depense, COUNT(*), SUM(montant)
+FROM depenses
+GROUP BY YEAR(date_depense), MONTH(date_depense), COALESCE(lot_id, 0), type_depense
+UNION ALL
+SELECT YEAR(date_recette), MONTH(date_recette), COALESCE(lot_id, 0), 'recette', type_recette, COUNT(*), SUM(montant)
+FROM recettes
+GROUP BY YEAR(date_recette), MONTH(date_recette), COALESCE(lot_id, 0), type_recette
+ON DUPLICATE KEY UPDATE nb = VALUES(nb), total = VALUES(total);
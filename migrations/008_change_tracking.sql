@@ -0,0 +1,85 @@
+-- Suivi des modifications pour les sauvegardes incrémentales :
+-- updated_at sur les tables métier, journal des suppressions alimenté par triggers.
+-- Les tables dérivées (lot_counters, finance_monthly) ne sont pas suivies : elles sont recalculées après restauration.
+USE gestion_elevage;
+
+CREATE TABLE IF NOT EXISTS suppressions (
+	id BIGINT AUTO_INCREMENT PRIMARY KEY,
+	table_name VARCHAR(64) NOT NULL,
+	row_id INT NOT NULL,
+	deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+	INDEX idx_suppressions_deleted (deleted_at, table_name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+ALTER TABLE utilisateurs
+ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+ADD INDEX idx_utilisateurs_updated (updated_at);
+ALTER TABLE lots
+ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+ADD INDEX idx_lots_updated (updated_at);
+ALTER TABLE mortalites
+ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+ADD INDEX idx_mortalites_updated (updated_at);
+ALTER TABLE ventes_animaux
+ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+ADD INDEX idx_ventes_animaux_updated (updated_at);
+ALTER TABLE abattages
+ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+ADD INDEX idx_abattages_updated (updated_at);
+ALTER TABLE soins
+ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+ADD INDEX idx_soins_updated (updated_at);
+ALTER TABLE depenses
+ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+ADD INDEX idx_depenses_updated (updated_at);
+ALTER TABLE recettes
+ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+ADD INDEX idx_recettes_updated (updated_at);
+ALTER TABLE stocks
+ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+ADD INDEX idx_stocks_updated (updated_at);
+ALTER TABLE journal_activites
+ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+ADD INDEX idx_journal_activites_updated (updated_at);
+ALTER TABLE soins_preconfigures
+ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+ADD INDEX idx_soins_preconfigures_updated (updated_at);
+ALTER TABLE parametres
+ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+ADD INDEX idx_parametres_updated (updated_at);
+ALTER TABLE clients
+ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+ADD INDEX idx_clients_updated (updated_at);
+ALTER TABLE produits_derives
+ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+ADD INDEX idx_produits_derives_updated (updated_at);
+
+-- Un trigger par table (corps à instruction unique, sans DELIMITER)
+DROP TRIGGER IF EXISTS trg_utilisateurs_suppr;
+CREATE TRIGGER trg_utilisateurs_suppr AFTER DELETE ON utilisateurs FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('utilisateurs', OLD.id);
+DROP TRIGGER IF EXISTS trg_lots_suppr;
+CREATE TRIGGER trg_lots_suppr AFTER DELETE ON lots FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('lots', OLD.id);
+DROP TRIGGER IF EXISTS trg_mortalites_suppr;
+CREATE TRIGGER trg_mortalites_suppr AFTER DELETE ON mortalites FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('mortalites', OLD.id);
+DROP TRIGGER IF EXISTS trg_ventes_animaux_suppr;
+CREATE TRIGGER trg_ventes_animaux_suppr AFTER DELETE ON ventes_animaux FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('ventes_animaux', OLD.id);
+DROP TRIGGER IF EXISTS trg_abattages_suppr;
+CREATE TRIGGER trg_abattages_suppr AFTER DELETE ON abattages FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('abattages', OLD.id);
+DROP TRIGGER IF EXISTS trg_soins_suppr;
+CREATE TRIGGER trg_soins_suppr AFTER DELETE ON soins FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('soins', OLD.id);
+DROP TRIGGER IF EXISTS trg_depenses_suppr;
+CREATE TRIGGER trg_depenses_suppr AFTER DELETE ON depenses FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('depenses', OLD.id);
+DROP TRIGGER IF EXISTS trg_recettes_suppr;
+CREATE TRIGGER trg_recettes_suppr AFTER DELETE ON recettes FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('recettes', OLD.id);
+DROP TRIGGER IF EXISTS trg_stocks_suppr;
+CREATE TRIGGER trg_stocks_suppr AFTER DELETE ON stocks FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('stocks', OLD.id);
+DROP TRIGGER IF EXISTS trg_journal_activites_suppr;
+CREATE TRIGGER trg_journal_activites_suppr AFTER DELETE ON journal_activites FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('journal_activites', OLD.id);
+DROP TRIGGER IF EXISTS trg_soins_preconfigures_suppr;
+CREATE TRIGGER trg_soins_preconfigures_suppr AFTER DELETE ON soins_preconfigures FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('soins_preconfigures', OLD.id);
+DROP TRIGGER IF EXISTS trg_parametres_suppr;
+CREATE TRIGGER trg_parametres_suppr AFTER DELETE ON parametres FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('parametres', OLD.id);
+DROP TRIGGER IF EXISTS trg_clients_suppr;
+CREATE TRIGGER trg_clients_suppr AFTER DELETE ON clients FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('clients', OLD.id);
+DROP TRIGGER IF EXISTS trg_produits_derives_suppr;
+CREATE TRIGGER trg_produits_derives_suppr AFTER DELETE ON produits_derives FOR EACH ROW INSERT INTO suppressions(table_name, row_id) VALUES('produits_derives', OLD.id);
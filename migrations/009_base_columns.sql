@@ -0,0 +1,30 @@
+-- Colonnes présentes dans gestion_elevage.sql mais absentes des migrations précédentes :
+-- une base construite par les seules migrations doit accepter les requêtes du DAO.
+-- Une instruction par colonne : sur une base chargée depuis le dump, chaque doublon (1060) est ignoré seul.
+USE gestion_elevage;
+
+ALTER TABLE lots
+ADD COLUMN cout_initial FLOAT DEFAULT 0 COMMENT 'Coût d''achat initial du lot';
+
+ALTER TABLE ventes_animaux
+ADD COLUMN client_id INT NULL COMMENT 'Référence au client enregistré';
+ALTER TABLE ventes_animaux
+ADD COLUMN moyen_paiement ENUM('Espèces', 'Chèque', 'Virement', 'Autre') DEFAULT 'Espèces' COMMENT 'Moyen de paiement';
+ALTER TABLE ventes_animaux
+ADD COLUMN statut_paiement ENUM('Payé', 'En attente', 'Partiel') DEFAULT 'Payé' COMMENT 'Statut du paiement';
+ALTER TABLE ventes_animaux
+ADD COLUMN notes TEXT COMMENT 'Notes additionnelles sur la vente';
+CREATE INDEX idx_ventes_client ON ventes_animaux(client_id);
+ALTER TABLE ventes_animaux
+ADD CONSTRAINT fk_vente_client FOREIGN KEY (client_id) REFERENCES clients(id) ON DELETE SET NULL;
+
+ALTER TABLE stocks
+ADD COLUMN seuil_alerte INT DEFAULT 10 COMMENT 'Seuil d''alerte (quantité minimale)';
+ALTER TABLE stocks
+ADD COLUMN fournisseur VARCHAR(100) COMMENT 'Nom du fournisseur';
+CREATE INDEX idx_stocks_seuil ON stocks(seuil_alerte, quantite);
+
+ALTER TABLE journal_activites
+ADD COLUMN module VARCHAR(50) COMMENT 'Module concerné (Lots, Soins, Stocks, etc.)';
+ALTER TABLE journal_activites
+ADD COLUMN details TEXT COMMENT 'Détails de l''action';
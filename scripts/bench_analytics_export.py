@@ -0,0 +1,58 @@
+import argparse
+import csv
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.utils.export import export_table_csv
+from app.utils.parquet_export import ANALYTICS_TABLES, export_analytics
+
+
+def _read_csv(path: Path) -> int:
+	# Relecture typique d'un CSV : toutes les lignes, valeurs à reconvertir ensuite
+	with open(path, newline="", encoding="utf-8-sig") as f:
+		return sum(1 for _ in csv.reader(f)) - 1
+
+
+def _read_parquet(path: Path) -> int:
+	import pyarrow.dataset as ds
+
+	return ds.dataset(path, format="parquet", partitioning="hive").to_table().num_rows
+
+
+def _timed(fn, arg):
+	t0 = time.perf_counter()
+	n = fn(arg)
+	return n, time.perf_counter() - t0
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Compare taille et temps de relecture : CSV contre export Parquet.")
+	parser.add_argument("--tables", nargs="+", default=list(ANALYTICS_TABLES), choices=list(ANALYTICS_TABLES))
+	args = parser.parse_args()
+
+	with tempfile.TemporaryDirectory(prefix="bench_analytics_") as tmp:
+		out = Path(tmp)
+		export_analytics(out / "parquet", args.tables)
+		print(f"{'Table':<16}{'Lignes':>10}{'CSV (Mo)':>11}{'Parquet (Mo)':>14}{'Lecture CSV (s)':>17}{'Lecture Parquet (s)':>21}")
+		for table in args.tables:
+			csv_path = out / f"{table}.csv"
+			export_table_csv(table, csv_path)
+			pq_path = out / "parquet" / table
+			rows, t_csv = _timed(_read_csv, csv_path)
+			_, t_pq = _timed(_read_parquet, pq_path)
+			pq_size = sum(p.stat().st_size for p in pq_path.rglob("*.parquet"))
+			print(
+				f"{table:<16}{rows:>10}{csv_path.stat().st_size / 1e6:>11.2f}{pq_size / 1e6:>14.2f}"
+				f"{t_csv:>17.3f}{t_pq:>21.3f}"
+			)
+	return 0
+
+
+if __name__ == "__main__":
+	try:
+		sys.exit(main())
+	except Exception as ex:
+		print(f"Erreur: {ex}")
+		sys.exit(1)
@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from scripts.bench_dao import SIZES
+
+
+BACKENDS = ["mysql", "sqlite"]
+
+
+def run_backend(backend: str, args, tmp: Path) -> dict:
+	"""Lance bench_dao avec DB_BACKEND=backend (même graine : mêmes données) et relit ses résultats."""
+	out = tmp / f"{backend}.json"
+	env = dict(os.environ, DB_BACKEND=backend)
+	if backend == "sqlite":
+		env["DB_PATH"] = str(args.sqlite_path or tmp / "bench.sqlite3")
+	cmd = [
+		sys.executable, "-m", "scripts.bench_dao", "--yes",
+		"--sizes", *args.sizes,
+		"--repeat", str(args.repeat),
+		"--seed", str(args.seed),
+		"--out", str(out),
+		# Pas de comparaison à la référence de bench_dao (mesurée sur un seul moteur)
+		"--baseline", str(tmp / "aucune_reference.json"),
+	]
+	print(f"== {backend} ==")
+	proc = subprocess.run(cmd, env=env)
+	if proc.returncode != 0 or not out.exists():
+		raise RuntimeError(f"bench_dao a échoué avec DB_BACKEND={backend} (code {proc.returncode})")
+	return json.loads(out.read_text(encoding="utf-8"))
+
+
+def _per_second(ms):
+	return 1000.0 / ms if ms else 0.0
+
+
+def report(results: dict) -> None:
+	backends = list(results)
+	first = results[backends[0]]
+	for size in first["sizes"]:
+		print()
+		print(f"[{size}] {first['sizes'][size]['events']} événements")
+		loads = []
+		for b in backends:
+			entry = results[b]["sizes"].get(size, {})
+			if entry.get("generate_s"):
+				loads.append(f"{b} {entry['events'] / entry['generate_s']:,.0f} lignes/s".replace(",", " "))
+		if loads:
+			print("  Chargement du jeu de données : " + " ; ".join(loads))
+		header = f"  {'Fonction':<28}" + "".join(f"{b + ' (ms)':>14}{b + ' (appels/s)':>20}" for b in backends)
+		if len(backends) == 2:
+			header += f"{'Rapport':>10}"
+		print(header)
+		for name in first["sizes"][size]["functions"]:
+			line = f"  {name:<28}"
+			medians = []
+			for b in backends:
+				r = results[b]["sizes"].get(size, {}).get("functions", {}).get(name)
+				if not r or "error" in r:
+					line += f"{'erreur':>14}{'':>20}"
+					medians.append(None)
+				else:
+					line += f"{r['median_ms']:>14.2f}{_per_second(r['median_ms']):>20.0f}"
+					medians.append(r["median_ms"])
+			if len(backends) == 2 and all(medians) and medians[1]:
+				# > 1 : le second moteur est plus rapide
+				line += f"{medians[0] / medians[1]:>9.1f}x"
+			print(line)
+	for b in backends:
+		for size, entry in results[b]["sizes"].items():
+			for name, r in entry["functions"].items():
+				if "error" in r:
+					print(f"[{b}/{size}] {name} : {r['error']}")
+
+
+def main():
+	parser = argparse.ArgumentParser(
+		description="Compare les moteurs MySQL et SQLite sur les mêmes appels DAO et le même jeu de données"
+		" généré (latence médiane par appel, appels/s, débit de chargement). La base MySQL configurée est"
+		" vidée et regénérée ; la base SQLite est un fichier temporaire sauf --sqlite-path."
+	)
+	parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+	parser.add_argument("--sizes", nargs="+", default=["1k", "100k"], choices=list(SIZES))
+	parser.add_argument("--repeat", type=int, default=5, help="mesures par fonction (médiane retenue)")
+	parser.add_argument("--seed", type=int, default=42)
+	parser.add_argument("--sqlite-path", type=Path, help="fichier SQLite à (re)générer pour la mesure")
+	parser.add_argument("--out", type=Path, help="fichier JSON des résultats des deux moteurs")
+	parser.add_argument("--yes", action="store_true", help="confirme la regénération des bases")
+	args = parser.parse_args()
+
+	if not args.yes:
+		print("Les bases mesurées vont être vidées et regénérées. Relancer avec --yes.")
+		return 2
+
+	with tempfile.TemporaryDirectory(prefix="bench_backends_") as tmp:
+		results = {b: run_backend(b, args, Path(tmp)) for b in args.backends}
+	report(results)
+	if args.out:
+		payload = {"created_at": datetime.now().isoformat(timespec="seconds"), "backends": results}
+		args.out.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+	return 0
+
+
+if __name__ == "__main__":
+	try:
+		sys.exit(main())
+	except Exception as ex:
+		print(f"Erreur: {ex}")
+		sys.exit(1)
@@ -0,0 +1,74 @@
+import argparse
+import gzip
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.config import get_config
+from app.utils.backup import backup_database
+
+
+def bench_native(out_dir: Path, workers: int) -> dict:
+	path = out_dir / "native.sql.gz"
+	t0 = time.perf_counter()
+	result = backup_database(path, workers=workers)
+	elapsed = time.perf_counter() - t0
+	return {"nom": f"moteur intégré ({workers} workers)", "secondes": elapsed, "octets": path.stat().st_size, "lignes": sum(result["tables"].values())}
+
+
+def bench_mysqldump(out_dir: Path, rows: int) -> dict:
+	cfg = get_config()
+	path = out_dir / "mysqldump.sql.gz"
+	cmd = [
+		"mysqldump", "--single-transaction", "--quick",
+		f"-h{cfg.db_host}", f"-P{cfg.db_port}", f"-u{cfg.db_user}", cfg.db_name,
+	]
+	env = dict(os.environ, MYSQL_PWD=cfg.db_password)
+	t0 = time.perf_counter()
+	# Même compression que le moteur intégré, pour comparer des fichiers équivalents
+	with gzip.open(path, "wb", compresslevel=6) as out:
+		proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+		shutil.copyfileobj(proc.stdout, out)
+		stderr = proc.stderr.read().decode("utf-8", errors="replace")
+		if proc.wait() != 0:
+			raise RuntimeError(stderr.strip() or "mysqldump a échoué")
+	elapsed = time.perf_counter() - t0
+	return {"nom": "mysqldump | gzip", "secondes": elapsed, "octets": path.stat().st_size, "lignes": rows}
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Compare le moteur de sauvegarde intégré à mysqldump.")
+	parser.add_argument("--workers", type=int, nargs="+", default=[1, 4], help="nombres de workers à mesurer")
+	parser.add_argument("--runs", type=int, default=3, help="mesures par configuration (la meilleure est retenue)")
+	args = parser.parse_args()
+
+	results = []
+	with tempfile.TemporaryDirectory(prefix="bench_backup_") as tmp:
+		out_dir = Path(tmp)
+		rows = 0
+		for workers in args.workers:
+			best = min((bench_native(out_dir, workers) for _ in range(args.runs)), key=lambda r: r["secondes"])
+			rows = best["lignes"]
+			results.append(best)
+		if shutil.which("mysqldump"):
+			results.append(min((bench_mysqldump(out_dir, rows) for _ in range(args.runs)), key=lambda r: r["secondes"]))
+		else:
+			print("mysqldump introuvable dans le PATH : comparaison ignorée.")
+
+	print(f"{'Méthode':<32}{'Durée (s)':>12}{'Lignes/s':>14}{'Taille (Mo)':>14}")
+	for r in results:
+		rate = r["lignes"] / r["secondes"] if r["secondes"] else 0
+		print(f"{r['nom']:<32}{r['secondes']:>12.2f}{rate:>14.0f}{r['octets'] / 1e6:>14.1f}")
+	return 0
+
+
+if __name__ == "__main__":
+	try:
+		sys.exit(main())
+	except Exception as ex:
+		print(f"Erreur: {ex}")
+		sys.exit(1)
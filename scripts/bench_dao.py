@@ -0,0 +1,188 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from app.config import get_config
+from app.db import get_connection, observe_queries, transaction
+from app.dao.finances import create_depense, create_recette
+from app.dao.lot_events import record_mortality, record_partial_sale
+from app.dao.soins import create_soin
+from app.dao.stocks import add_entry
+from scripts.check_query_plans import hot_path_calls
+from scripts.generate_dataset import generate
+
+
+# Tailles de jeu de données (événements) ; environ 58 événements par lot généré
+SIZES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+EVENTS_PER_LOT = 58
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "bench_dao_baseline.json"
+
+
+class _Rollback(Exception):
+	"""Annule la transaction d'un appel d'écriture mesuré : la base reste identique entre les mesures."""
+
+
+def _sample() -> dict:
+	conn = get_connection()
+	try:
+		with conn.cursor() as cur:
+			cur.execute("SELECT COALESCE(MIN(id), 1), COALESCE(MAX(id), 1) FROM lots")
+			min_lot, max_lot = cur.fetchone()
+			cur.execute("SELECT COALESCE(MIN(id), 0) FROM stocks")
+			stock_id = int(cur.fetchone()[0])
+			cur.execute(
+				"SELECT COUNT(*) FROM mortalites UNION ALL SELECT COUNT(*) FROM ventes_animaux"
+				" UNION ALL SELECT COUNT(*) FROM abattages UNION ALL SELECT COUNT(*) FROM soins"
+				" UNION ALL SELECT COUNT(*) FROM depenses UNION ALL SELECT COUNT(*) FROM recettes"
+			)
+			events = sum(int(r[0]) for r in cur.fetchall())
+		return {"lot_id": int(max_lot), "lot_ids": [int(min_lot), int(max_lot)], "stock_id": stock_id, "events": events}
+	finally:
+		conn.close()
+
+
+def _write_calls(sample: dict) -> list:
+	"""Appels d'écriture, exécutés dans une transaction annulée."""
+	lot_id = sample["lot_id"]
+	today = date.today().isoformat()
+	calls = [
+		("create_depense", lambda: create_depense("Alimentation", 1000.0, today, "bench", lot_id)),
+		("create_recette", lambda: create_recette("Vente", 1000.0, today, lot_id, "bench")),
+		("record_mortality", lambda: record_mortality(lot_id, today, 1, "bench")),
+		("record_partial_sale", lambda: record_partial_sale(lot_id, today, 1, 1000.0, "bench")),
+		("create_soin", lambda: create_soin(lot_id, today, "bench", None, 100.0, None)),
+	]
+	if sample["stock_id"]:
+		calls.append(("add_entry", lambda: add_entry(sample["stock_id"], 1)))
+	return calls
+
+
+def _rolled_back(fn):
+	def run():
+		try:
+			with transaction():
+				fn()
+				raise _Rollback()
+		except _Rollback:
+			pass
+	return run
+
+
+def measure(fn, repeat: int) -> dict:
+	"""Médiane et minimum (ms) sur `repeat` appels après un appel de chauffe ; allers-retours d'un appel."""
+	fn()
+	with observe_queries() as log:
+		fn()
+	timings = []
+	for _ in range(repeat):
+		t0 = time.perf_counter()
+		fn()
+		timings.append((time.perf_counter() - t0) * 1000)
+	return {"median_ms": round(statistics.median(timings), 3), "min_ms": round(min(timings), 3), "round_trips": len(log)}
+
+
+def run_suite(repeat: int) -> dict:
+	sample = _sample()
+	calls = hot_path_calls(sample) + [(name, _rolled_back(fn)) for name, fn in _write_calls(sample)]
+	functions = {}
+	for name, fn in calls:
+		try:
+			functions[name] = measure(fn, repeat)
+		except Exception as ex:
+			functions[name] = {"error": str(ex)}
+	return {"events": sample["events"], "functions": functions}
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta_ms: float) -> list:
+	"""
+	Régressions par rapport à la référence : durée médiane au-delà de (1 + threshold) fois
+	la référence et d'au moins min_delta_ms, ou davantage d'allers-retours.
+	"""
+	regressions = []
+	for size, current in results["sizes"].items():
+		reference = baseline.get("sizes", {}).get(size)
+		if not reference:
+			continue
+		for name, now in current["functions"].items():
+			before = reference["functions"].get(name)
+			if not before or "error" in before:
+				continue
+			if "error" in now:
+				regressions.append(f"[{size}] {name} : erreur ({now['error']})")
+				continue
+			if now["round_trips"] > before["round_trips"]:
+				regressions.append(f"[{size}] {name} : {before['round_trips']} -> {now['round_trips']} allers-retours")
+			limit = before["median_ms"] * (1 + threshold)
+			if now["median_ms"] > limit and now["median_ms"] - before["median_ms"] >= min_delta_ms:
+				regressions.append(f"[{size}] {name} : {before['median_ms']:.2f} -> {now['median_ms']:.2f} ms")
+	return regressions
+
+
+def main():
+	parser = argparse.ArgumentParser(
+		description="Mesure les fonctions DAO et rapports sur des jeux de données de plusieurs tailles."
+		" Sans --current, la base configurée est vidée puis regénérée pour chaque taille."
+	)
+	parser.add_argument("--sizes", nargs="+", default=list(SIZES), choices=list(SIZES))
+	parser.add_argument("--current", action="store_true", help="mesure la base telle quelle, sans la regénérer")
+	parser.add_argument("--repeat", type=int, default=5, help="mesures par fonction (médiane retenue)")
+	parser.add_argument("--seed", type=int, default=42)
+	parser.add_argument("--out", type=Path, help="fichier JSON des résultats")
+	parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="résultats de référence")
+	parser.add_argument("--save-baseline", action="store_true", help="enregistre les résultats comme référence")
+	parser.add_argument("--threshold", type=float, default=0.25, help="régression tolérée (0.25 = +25 %%)")
+	parser.add_argument("--min-delta-ms", type=float, default=2.0, help="écart minimal (ms) pour signaler une régression")
+	parser.add_argument("--yes", action="store_true", help="confirme la regénération de la base configurée")
+	args = parser.parse_args()
+
+	if not args.current and not args.yes:
+		print(f"La base '{get_config().db_name}' va être vidée et regénérée. Relancer avec --yes (ou utiliser --current).")
+		return 2
+
+	results = {"created_at": datetime.now().isoformat(timespec="seconds"), "repeat": args.repeat, "sizes": {}}
+	targets = ["actuelle"] if args.current else args.sizes
+	for size in targets:
+		generate_s = None
+		if not args.current:
+			print(f"[{size}] génération du jeu de données...")
+			t0 = time.perf_counter()
+			generate(max(1, SIZES[size] // EVENTS_PER_LOT), seed=args.seed, reset=True)
+			generate_s = round(time.perf_counter() - t0, 3)
+		results["sizes"][size] = run_suite(args.repeat)
+		results["sizes"][size]["generate_s"] = generate_s
+		print(f"[{size}] {results['sizes'][size]['events']} événements")
+		print(f"  {'Fonction':<28}{'Médiane (ms)':>14}{'Min (ms)':>11}{'Allers-retours':>16}")
+		for name, r in results["sizes"][size]["functions"].items():
+			if "error" in r:
+				print(f"  {name:<28}  erreur : {r['error']}")
+			else:
+				print(f"  {name:<28}{r['median_ms']:>14.2f}{r['min_ms']:>11.2f}{r['round_trips']:>16}")
+
+	if args.out:
+		args.out.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+	if args.save_baseline:
+		args.baseline.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+		print(f"Référence enregistrée : {args.baseline}")
+		return 0
+	if not args.baseline.exists():
+		print("Aucune référence : relancer avec --save-baseline pour en créer une.")
+		return 0
+	regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold, args.min_delta_ms)
+	for line in regressions:
+		print(f"[REGRESSION] {line}")
+	if not regressions:
+		print("Aucune régression par rapport à la référence.")
+	return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+	try:
+		sys.exit(main())
+	except Exception as ex:
+		print(f"Erreur: {ex}")
+		sys.exit(1)
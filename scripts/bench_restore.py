@@ -0,0 +1,83 @@
+import argparse
+import gzip
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from app.config import get_config
+from app.utils.backup import read_manifest
+from app.utils.restore import restore_file
+
+
+def restore_with_mysql_client(path: Path) -> None:
+	"""Rejoue le fichier avec le client mysql (mot de passe via MYSQL_PWD)."""
+	cfg = get_config()
+	cmd = ["mysql", f"-h{cfg.db_host}", f"-P{cfg.db_port}", f"-u{cfg.db_user}", cfg.db_name]
+	env = dict(os.environ, MYSQL_PWD=cfg.db_password)
+	opener = gzip.open if str(path).endswith(".gz") else open
+	with opener(path, "rb") as f:
+		proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+		try:
+			shutil.copyfileobj(f, proc.stdin)
+		except BrokenPipeError:
+			pass
+		finally:
+			proc.stdin.close()
+		stderr = proc.stderr.read().decode("utf-8", errors="replace")
+		if proc.wait() != 0:
+			raise RuntimeError(stderr.strip() or "mysql a échoué")
+
+
+def _timed(name: str, fn) -> dict:
+	t0 = time.perf_counter()
+	fn()
+	return {"nom": name, "secondes": time.perf_counter() - t0}
+
+
+def main():
+	parser = argparse.ArgumentParser(
+		description="Mesure la restauration d'une sauvegarde complète (moteur intégré et client mysql)."
+		" ATTENTION : la base configurée (DB_NAME) est écrasée ; utiliser une base de test."
+	)
+	parser.add_argument("backup", type=Path, help="sauvegarde complète .sql.gz produite par l'application")
+	parser.add_argument("--runs", type=int, default=1, help="mesures par méthode (la meilleure est retenue)")
+	parser.add_argument("--yes", action="store_true", help="confirme l'écrasement de la base configurée")
+	args = parser.parse_args()
+
+	if not args.yes:
+		print(f"La base '{get_config().db_name}' va être écrasée. Relancer avec --yes pour confirmer.")
+		return 2
+	manifest = read_manifest(args.backup)
+	if manifest.get("kind") != "full":
+		print("Une sauvegarde complète est nécessaire.")
+		return 2
+
+	methods = [
+		("moteur intégré", lambda: restore_file(args.backup)),
+		("moteur intégré, index immédiats", lambda: restore_file(args.backup, defer_indexes=False)),
+	]
+	if shutil.which("mysql"):
+		methods.append(("client mysql", lambda: restore_with_mysql_client(args.backup)))
+	else:
+		print("mysql introuvable dans le PATH : comparaison ignorée.")
+
+	results = [min((_timed(name, fn) for _ in range(args.runs)), key=lambda r: r["secondes"]) for name, fn in methods]
+	rows = sum(manifest["tables"].values())
+
+	print(f"{rows} lignes, {args.backup.stat().st_size / 1e6:.1f} Mo compressés")
+	print(f"{'Méthode':<36}{'Durée (s)':>12}{'Lignes/s':>14}")
+	for r in results:
+		rate = rows / r["secondes"] if r["secondes"] else 0
+		print(f"{r['nom']:<36}{r['secondes']:>12.2f}{rate:>14.0f}")
+	return 0
+
+
+if __name__ == "__main__":
+	try:
+		sys.exit(main())
+	except Exception as ex:
+		print(f"Erreur: {ex}")
+		sys.exit(1)
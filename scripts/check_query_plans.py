@@ -0,0 +1,140 @@
+import sys
+from datetime import date, timedelta
+from typing import List, Tuple
+
+from app.db import get_connection, observe_queries, require_mysql
+from app.dao.lots import list_lots, list_active_lots, get_lot
+from app.dao.lot_events import get_lot_counters_bulk, list_mortalites, list_ventes
+from app.dao.finances import list_depenses, list_recettes, summary
+from app.dao.soins import list_soins
+from app.dao.stocks import list_stocks
+from app.dao.kpis import fetch_kpis
+from app.reports import kpis_by_lot, lots_profitability, monthly_summary, lots_overview
+
+
+# Tables dont la taille croît avec l'historique : ni parcours complet ni tri fichier tolérés
+EVENT_TABLES = {"mortalites", "ventes_animaux", "abattages", "soins", "depenses", "recettes"}
+
+# En dessous de ce volume, l'optimiseur préfère souvent un parcours complet : simple avertissement
+MIN_ROWS = 1000
+
+
+def _sample_values() -> dict:
+	conn = get_connection()
+	try:
+		with conn.cursor() as cur:
+			cur.execute("SELECT COALESCE(MAX(id), 1), COALESCE(MIN(id), 1) FROM lots")
+			max_lot, min_lot = cur.fetchone()
+			counts = {}
+			for table in sorted(EVENT_TABLES):
+				cur.execute(f"SELECT COUNT(*) FROM {table}")
+				counts[table] = int(cur.fetchone()[0])
+			return {"lot_id": int(max_lot), "lot_ids": [int(min_lot), int(max_lot)], "counts": counts}
+	finally:
+		conn.close()
+
+
+def hot_path_calls(sample: dict) -> list:
+	"""Appels DAO/rapports du chemin interactif, avec des paramètres représentatifs."""
+	lot_id = sample["lot_id"]
+	today = date.today()
+	start = (today - timedelta(days=30)).isoformat()
+	end = today.isoformat()
+	return [
+		("list_lots", lambda: list_lots(limit=200)),
+		("list_lots(filtres)", lambda: list_lots(statut="Actif", type_animal="Poulet", limit=200)),
+		("list_lots(page suivante)", lambda: list_lots(after=(lot_id,), limit=200)),
+		("list_active_lots", list_active_lots),
+		("get_lot", lambda: get_lot(lot_id)),
+		("get_lot_counters_bulk", lambda: get_lot_counters_bulk(sample["lot_ids"])),
+		("list_mortalites", lambda: list_mortalites(lot_id)),
+		("list_ventes", lambda: list_ventes(lot_id)),
+		("list_depenses", lambda: list_depenses(limit=200)),
+		("list_depenses(période)", lambda: list_depenses(start, end, limit=200)),
+		("list_depenses(lot)", lambda: list_depenses(lot_id=lot_id, limit=200)),
+		("list_recettes", lambda: list_recettes(limit=200)),
+		("list_recettes(période)", lambda: list_recettes(start, end, limit=200)),
+		("list_recettes(lot)", lambda: list_recettes(lot_id=lot_id, limit=200)),
+		("summary(période)", lambda: summary(start, end)),
+		("list_soins", lambda: list_soins(limit=200)),
+		("list_soins(lot)", lambda: list_soins(lot_id=lot_id, limit=200)),
+		("list_stocks", lambda: list_stocks(limit=200)),
+		("fetch_kpis", fetch_kpis),
+		("kpis_by_lot", lambda: kpis_by_lot(lot_id)),
+		("lots_profitability", lots_profitability),
+		("monthly_summary", lambda: monthly_summary(today.year, today.month)),
+		("lots_overview", lots_overview),
+	]
+
+
+def explain(sql: str, params) -> list:
+	conn = get_connection()
+	try:
+		with conn.cursor(dictionary=True) as cur:
+			cur.execute("EXPLAIN " + sql, params or ())
+			return cur.fetchall()
+	finally:
+		conn.close()
+
+
+def check_plan(plan: list, counts: dict) -> tuple:
+	"""Retourne (erreurs, avertissements) pour un plan EXPLAIN."""
+	errors, warnings = [], []
+	for step in plan:
+		table = step.get("table") or ""
+		if table not in EVENT_TABLES:
+			continue
+		extra = step.get("Extra") or ""
+		problems = []
+		if step.get("type") == "ALL":
+			problems.append("parcours complet")
+		if "Using filesort" in extra:
+			problems.append("tri fichier (filesort)")
+		if not problems:
+			continue
+		msg = f"{table}: {', '.join(problems)} (key={step.get('key')}, rows={step.get('rows')})"
+		if counts.get(table, 0) < MIN_ROWS:
+			warnings.append(msg + f" — table trop petite ({counts.get(table, 0)} lignes) pour conclure")
+		else:
+			errors.append(msg)
+	return errors, warnings
+
+
+def plan_failures(sample: dict) -> Tuple[List[str], List[str]]:
+	"""
+	Exécute les appels du chemin interactif et vérifie le plan EXPLAIN de chacune
+	de leurs requêtes SELECT. Retourne (échecs, avertissements), préfixés de l'appel.
+	"""
+	failures, warnings = [], []
+	for label, call in hot_path_calls(sample):
+		with observe_queries() as log:
+			call()
+		for sql, params in log:
+			if not sql.lstrip().upper().startswith("SELECT"):
+				continue
+			errors, warns = check_plan(explain(sql, params), sample["counts"])
+			failures += [f"{label}: {e}" for e in errors]
+			warnings += [f"{label}: {w}" for w in warns]
+	return failures, warnings
+
+
+def main():
+	require_mysql("Vérification des plans d'exécution")
+	failures, warnings = plan_failures(_sample_values())
+	for w in warnings:
+		print(f"[AVERT] {w}")
+	for e in failures:
+		print(f"[ÉCHEC] {e}")
+	if failures:
+		print(f"{len(failures)} plan(s) en régression.")
+		return 1
+	print("Tous les plans du chemin interactif utilisent des index.")
+	return 0
+
+
+if __name__ == "__main__":
+	try:
+		sys.exit(main())
+	except Exception as ex:
+		print(f"Erreur: {ex}")
+		sys.exit(1)
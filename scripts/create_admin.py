@@ -20,7 +20,6 @@ def main():
 	conn = get_connection()
 	try:
 		with conn.cursor() as cur:
-			cur.execute("USE gestion_elevage")
 			cur.execute("SELECT id FROM utilisateurs WHERE email=%s", (email,))
 			row = cur.fetchone()
 			if row:
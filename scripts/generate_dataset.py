@@ -0,0 +1,320 @@
+import argparse
+import math
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import mysql.connector
+
+from app.config import get_config
+from app.db import open_connection
+from app.dao.finance_monthly import rebuild_finance_monthly
+from app.dao.kpis import invalidate_kpis
+from app.dao.lot_counters import rebuild_lot_counters
+
+
+# Lignes envoyées par executemany (le connecteur en fait un seul INSERT multi-lignes)
+BATCH_ROWS = 5000
+
+# Paramètres d'élevage par espèce
+SPECIES = {
+	"Poulet": {
+		"effectif": (300, 3000),
+		"cycle": (42, 56),
+		"mortalite_jour": 0.0012,
+		"prix_achat": 450,
+		"prix_vente": (2500, 4000),
+		"poids_arrivee": 0.04,
+		"poids_final": (1.8, 2.6),
+		"aliment_kg_jour": 0.11,
+		"fin_ventes": 12,  # ventes partielles sur les derniers jours du cycle
+	},
+	"Porc": {
+		"effectif": (10, 80),
+		"cycle": (150, 200),
+		"mortalite_jour": 0.0002,
+		"prix_achat": 25000,
+		"prix_vente": (90000, 160000),
+		"poids_arrivee": 8.0,
+		"poids_final": (90.0, 120.0),
+		"aliment_kg_jour": 2.2,
+		"fin_ventes": 40,
+	},
+}
+PRIX_ALIMENT_KG = 350
+
+# Protocole de soins par défaut (identique aux données de gestion_elevage.sql), utilisé
+# si la table soins_preconfigures est absente ou vide
+DEFAULT_PROTOCOL = [
+	("Poulet", 1, "Vaccin Marek", "Vaccination contre la maladie de Marek (si poussin)", 500),
+	("Poulet", 7, "Vaccin Gumboro", "Première vaccination contre la maladie de Gumboro", 800),
+	("Poulet", 14, "Vaccin Newcastle", "Vaccination contre la maladie de Newcastle", 1000),
+	("Poulet", 21, "Rappel Gumboro", "Rappel vaccination Gumboro", 800),
+	("Poulet", 28, "Vermifuge", "Traitement vermifuge", 600),
+	("Poulet", 35, "Complément Vitamines", "Complément vitaminique pour croissance", 400),
+	("Porc", 0, "Vaccin Circovirus", "Vaccination contre le circovirus porcin à l'arrivée", 1500),
+	("Porc", 14, "Vermifuge", "Traitement vermifuge première fois", 800),
+	("Porc", 42, "Vaccin Rouget", "Vaccination contre le rouget", 1200),
+	("Porc", 70, "Rappel Vaccins", "Rappel des vaccinations principales", 1500),
+]
+
+SOURCES = ["Couvoir Central", "Ferme Mbouda", "Provenderie de l'Ouest", "Élevage Bafoussam", "Import"]
+CLIENTS = ["Restaurant Le Palmier", "Boucherie Centrale", "Marché Mokolo", "Hôtel du Lac", "Particulier", None]
+MOTIFS = ["Maladie", "Chaleur", "Écrasement", "Inconnu", None]
+INTERVENANTS = ["Vétérinaire", "Fermier", "Technicien"]
+STOCK_ITEMS = [
+	("Aliment démarrage", "Aliment", "kg"),
+	("Aliment croissance", "Aliment", "kg"),
+	("Aliment finition", "Aliment", "kg"),
+	("Aliment porc", "Aliment", "kg"),
+	("Vaccins", "Médicament", "doses"),
+	("Vermifuge", "Médicament", "L"),
+	("Abreuvoirs", "Matériel", "unités"),
+]
+
+# Tables vidées par --reset (clés étrangères désactivées le temps du TRUNCATE)
+_RESET_TABLES = [
+	"mortalites", "ventes_animaux", "abattages", "soins", "depenses", "recettes",
+	"lot_counters", "finance_monthly", "stocks", "lots",
+]
+
+_INSERTS = {
+	"lots": "INSERT INTO lots(id, type_animal, date_arrivee, nombre_initial, poids_moyen, source, statut, remarque, cout_initial)"
+	" VALUES(%s,%s,%s,%s,%s,%s,%s,%s,%s)",
+	"mortalites": "INSERT INTO mortalites(lot_id, date_event, quantite, motif) VALUES(%s,%s,%s,%s)",
+	"ventes_animaux": "INSERT INTO ventes_animaux(lot_id, date_vente, quantite, prix_unitaire, client) VALUES(%s,%s,%s,%s,%s)",
+	"abattages": "INSERT INTO abattages(lot_id, date_abattage, quantite, poids_unitaire) VALUES(%s,%s,%s,%s)",
+	"soins": "INSERT INTO soins(lot_id, date_soin, type_soin, description, cout, effectue_par) VALUES(%s,%s,%s,%s,%s,%s)",
+	"depenses": "INSERT INTO depenses(type_depense, description, montant, date_depense, lot_id) VALUES(%s,%s,%s,%s,%s)",
+	"recettes": "INSERT INTO recettes(type_recette, montant, date_recette, lot_id, client) VALUES(%s,%s,%s,%s,%s)",
+	"stocks": "INSERT INTO stocks(nom_produit, type_produit, quantite, unite) VALUES(%s,%s,%s,%s)",
+}
+
+
+class _BulkWriter:
+	"""Accumule les lignes par table et les envoie par executemany de BATCH_ROWS lignes."""
+
+	def __init__(self, conn, batch_rows: int = BATCH_ROWS):
+		self._conn = conn
+		self._batch_rows = batch_rows
+		self._pending: Dict[str, List[tuple]] = {t: [] for t in _INSERTS}
+		self.counts: Dict[str, int] = {t: 0 for t in _INSERTS}
+
+	def add(self, table: str, row: tuple) -> None:
+		rows = self._pending[table]
+		rows.append(row)
+		if len(rows) >= self._batch_rows:
+			self._flush(table)
+
+	def _flush(self, table: str) -> None:
+		rows = self._pending[table]
+		if not rows:
+			return
+		if table != "lots":
+			# Les lots référencés doivent être en base avant leurs événements
+			self._flush("lots")
+		with self._conn.cursor() as cur:
+			cur.executemany(_INSERTS[table], rows)
+		self._conn.commit()
+		self.counts[table] += len(rows)
+		self._pending[table] = []
+
+	def flush(self) -> None:
+		for table in _INSERTS:
+			self._flush(table)
+
+
+def _poisson(rng: random.Random, lam: float) -> int:
+	if lam <= 0:
+		return 0
+	if lam > 30:
+		return max(0, int(round(rng.gauss(lam, math.sqrt(lam)))))
+	# Knuth : suffisant pour les petites moyennes (mortalités quotidiennes)
+	limit = math.exp(-lam)
+	k, p = 0, 1.0
+	while True:
+		p *= rng.random()
+		if p <= limit:
+			return k
+		k += 1
+
+
+def _protocol(conn) -> Dict[str, List[Tuple[int, str, str, float]]]:
+	rows = []
+	try:
+		with conn.cursor() as cur:
+			cur.execute(
+				"SELECT type_animal, jour_application, type_soin, description, cout_estime FROM soins_preconfigures"
+				" WHERE actif = 1 ORDER BY type_animal, jour_application, id"
+			)
+			rows = cur.fetchall()
+	except mysql.connector.Error:
+		rows = []
+	protocol: Dict[str, List[Tuple[int, str, str, float]]] = {s: [] for s in SPECIES}
+	for animal, jour, soin, description, cout in rows or DEFAULT_PROTOCOL:
+		if animal in protocol:
+			protocol[animal].append((int(jour), soin, description, float(cout or 0)))
+	return protocol
+
+
+def _simulate_lot(rng: random.Random, out: _BulkWriter, lot_id: int, animal: str, arrival: date, end: date, protocol, feed: Dict[str, float]) -> None:
+	"""Cycle complet d'un lot : mortalités quotidiennes, aliment hebdomadaire, soins, ventes puis abattage."""
+	sp = SPECIES[animal]
+	initial = rng.randint(*sp["effectif"])
+	cycle = rng.randint(*sp["cycle"])
+	finished = arrival + timedelta(days=cycle) <= end
+	statut = "Terminé" if finished else "Actif"
+	out.add("lots", (
+		lot_id, animal, arrival, initial, sp["poids_arrivee"], rng.choice(SOURCES), statut, None, initial * sp["prix_achat"],
+	))
+	out.add("depenses", ("Autre", f"Achat lot #{lot_id}", float(initial * sp["prix_achat"]), arrival, lot_id))
+
+	alive = initial
+	care = {jour: (soin, desc, cout) for jour, soin, desc, cout in protocol[animal]}
+	sale_start = cycle - sp["fin_ventes"]
+	to_sell = int(initial * rng.uniform(0.55, 0.8))
+	weekly_feed = 0.0
+	for day in range(cycle + 1):
+		current = arrival + timedelta(days=day)
+		if current > end or alive <= 0:
+			break
+		dead = min(alive, _poisson(rng, alive * sp["mortalite_jour"]))
+		if dead:
+			out.add("mortalites", (lot_id, current, dead, rng.choice(MOTIFS)))
+			alive -= dead
+		if day in care:
+			soin, desc, cout = care[day]
+			out.add("soins", (lot_id, current, soin, desc, round(cout * max(1, alive / 100)), rng.choice(INTERVENANTS)))
+		weekly_feed += alive * sp["aliment_kg_jour"] * min(1.0, 0.3 + day / cycle)
+		if day % 7 == 6:
+			kg = round(weekly_feed)
+			out.add("depenses", ("Alimentation", f"Aliment lot #{lot_id}", float(kg * PRIX_ALIMENT_KG), current, lot_id))
+			feed[animal] += kg
+			weekly_feed = 0.0
+		if day >= sale_start and to_sell > 0 and alive > 0 and rng.random() < 0.35:
+			qty = min(alive, to_sell, max(1, int(to_sell * rng.uniform(0.15, 0.4))))
+			price = float(rng.randrange(*sp["prix_vente"], 50))
+			client = rng.choice(CLIENTS)
+			out.add("ventes_animaux", (lot_id, current, qty, price, client))
+			out.add("recettes", ("Vente", qty * price, current, lot_id, client))
+			alive -= qty
+			to_sell -= qty
+	if finished and alive > 0:
+		# Fin de cycle : le reste du lot est abattu
+		out.add("abattages", (lot_id, arrival + timedelta(days=cycle), alive, round(rng.uniform(*sp["poids_final"]), 2)))
+
+
+def _monthly_overheads(rng: random.Random, out: _BulkWriter, start: date, end: date) -> None:
+	"""Charges et recettes hors lot : entretien, frais divers, produits dérivés."""
+	month = date(start.year, start.month, 1)
+	while month <= end:
+		day = month + timedelta(days=rng.randint(0, 27))
+		if day <= end:
+			out.add("depenses", ("Entretien", "Entretien des bâtiments", float(rng.randrange(20000, 120000, 500)), day, None))
+			out.add("depenses", ("Autre", "Électricité et eau", float(rng.randrange(15000, 60000, 500)), day, None))
+			out.add("recettes", ("Produit dérivé", float(rng.randrange(10000, 90000, 500)), day, None, rng.choice(CLIENTS)))
+		month = date(month.year + (month.month == 12), month.month % 12 + 1, 1)
+
+
+def _reset(conn) -> None:
+	with conn.cursor() as cur:
+		cur.execute("SET FOREIGN_KEY_CHECKS=0")
+		try:
+			for table in _RESET_TABLES:
+				cur.execute(f"TRUNCATE TABLE {table}")
+		finally:
+			cur.execute("SET FOREIGN_KEY_CHECKS=1")
+
+
+def generate(
+	lots: int,
+	seed: int = 42,
+	start: date = date(2020, 1, 1),
+	years: float = 5.0,
+	porc_ratio: float = 0.2,
+	reset: bool = False,
+	batch_rows: int = BATCH_ROWS,
+	progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, int]:
+	"""
+	Génère un historique d'élevage déterministe (même graine, mêmes données) : `lots`
+	lots répartis régulièrement sur `years` années à partir de `start`, avec leurs
+	événements, les finances associées et l'état final des stocks. lot_counters et
+	finance_monthly sont recalculés à la fin. Retourne le nombre de lignes par table.
+	"""
+	rng = random.Random(seed)
+	end = start + timedelta(days=int(365.25 * years))
+	span = (end - start).days
+	conn = open_connection()
+	conn.autocommit = False
+	try:
+		if reset:
+			_reset(conn)
+		protocol = _protocol(conn)
+		with conn.cursor() as cur:
+			cur.execute("SELECT COALESCE(MAX(id), 0) FROM lots")
+			first_id = int(cur.fetchone()[0]) + 1
+		out = _BulkWriter(conn, batch_rows)
+		feed = {animal: 0.0 for animal in SPECIES}
+		for i in range(lots):
+			animal = "Porc" if rng.random() < porc_ratio else "Poulet"
+			arrival = start + timedelta(days=int(i * span / max(lots, 1)) + rng.randint(0, 3))
+			_simulate_lot(rng, out, first_id + i, animal, arrival, end, protocol, feed)
+			if progress and (i + 1) % 100 == 0:
+				progress(i + 1, lots)
+		_monthly_overheads(rng, out, start, end)
+		# Stocks : quantité restante après les achats d'aliment consommés (mouvements cumulés)
+		feed_items = sum(1 for _, kind, _ in STOCK_ITEMS if kind == "Aliment")
+		for name, kind, unit in STOCK_ITEMS:
+			if kind == "Aliment":
+				remaining = int(sum(feed.values()) / feed_items * rng.uniform(0.01, 0.05))
+			else:
+				remaining = rng.randint(0, 200)
+			out.add("stocks", (name, kind, remaining, unit))
+		out.flush()
+		if progress:
+			progress(lots, lots)
+	finally:
+		conn.close()
+	rebuild_lot_counters()
+	rebuild_finance_monthly()
+	invalidate_kpis()
+	return out.counts
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Génère un historique d'élevage synthétique (déterministe) dans la base configurée.")
+	parser.add_argument("--lots", type=int, default=1000, help="nombre de lots (environ 60 à 70 événements par lot)")
+	parser.add_argument("--seed", type=int, default=42)
+	parser.add_argument("--start", type=date.fromisoformat, default=date(2020, 1, 1), help="date du premier lot (AAAA-MM-JJ)")
+	parser.add_argument("--years", type=float, default=5.0, help="durée de l'historique")
+	parser.add_argument("--porc-ratio", type=float, default=0.2, help="part des lots de porcs")
+	parser.add_argument("--reset", action="store_true", help="vide d'abord les lots, événements, finances et stocks")
+	parser.add_argument("--yes", action="store_true", help="confirme l'écriture dans la base configurée")
+	args = parser.parse_args()
+
+	if not args.yes:
+		print(f"Les données seront écrites dans la base '{get_config().db_name}'. Relancer avec --yes pour confirmer.")
+		return 2
+	t0 = time.perf_counter()
+	counts = generate(
+		args.lots, args.seed, args.start, args.years, args.porc_ratio, args.reset,
+		progress=lambda done, total: print(f"\r{done}/{total} lots", end="", flush=True),
+	)
+	elapsed = time.perf_counter() - t0
+	print()
+	for table, n in counts.items():
+		print(f"{table:<16}{n:>10}")
+	events = sum(counts.values()) - counts["lots"] - counts["stocks"]
+	print(f"{events} événements en {elapsed:.1f} s ({events / elapsed:.0f}/s)")
+	return 0
+
+
+if __name__ == "__main__":
+	try:
+		sys.exit(main())
+	except Exception as ex:
+		print(f"Erreur: {ex}")
+		sys.exit(1)
@@ -0,0 +1,30 @@
+import sys
+
+from app.dao.finance_monthly import rebuild_finance_monthly, verify_finance_monthly
+
+
+def main():
+	verify_only = "--verify" in sys.argv[1:]
+	diffs = verify_finance_monthly()
+	if diffs:
+		print(f"{len(diffs)} ligne(s) du cumul mensuel divergente(s) :")
+		for d in diffs:
+			print(
+				f"  {d['annee']}-{d['mois']:02d} lot {d['lot_id']} {d['sens']} {d['categorie']}: "
+				f"nb {d['nb_stocke']} -> {d['nb_attendu']}, total {d['total_stocke']:.2f} -> {d['total_attendu']:.2f}"
+			)
+	else:
+		print("Cumul mensuel cohérent avec les dépenses et recettes.")
+	if verify_only:
+		return 1 if diffs else 0
+	n = rebuild_finance_monthly()
+	print(f"Cumul mensuel recalculé ({n} ligne(s)).")
+	return 0
+
+
+if __name__ == "__main__":
+	try:
+		sys.exit(main())
+	except Exception as ex:
+		print(f"Erreur: {ex}")
+		sys.exit(1)
@@ -0,0 +1,31 @@
+import sys
+
+from app.dao.lot_counters import rebuild_lot_counters, verify_lot_counters
+
+
+def main():
+	verify_only = "--verify" in sys.argv[1:]
+	diffs = verify_lot_counters()
+	if diffs:
+		print(f"{len(diffs)} lot(s) avec des compteurs divergents :")
+		for d in diffs:
+			print(
+				f"  Lot #{d['lot_id']}: morts {d['morts_stockes']} -> {d['morts_attendus']}, "
+				f"vendus {d['vendus_stockes']} -> {d['vendus_attendus']}, "
+				f"abattus {d['abattus_stockes']} -> {d['abattus_attendus']}"
+			)
+	else:
+		print("Compteurs cohérents avec les événements.")
+	if verify_only:
+		return 1 if diffs else 0
+	n = rebuild_lot_counters()
+	print(f"Compteurs recalculés pour {n} lot(s).")
+	return 0
+
+
+if __name__ == "__main__":
+	try:
+		sys.exit(main())
+	except Exception as ex:
+		print(f"Erreur: {ex}")
+		sys.exit(1)
@@ -0,0 +1,33 @@
+import argparse
+import sys
+from pathlib import Path
+
+from app.utils.checksum import checksum_backup, describe_diff, diff_checksums, verify_backup
+
+
+def main():
+	parser = argparse.ArgumentParser(
+		description="Compare une sauvegarde complète à la base (un fichier) ou deux sauvegardes entre elles (deux fichiers)."
+	)
+	parser.add_argument("backups", type=Path, nargs="+", help="sauvegarde(s) complète(s) .sql.gz")
+	args = parser.parse_args()
+
+	if len(args.backups) == 1:
+		diffs = verify_backup(args.backups[0])
+		labels = ("la sauvegarde", "la base")
+	elif len(args.backups) == 2:
+		diffs = diff_checksums(checksum_backup(args.backups[0]), checksum_backup(args.backups[1]))
+		labels = (args.backups[0].name, args.backups[1].name)
+	else:
+		parser.error("un ou deux fichiers attendus")
+	for line in describe_diff(diffs, *labels):
+		print(line)
+	return 1 if diffs else 0
+
+
+if __name__ == "__main__":
+	try:
+		sys.exit(main())
+	except Exception as ex:
+		print(f"Erreur: {ex}")
+		sys.exit(1)
@@ -0,0 +1,49 @@
+import uuid
+
+import pytest
+
+from app import db
+from app.config import get_config
+
+
+@pytest.fixture(autouse=True)
+def fresh_config():
+	"""get_config() est mis en cache : relu pour chaque test, et après l'annulation de ses setenv."""
+	get_config.cache_clear()
+	yield
+	get_config.cache_clear()
+
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch):
+	"""Base SQLite neuve (schéma embarqué) pour le test ; aucun serveur MySQL nécessaire."""
+	monkeypatch.setenv("DB_BACKEND", "sqlite")
+	monkeypatch.setenv("DB_PATH", str(tmp_path / "test.sqlite3"))
+	get_config.cache_clear()
+	db.close_connection_pool()
+	yield tmp_path / "test.sqlite3"
+	db.close_connection_pool()
+
+
+@pytest.fixture
+def mysql_db(monkeypatch):
+	"""
+	Base MySQL vide et jetable sur le serveur configuré (.env) ; le test est ignoré
+	si le serveur est injoignable. La base est supprimée à la fin du test.
+	"""
+	monkeypatch.setenv("DB_BACKEND", "mysql")
+	name = f"gestion_elevage_test_{uuid.uuid4().hex[:8]}"
+	monkeypatch.setenv("DB_NAME", name)
+	get_config.cache_clear()
+	db.close_connection_pool()
+	try:
+		admin = db.open_connection(with_database=False)
+	except Exception as ex:
+		pytest.skip(f"Serveur MySQL injoignable : {ex}")
+	try:
+		yield name
+	finally:
+		db.close_connection_pool()
+		with admin.cursor() as cur:
+			cur.execute(f"DROP DATABASE IF EXISTS `{name}`")
+		admin.close()
@@ -0,0 +1,104 @@
+import io
+import re
+
+from app.dao.lots import create_lot, delete_lot, get_lot, update_lot
+from app.db import get_connection
+from app.migrations import available_migrations, migrate
+from app.utils.backup import DERIVED_TABLES, TOMBSTONE_TABLE, TRACKING_COLUMN, backup_database, dump_table_rows, read_manifest
+from app.utils.restore import restore_file
+from app.utils.sql_script import iter_statements
+
+
+_CREATE_RE = re.compile(r"\bCREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)", re.IGNORECASE)
+_TRACKED_RE = re.compile(rf"\bALTER\s+TABLE\s+`?(\w+)`?\s+ADD\s+COLUMN\s+{TRACKING_COLUMN}\b", re.IGNORECASE)
+_TRIGGER_RE = re.compile(r"\bCREATE\s+TRIGGER\s+\w+\s+AFTER\s+DELETE\s+ON\s+`?(\w+)", re.IGNORECASE)
+
+
+def _change_tracking_migration():
+	return next(m for m in available_migrations() if m.name.endswith("_change_tracking.sql"))
+
+
+def test_change_tracking_covers_every_table_created_before_it():
+	tracking = _change_tracking_migration()
+	created = set()
+	for migration in available_migrations():
+		if migration.version >= tracking.version:
+			break
+		with open(migration.path, encoding="utf-8") as f:
+			for stmt in iter_statements(f):
+				created.update(_CREATE_RE.findall(stmt))
+	with open(tracking.path, encoding="utf-8") as f:
+		statements = list(iter_statements(f))
+	tracked = {t for stmt in statements for t in _TRACKED_RE.findall(stmt)}
+	triggers = {t for stmt in statements for t in _TRIGGER_RE.findall(stmt)}
+	expected = created - set(DERIVED_TABLES) - {TOMBSTONE_TABLE}
+	assert expected - tracked == set(), f"Tables sans {TRACKING_COLUMN}"
+	assert expected - triggers == set(), "Tables sans trigger de suppression"
+
+
+def test_incremental_backup_on_migrated_schema(mysql_db, tmp_path):
+	# Base construite par les migrations seules, sans gestion_elevage.sql (scripts.init_db)
+	migrate()
+	kept = create_lot("Poulet", "2026-01-05", 100, 1.2, "test", "Actif", None, 0)
+	gone = create_lot("Porc", "2026-01-06", 10, 20.0, "test", "Actif", None, 0)
+	full = backup_database(tmp_path / "full.sql.gz")
+	assert full["tables"]["lots"] == 2
+	delete_lot(gone)
+	incremental = backup_database(tmp_path / "incr.sql.gz", parent=read_manifest(tmp_path / "full.sql.gz"))
+	assert incremental["kind"] == "incremental"
+	assert incremental["deleted"] == {"lots": 1}
+	assert kept
+
+
+class _RowsCursor:
+	description = [("id",), ("statut",)]
+
+	def execute(self, stmt, params=()):
+		self._rows = [(1, "Actif"), (2, "Vendu")]
+
+	def fetchmany(self, size):
+		rows, self._rows = self._rows, []
+		return rows
+
+	def close(self):
+		pass
+
+
+class _RowsConnection:
+	def cursor(self, buffered=True):
+		return _RowsCursor()
+
+
+def test_upsert_rows_never_use_replace():
+	# REPLACE supprime puis réinsère : les triggers AFTER DELETE journaliseraient la ligne
+	out = io.StringIO()
+	assert dump_table_rows(_RowsConnection(), "lots", out, upsert=True) == 2
+	text = out.getvalue()
+	assert "REPLACE" not in text
+	assert text.startswith("INSERT INTO `lots` (`id`, `statut`) VALUES\n(1,'Actif'),\n(2,'Vendu')\n")
+	assert text.endswith("ON DUPLICATE KEY UPDATE `id`=VALUES(`id`), `statut`=VALUES(`statut`);\n")
+
+
+def _tombstones():
+	conn = get_connection()
+	try:
+		with conn.cursor() as cur:
+			cur.execute(f"SELECT COUNT(*) FROM {TOMBSTONE_TABLE}")
+			return cur.fetchone()[0]
+	finally:
+		conn.close()
+
+
+def test_incremental_restore_over_existing_rows_keeps_tombstones(mysql_db, tmp_path):
+	migrate()
+	lot = create_lot("Poulet", "2026-01-05", 100, 1.2, "test", "Actif", None, 0)
+	backup_database(tmp_path / "full.sql.gz")
+	update_lot(lot, "Poulet", "2026-01-05", 100, 1.5, "test", "Actif", "pesée", 0)
+	incremental = backup_database(tmp_path / "incr.sql.gz", parent=read_manifest(tmp_path / "full.sql.gz"))
+	assert incremental["tables"]["lots"] == 1
+	# La ligne existe encore en base, avec d'autres valeurs : l'incrémentale la met à jour
+	update_lot(lot, "Poulet", "2026-01-05", 100, 9.9, "test", "Actif", None, 0)
+	before = _tombstones()
+	restore_file(tmp_path / "incr.sql.gz")
+	assert _tombstones() == before
+	assert get_lot(lot)["remarque"] == "pesée"
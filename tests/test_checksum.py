@@ -0,0 +1,73 @@
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from app.migrations import migrate
+from app.utils.backup import MANIFEST_PREFIX, backup_database, sql_literal
+from app.utils.checksum import CHUNK_IDS, _canonical, _parse_values, checksum_backup, diff_checksums, verify_backup
+from scripts.generate_dataset import generate
+
+
+CREATE = """CREATE TABLE `ventes` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `client` varchar(100) DEFAULT NULL,
+  `prix` float NOT NULL,
+  `montant` decimal(12,2) DEFAULT NULL,
+  `date_vente` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`)
+) ENGINE=InnoDB;"""
+
+
+def _write_backup(path, rows):
+	manifest = {"kind": "full", "tables": {"ventes": len(rows)}}
+	tuples = ",\n".join("(" + ",".join(sql_literal(v) for v in row) + ")" for row in rows)
+	path.write_text(
+		MANIFEST_PREFIX + json.dumps(manifest) + "\n" + CREATE + "\n"
+		+ "INSERT INTO `ventes` (`id`, `client`, `prix`, `montant`, `date_vente`) VALUES\n" + tuples + ";\n",
+		encoding="utf-8",
+	)
+	return path
+
+
+ROWS = [
+	(1, "Ferme d'en haut, \\ lot\n2", 1.2, Decimal("1500.50"), datetime(2026, 1, 5, 8, 30)),
+	(2, None, 1500000.0, None, None),
+	(CHUNK_IDS + 3, "", 0.1, Decimal("0.00"), datetime(2026, 1, 6, 9, 0, 0, 250)),
+]
+
+
+def test_parse_values_reads_back_sql_literals():
+	row = (7, "l'é\\t\n\r\0\x1a", None, b"\x00\xff", 2.5, Decimal("0E-10"), date(2026, 1, 5), timedelta(hours=26))
+	text = "(" + ",".join(sql_literal(v) for v in row) + ")"
+	assert _parse_values(text) == ["7", "l'é\\t\n\r\0\x1a", None, b"\x00\xff", "2.5", "0E-10", "2026-01-05", "26:00:00"]
+
+
+def test_canonical_text_matches_mysql_expressions():
+	# Textes produits côté serveur par _column_expr
+	assert _canonical("1.2", "float") == "1.200000"
+	assert _canonical("1500000.0", "float") == "1500000.000000"
+	assert _canonical("-1e-09", "double") == "0.000000"
+	assert _canonical("0E-10", "decimal") == "0.0000000000"
+	assert _canonical("2026-01-05 08:30:00", "datetime") == "2026-01-05 08:30:00.000000"
+	assert _canonical("é", "varchar") == "C3A9"
+	assert _canonical(b"\x00\xff", "blob") == "00FF"
+	assert _canonical(None, "int") == "N"
+
+
+def test_checksum_backup_locates_changed_rows(tmp_path):
+	a = checksum_backup(_write_backup(tmp_path / "a.sql", ROWS))
+	assert a["ventes"]["rows"] == 3
+	assert sorted(a["ventes"]["chunks"]) == [0, 1]
+	assert diff_checksums(a, checksum_backup(_write_backup(tmp_path / "b.sql", ROWS))) == []
+	changed = ROWS[:2] + [(CHUNK_IDS + 3, "", 0.1, Decimal("0.01"), ROWS[2][4])]
+	diffs = diff_checksums(a, checksum_backup(_write_backup(tmp_path / "c.sql", changed)))
+	assert [(d["table"], d["status"], d["ranges"]) for d in diffs] == [("ventes", "contenu", [(CHUNK_IDS, 2 * CHUNK_IDS - 1)])]
+
+
+def test_server_checksums_match_backup(mysql_db, tmp_path):
+	# Empreintes calculées par MySQL et depuis les littéraux du fichier : mêmes textes canoniques
+	migrate()
+	generate(30, seed=3, years=1.0)
+	path = tmp_path / "complete.sql.gz"
+	backup_database(path)
+	assert verify_backup(path) == []
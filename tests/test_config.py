@@ -0,0 +1,37 @@
+import dataclasses
+
+import pytest
+
+from app import db
+from app.config import get_config
+
+
+def test_config_is_read_once(monkeypatch):
+	calls = []
+	monkeypatch.setattr("app.config._load_env", lambda: calls.append(1))
+	get_config.cache_clear()
+	assert db.backend() == db.backend()
+	assert get_config() is get_config()
+	assert len(calls) == 1
+
+
+def test_cache_clear_rereads_environment(monkeypatch):
+	monkeypatch.setenv("QUERY_TIMEOUTS", "lots_overview=120")
+	get_config.cache_clear()
+	assert get_config().query_timeouts == {"lots_overview": 120.0}
+	monkeypatch.setenv("QUERY_TIMEOUTS", "")
+	assert get_config().query_timeouts == {"lots_overview": 120.0}
+	get_config.cache_clear()
+	assert get_config().query_timeouts == {}
+
+
+def test_shared_config_is_read_only(monkeypatch):
+	monkeypatch.setenv("QUERY_TIMEOUTS", "lots_overview=120")
+	get_config.cache_clear()
+	config = get_config()
+	with pytest.raises(dataclasses.FrozenInstanceError):
+		config.db_backend = "sqlite"
+	with pytest.raises(TypeError):
+		config.query_timeouts["summary"] = 0
+	assert get_config().db_backend == config.db_backend
+	assert get_config().query_timeouts == {"lots_overview": 120.0}
@@ -0,0 +1,74 @@
+import pytest
+
+from app.dao.lot_events import get_lot_counters, record_mortality, record_partial_sale, record_slaughter
+from app.dao.lots import create_lot, get_lot, list_lots
+from app.db import transaction
+from app.pool import ConnectionPool
+
+
+@pytest.fixture
+def checkouts(sqlite_db, monkeypatch):
+	"""Liste des emprunts de connexion au pool (nom du pool) ; à vider avant l'opération mesurée."""
+	log = []
+	get_connection = ConnectionPool.get_connection
+
+	def counting(pool, *args, **kwargs):
+		log.append(pool)
+		return get_connection(pool, *args, **kwargs)
+
+	monkeypatch.setattr(ConnectionPool, "get_connection", counting)
+	return log
+
+
+@pytest.fixture
+def lot_id():
+	return create_lot("Poulet", "2026-01-05", 100, 1.2, "test", "Actif", None, 0)
+
+
+@pytest.mark.parametrize("operation", [
+	lambda lot: record_mortality(lot, "2026-01-10", 2, "test"),
+	lambda lot: record_partial_sale(lot, "2026-01-11", 5, 2500.0, "client"),
+	lambda lot: record_slaughter(lot, "2026-01-12", 3, 1.8),
+	lambda lot: get_lot_counters(lot),
+	lambda lot: get_lot(lot),
+	lambda lot: list_lots(limit=50),
+])
+def test_dao_operation_uses_one_checkout(checkouts, lot_id, operation):
+	checkouts.clear()
+	operation(lot_id)
+	assert len(checkouts) == 1
+
+
+def test_operations_inside_transaction_share_one_checkout(checkouts, lot_id):
+	checkouts.clear()
+	with transaction():
+		record_mortality(lot_id, "2026-01-10", 2, "test")
+		record_partial_sale(lot_id, "2026-01-11", 5, 2500.0, "client")
+		record_slaughter(lot_id, "2026-01-12", 3, 1.8)
+		counters = get_lot_counters(lot_id)
+	assert len(checkouts) == 1
+	assert (counters["morts"], counters["vendus"], counters["abattus"]) == (2, 5, 3)
+
+
+def test_failed_transaction_rolls_back_every_operation(checkouts, lot_id):
+	checkouts.clear()
+	with pytest.raises(RuntimeError):
+		with transaction():
+			record_mortality(lot_id, "2026-01-10", 2, "test")
+			raise RuntimeError("échec")
+	assert len(checkouts) == 1
+	assert get_lot_counters(lot_id)["morts"] == 0
+
+
+def test_failed_status_check_propagates_its_cause(checkouts, lot_id):
+	# La clôture du lot (dernier animal) échoue : l'erreur d'origine remonte, l'événement est annulé
+	with transaction() as conn:
+		with conn.cursor() as cur:
+			cur.execute(
+				"CREATE TRIGGER lots_verrouilles BEFORE UPDATE ON lots"
+				" BEGIN SELECT RAISE(ABORT, 'statut verrouillé'); END"
+			)
+	with pytest.raises(Exception, match="statut verrouillé"):
+		record_mortality(lot_id, "2026-01-10", 100, "test")
+	assert get_lot_counters(lot_id)["morts"] == 0
+	assert get_lot(lot_id)["statut"] == "Actif"
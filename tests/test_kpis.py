@@ -0,0 +1,40 @@
+from datetime import date
+
+import pytest
+
+from app.dao import kpis
+from app.dao.finances import create_depense
+from app.dao.kpis import get_kpis
+from app.dao.lot_events import record_mortality
+from app.dao.lots import create_lot
+from app.db import transaction
+
+
+@pytest.fixture
+def kpi_db(sqlite_db):
+	kpis.invalidate_kpis()
+	yield sqlite_db
+	kpis.invalidate_kpis()
+
+
+def test_committed_writes_refresh_cached_kpis(kpi_db):
+	today = date.today().isoformat()
+	before = get_kpis()
+	lot = create_lot("Poulet", today, 100, 1.2, "test", "Actif", None, 0)
+	assert get_kpis()["lots_actifs"] == before["lots_actifs"] + 1
+	record_mortality(lot, today, 3, "test")
+	assert get_kpis()["mort_30"] == before["mort_30"] + 3
+	create_depense("Alimentation", 5000.0, today, None, lot)
+	assert get_kpis()["dep_mois"] == before["dep_mois"] + 5000.0
+
+
+def test_rolled_back_write_keeps_cached_kpis(kpi_db):
+	today = date.today().isoformat()
+	lot = create_lot("Poulet", today, 100, 1.2, "test", "Actif", None, 0)
+	cached = get_kpis()
+	with pytest.raises(RuntimeError):
+		with transaction():
+			record_mortality(lot, today, 3, "test")
+			raise RuntimeError("échec")
+	# Rien n'a été validé : le cache reste servi tel quel
+	assert get_kpis() is cached
@@ -0,0 +1,84 @@
+import re
+from pathlib import Path
+
+from app.db import open_connection
+from app.migrations import available_migrations, migrate, pending_migrations
+from app.utils.sql_script import iter_statements
+
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_COMMENT_RE = re.compile(r"--[^\n]*")
+_CREATE_RE = re.compile(r"\bCREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)", re.IGNORECASE)
+_USE_RES = [
+	re.compile(r"\bALTER\s+TABLE\s+`?(\w+)", re.IGNORECASE),
+	re.compile(r"\bCREATE\s+(?:UNIQUE\s+)?INDEX\s+\w+\s+ON\s+`?(\w+)", re.IGNORECASE),
+	re.compile(r"\bCREATE\s+TRIGGER\s+\w+\s+\w+\s+\w+\s+ON\s+`?(\w+)", re.IGNORECASE),
+	re.compile(r"\bINSERT\s+(?:IGNORE\s+)?INTO\s+`?(\w+)", re.IGNORECASE),
+	re.compile(r"\b(?:FROM|JOIN|REFERENCES)\s+`?(\w+)", re.IGNORECASE),
+]
+_TABLE_BODY_RE = re.compile(r"\bCREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?\s*\((.*)\)", re.IGNORECASE | re.DOTALL)
+_ADD_COLUMN_RE = re.compile(r"\bALTER\s+TABLE\s+`?(\w+)`?\s+ADD\s+COLUMN\s+`?(\w+)", re.IGNORECASE)
+_NOT_A_COLUMN = {"PRIMARY", "FOREIGN", "INDEX", "KEY", "UNIQUE", "CONSTRAINT", "CHECK"}
+DUMP = Path(__file__).resolve().parents[1] / "gestion_elevage.sql"
+
+
+def _statements(path):
+	with open(path, encoding="utf-8") as f:
+		for stmt in iter_statements(f):
+			yield _COMMENT_RE.sub("", _STRING_RE.sub("''", stmt))
+
+
+def test_migrations_only_use_tables_created_by_earlier_migrations():
+	# Base construite par les migrations seules (scripts.init_db) : aucune table manquante (ER 1146)
+	created = set()
+	missing = []
+	for migration in available_migrations():
+		for stmt in _statements(migration.path):
+			created.update(name.lower() for name in _CREATE_RE.findall(stmt))
+			for pattern in _USE_RES:
+				for name in pattern.findall(stmt):
+					if name.lower() not in created:
+						missing.append(f"{migration.name} : {name}")
+	assert not missing, "Tables utilisées avant leur création : " + ", ".join(sorted(set(missing)))
+
+
+def _columns(statements, columns):
+	for stmt in statements:
+		m = _TABLE_BODY_RE.search(stmt)
+		if m:
+			for line in m.group(2).split("\n"):
+				word = line.strip().split(" ")[0].strip("`,")
+				if word and word.upper() not in _NOT_A_COLUMN and word[0] != ")":
+					columns.setdefault(m.group(1).lower(), set()).add(word.lower())
+		for table, column in _ADD_COLUMN_RE.findall(stmt):
+			columns.setdefault(table.lower(), set()).add(column.lower())
+	return columns
+
+
+def test_migrations_create_every_column_of_the_dump():
+	# Le DAO suit gestion_elevage.sql : une base construite par les migrations doit avoir les mêmes colonnes
+	migrated = {}
+	for migration in available_migrations():
+		_columns(_statements(migration.path), migrated)
+	dump = _columns(_statements(DUMP), {})
+	missing = [f"{table}.{column}" for table, columns in sorted(dump.items())
+		for column in sorted(columns - migrated.get(table, set()))]
+	assert not missing, "Colonnes absentes des migrations : " + ", ".join(missing)
+
+
+def test_migrate_builds_empty_schema(mysql_db):
+	names = [m.name for m in available_migrations()]
+	assert pending_migrations() == [m for m in available_migrations()]
+	assert migrate() == names
+	# Rejoué : rien à faire, et plus d'erreur au démarrage de l'application
+	assert migrate() == []
+	assert pending_migrations() == []
+	conn = open_connection()
+	try:
+		with conn.cursor() as cur:
+			cur.execute("SHOW TABLES")
+			tables = {r[0] for r in cur.fetchall()}
+	finally:
+		conn.close()
+	assert {"abattages", "soins_preconfigures", "parametres", "clients", "produits_derives",
+		"lot_counters", "finance_monthly", "suppressions", "schema_migrations"} <= tables
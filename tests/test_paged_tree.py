@@ -0,0 +1,47 @@
+from app.ui.paged_tree import _PageWindow
+
+
+PAGE = 10
+IDS = list(range(1000, 0, -1))
+
+
+def _fetch(after, limit):
+	# Pagination par clé, ordre id DESC, comme list_lots
+	start = 0 if after is None else IDS.index(after[0]) + 1
+	return [{"id": i} for i in IDS[start:start + limit]]
+
+
+def _load(window, index):
+	rows = _fetch(window.keys[index], PAGE)
+	return window.add(index, rows, [row["id"] for row in rows])
+
+
+def test_window_keeps_a_bounded_number_of_pages():
+	window = _PageWindow(3, PAGE, lambda row: (row["id"],))
+	evicted = []
+	while window.next_index() is not None:
+		_, page = _load(window, window.next_index())
+		if page is not None:
+			evicted.append(page["index"])
+		assert len(window.rows) <= 3 * PAGE
+	assert window.exhausted
+	assert [p["index"] for p in window.pages] == [98, 99, 100]
+	assert [row["id"] for row in window.rows][-1] == 1
+	assert evicted == list(range(0, 98))
+
+
+def test_evicted_pages_are_refetched_by_key_when_scrolling_back():
+	window = _PageWindow(3, PAGE, lambda row: (row["id"],))
+	for _ in range(5):
+		_load(window, window.next_index())
+	assert [p["index"] for p in window.pages] == [2, 3, 4]
+	above, page = _load(window, window.previous_index())
+	assert above and page["index"] == 4
+	assert [p["index"] for p in window.pages] == [1, 2, 3]
+	assert window.rows[0]["id"] == 1000 - PAGE
+	assert [row["id"] for row in window.rows] == list(range(1000 - PAGE, 1000 - 4 * PAGE, -1))
+	# Page retirée en bas : la suite est relue en redescendant
+	assert not window.exhausted and window.next_index() == 4
+	_load(window, window.previous_index())
+	assert window.previous_index() is None
+	assert window.rows[0]["id"] == 1000
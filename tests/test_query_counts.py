@@ -0,0 +1,41 @@
+import pytest
+
+from app.db import observe_queries
+from app.ui.lots import lots_page_loader
+from app.ui.paged_tree import PAGE_SIZE, WINDOW_PAGES, _PageWindow
+from scripts.generate_dataset import generate
+
+
+def _window():
+	# Même clé de pagination que la liste de LotsFrame
+	return _PageWindow(WINDOW_PAGES, PAGE_SIZE, lambda r: (r["id"],))
+
+
+def _load_page(fetch, window, index):
+	"""Charge une page comme PagedTreeview : clé de la page dans la fenêtre, puis ajout."""
+	with observe_queries() as log:
+		rows = fetch(window.keys[index], PAGE_SIZE)
+	window.add(index, rows, [row["id"] for row in rows])
+	return rows, log
+
+
+@pytest.mark.parametrize("espece, statut", [("Tous", "Tous"), ("Tous", "Actif"), ("Porc", "Tous")])
+def test_lots_refresh_query_count_does_not_depend_on_lot_count(sqlite_db, espece, statut):
+	counts = {}
+	for lots in (3, PAGE_SIZE + 50):
+		generate(lots, seed=1, years=1.0, reset=True)
+		rows, log = _load_page(lots_page_loader(espece, statut), _window(), 0)
+		# Les compteurs viennent de la jointure sur lot_counters, pas d'une requête par lot
+		assert all("restants" in row for row in rows)
+		counts[lots] = len(log)
+	assert counts[3] == counts[PAGE_SIZE + 50] == 1, counts
+
+
+def test_lots_next_page_is_one_query(sqlite_db):
+	generate(PAGE_SIZE + 50, seed=1, years=1.0, reset=True)
+	fetch, window = lots_page_loader("Tous", "Tous"), _window()
+	first, _ = _load_page(fetch, window, 0)
+	rest, log = _load_page(fetch, window, window.next_index())
+	assert len(first) == PAGE_SIZE and len(rest) == 50
+	assert len(log) == 1
+	assert window.exhausted and window.next_index() is None
@@ -0,0 +1,77 @@
+import re
+
+from app.db import get_connection, observe_queries
+from app.migrations import migrate
+from app.sqlite_backend import translate
+from scripts.check_query_plans import EVENT_TABLES, MIN_ROWS, _sample_values, check_plan, hot_path_calls, plan_failures
+from scripts.generate_dataset import generate
+
+
+# Accès d'une ligne de EXPLAIN QUERY PLAN : "SEARCH t USING INDEX ..." lit une plage
+# d'index ; "SCAN t" ou "SCAN t USING INDEX ..." lit toute la table ou tout l'index
+_SQLITE_ACCESS_RE = re.compile(r"^(SCAN|SEARCH) (\w+)( USING)?")
+_SQLITE_ALIAS_RE = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+
+# Appels qui lisent un index dans l'ordre sans plage : première page sans filtre
+# (arrêtée par LIMIT) ou agrégat de toute la table par conception
+SQLITE_INDEX_SCAN_ALLOWED = {"list_depenses", "list_recettes", "list_soins", "lots_profitability"}
+
+
+def _sqlite_tables(sql: str) -> dict:
+	# Alias (ou nom) -> table, pour relier les lignes du plan aux tables d'événements
+	tables = {}
+	for table, alias in _SQLITE_ALIAS_RE.findall(sql):
+		tables[table] = table
+		if alias and alias.upper() not in ("WHERE", "ON", "LEFT", "JOIN", "GROUP", "ORDER", "LIMIT", "USING"):
+			tables[alias] = table
+	return tables
+
+
+def test_check_plan_flags_full_scan_and_filesort():
+	counts = {"mortalites": MIN_ROWS}
+	plan = [
+		{"table": "lots", "type": "ALL", "Extra": ""},
+		{"table": "mortalites", "type": "ALL", "key": None, "rows": MIN_ROWS, "Extra": "Using where; Using filesort"},
+	]
+	errors, warnings = check_plan(plan, counts)
+	assert len(errors) == 1 and "parcours complet" in errors[0] and "filesort" in errors[0]
+	assert not warnings
+
+
+def test_check_plan_accepts_index_access():
+	plan = [{"table": "mortalites", "type": "ref", "key": "idx_mortalites_lot_date", "rows": 10, "Extra": "Using where"}]
+	assert check_plan(plan, {"mortalites": 10 * MIN_ROWS}) == ([], [])
+
+
+def test_hot_path_plans_use_indexes_sqlite(sqlite_db):
+	generate(40, seed=1, reset=True)
+	sample = _sample_values()
+	full_scans = []
+	conn = get_connection()
+	try:
+		for label, call in hot_path_calls(sample):
+			with observe_queries() as log:
+				call()
+			for sql, params in log:
+				if not sql.lstrip().upper().startswith("SELECT"):
+					continue
+				translated, _writes = translate(sql)
+				tables = _sqlite_tables(translated)
+				for row in conn.raw.execute("EXPLAIN QUERY PLAN " + translated, tuple(params or ())):
+					m = _SQLITE_ACCESS_RE.match(row[-1])
+					if not m or m.group(1) != "SCAN" or tables.get(m.group(2)) not in EVENT_TABLES:
+						continue
+					if m.group(3) and label in SQLITE_INDEX_SCAN_ALLOWED:
+						continue
+					full_scans.append(f"{label}: {row[-1]}")
+	finally:
+		conn.close()
+	assert not full_scans, "Parcours complets : " + "; ".join(full_scans)
+
+
+def test_hot_path_plans_use_indexes_mysql(mysql_db):
+	migrate()
+	# Assez de lignes par table d'événements pour que l'optimiseur préfère les index
+	generate(200, seed=1, reset=True)
+	failures, _warnings = plan_failures(_sample_values())
+	assert not failures, "Plans en régression : " + "; ".join(failures)
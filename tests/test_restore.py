@@ -0,0 +1,116 @@
+import pytest
+
+from app.utils import restore
+from app.utils.restore import RestoreError, restore_file, split_create_table
+
+
+DUMP = """CREATE TABLE `lots` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `statut` varchar(20) DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  KEY `idx_lots_statut` (`statut`)
+) ENGINE=InnoDB;
+INSERT INTO `lots` VALUES (1,'Actif');
+CREATE TABLE `mortalites` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `lot_id` int NOT NULL,
+  PRIMARY KEY (`id`),
+  KEY `idx_mortalites_lot` (`lot_id`),
+  CONSTRAINT `fk_mortalites_lot` FOREIGN KEY (`lot_id`) REFERENCES `lots` (`id`)
+) ENGINE=InnoDB;
+INSERT INTO `mortalites` VALUES (1,1);
+INSERT INTO `mortalites` VALUES (2,'échec');
+"""
+
+
+class _FakeCursor:
+	with_rows = False
+
+	def __init__(self, conn):
+		self._conn = conn
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		return False
+
+	def execute(self, stmt, params=None):
+		self._conn.executed.append(stmt)
+		if any(marker in stmt for marker in self._conn.fail_on):
+			raise ValueError("erreur simulée")
+
+
+class _FakeConnection:
+	"""Connexion MySQL simulée : enregistre les instructions, échoue sur celles qui contiennent un marqueur."""
+
+	def __init__(self, fail_on):
+		self.fail_on = fail_on
+		self.executed = []
+		self.autocommit = True
+
+	def cursor(self):
+		return _FakeCursor(self)
+
+	def commit(self):
+		pass
+
+	def rollback(self):
+		pass
+
+	def close(self):
+		pass
+
+
+@pytest.fixture
+def restore_with(monkeypatch, tmp_path):
+	def run(*fail_on):
+		conn = _FakeConnection(fail_on)
+		monkeypatch.setattr(restore, "require_mysql", lambda feature: None)
+		monkeypatch.setattr(restore, "open_connection", lambda: conn)
+		path = tmp_path / "sauvegarde.sql"
+		path.write_text(DUMP, encoding="utf-8")
+		try:
+			return conn, restore_file(path)
+		except RestoreError as ex:
+			return conn, ex
+	return run
+
+
+def _alters(conn):
+	return [stmt.split(" ")[2] for stmt in conn.executed if stmt.startswith("ALTER TABLE")]
+
+
+def test_split_create_table_defers_secondary_indexes_and_foreign_keys():
+	table, create, deferred = split_create_table(DUMP.split(";\n")[2].strip())
+	assert table == "`mortalites`"
+	assert "KEY" not in create.replace("PRIMARY KEY", "")
+	assert deferred == ["KEY `idx_mortalites_lot` (`lot_id`)",
+		"CONSTRAINT `fk_mortalites_lot` FOREIGN KEY (`lot_id`) REFERENCES `lots` (`id`)"]
+
+
+def test_restore_recreates_deferred_definitions(restore_with):
+	conn, result = restore_with()
+	assert result == {"statements": 5, "tables_indexed": 2}
+	assert _alters(conn) == ["`lots`", "`mortalites`"]
+
+
+def test_failed_restore_reapplies_deferred_definitions(restore_with):
+	conn, error = restore_with("'échec'")
+	assert isinstance(error, RestoreError)
+	assert _alters(conn) == ["`lots`", "`mortalites`"]
+	assert error.unindexed == []
+	assert "sauvegarde.sql" in str(error)
+
+
+def test_failed_restore_reports_tables_left_without_indexes(restore_with):
+	conn, error = restore_with("'échec'", "ALTER TABLE `mortalites`")
+	assert error.unindexed == ["`mortalites`"]
+	assert "tables sans index secondaires ni clés étrangères : `mortalites`" in str(error)
+
+
+def test_failure_in_deferred_ddl_reports_remaining_tables(restore_with):
+	conn, error = restore_with("ALTER TABLE `lots`")
+	assert error.unindexed == ["`lots`"]
+	# mortalites a quand même retrouvé ses index et sa clé étrangère
+	assert _alters(conn).count("`mortalites`") == 1
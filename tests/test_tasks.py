@@ -0,0 +1,54 @@
+import threading
+import time
+
+from app.ui.tasks import TaskRunner
+
+
+class _FakeWidget:
+	"""Fenêtre Tk simulée : les after() sont exécutés à la demande par run_pending()."""
+
+	def __init__(self):
+		self.pending = []
+
+	def winfo_toplevel(self):
+		return self
+
+	def winfo_exists(self):
+		return True
+
+	def after(self, ms, fn):
+		self.pending.append(fn)
+
+	def run_pending(self):
+		pending, self.pending = self.pending, []
+		for fn in pending:
+			fn()
+
+
+def test_cancel_reports_stop_once_worker_has_finished():
+	widget = _FakeWidget()
+	runner = TaskRunner(widget)
+	release = threading.Event()
+	results, stopped = [], []
+	# Tâche sans requête : l'annulation ne l'interrompt pas, elle finit quand on la libère
+	future = runner.submit("export", release.wait, 5, on_success=results.append)
+	runner.cancel("export", on_stopped=lambda: stopped.append(True))
+	for _ in range(3):
+		widget.run_pending()
+	assert stopped == []
+	release.set()
+	future.result(timeout=5)
+	deadline = time.monotonic() + 5
+	while not stopped and time.monotonic() < deadline:
+		widget.run_pending()
+	assert stopped == [True]
+	# Résultat d'une tâche annulée jamais livré
+	assert results == []
+
+
+def test_cancel_without_task_reports_stop():
+	widget = _FakeWidget()
+	stopped = []
+	TaskRunner(widget).cancel("export", on_stopped=lambda: stopped.append(True))
+	widget.run_pending()
+	assert stopped == [True]